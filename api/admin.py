@@ -1,14 +1,23 @@
 from django.contrib import admin
-from .models import APILog, APIKey
+
+from core.archive import PayloadAdminMixin
+from .models import APILog, APILogHourly, APIKey
 
 @admin.register(APILog)
-class APILogAdmin(admin.ModelAdmin):
+class APILogAdmin(PayloadAdminMixin, admin.ModelAdmin):
     list_display = ['endpoint', 'method', 'status_code', 'created_at', 'duration', 'ip_address']
     list_filter = ['method', 'status_code', 'created_at']
     search_fields = ['endpoint', 'ip_address']
     readonly_fields = ['created_at']
     date_hierarchy = 'created_at'
 
+@admin.register(APILogHourly)
+class APILogHourlyAdmin(admin.ModelAdmin):
+    list_display = ['hour', 'endpoint', 'method', 'status_code', 'count', 'duration_avg', 'duration_p95']
+    list_filter = ['method', 'status_code']
+    search_fields = ['endpoint']
+    date_hierarchy = 'hour'
+
 @admin.register(APIKey)
 class APIKeyAdmin(admin.ModelAdmin):
     list_display = ['name', 'user', 'key', 'is_active', 'created_at', 'last_used']
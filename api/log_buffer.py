@@ -0,0 +1,53 @@
+"""Buffered, sampled APILog writes for log_api_request"""
+import json
+import random
+
+from django.conf import settings
+
+from core.buffered_writer import BufferedWriter
+from .models import APILog
+
+DEFAULTS = {
+    'BUFFERED': True,
+    'SUCCESS_SAMPLE_RATE': 1.0,
+    'MAX_PAYLOAD_CHARS': 4000,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE': 10000,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'API_LOG', {}).get(name, DEFAULTS[name])
+
+
+writer = BufferedWriter(
+    APILog,
+    batch_size=get_setting('BATCH_SIZE'),
+    flush_interval=get_setting('FLUSH_INTERVAL'),
+    max_queue=get_setting('MAX_QUEUE'),
+)
+
+
+def truncate_payload(data):
+    """Return data unchanged if its JSON fits MAX_PAYLOAD_CHARS, else a truncated preview"""
+    limit = get_setting('MAX_PAYLOAD_CHARS')
+    text = json.dumps(data, default=str)
+    if len(text) <= limit:
+        return data
+    return {'truncated': True, 'size': len(text), 'preview': text[:limit]}
+
+
+def should_log(status_code):
+    """Errors are always logged; successful calls at SUCCESS_SAMPLE_RATE"""
+    if status_code >= 400:
+        return True
+    rate = get_setting('SUCCESS_SAMPLE_RATE')
+    return rate >= 1 or random.random() < rate
+
+
+def write(entry):
+    if get_setting('BUFFERED'):
+        writer.add(entry)
+    else:
+        entry.save()
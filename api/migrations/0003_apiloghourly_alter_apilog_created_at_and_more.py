@@ -0,0 +1,41 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:24
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_alter_apilog_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APILogHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('endpoint', models.CharField(max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('status_code', models.IntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('duration_min', models.FloatField()),
+                ('duration_avg', models.FloatField()),
+                ('duration_max', models.FloatField()),
+                ('duration_p95', models.FloatField()),
+            ],
+            options={
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='apilog',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name='apiloghourly',
+            constraint=models.UniqueConstraint(fields=('hour', 'endpoint', 'method', 'status_code'), name='unique_apilog_hour'),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
+
+from core.archive import ArchivedPayloadMixin, PayloadManager
+
+class APILog(ArchivedPayloadMixin, models.Model):
+    PAYLOAD_FIELDS = ('request_data', 'response_data')
 
-class APILog(models.Model):
     endpoint = models.CharField(max_length=200)
     method = models.CharField(max_length=10)
     request_data = models.JSONField(default=dict)
@@ -9,8 +14,11 @@ class APILog(models.Model):
     status_code = models.IntegerField()
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(blank=True)
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Set when the call is logged, not when the buffered row is inserted
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
     duration = models.FloatField(help_text="Request duration in milliseconds")
+
+    objects = PayloadManager()
     
     class Meta:
         ordering = ['-created_at']
@@ -18,6 +26,27 @@ class APILog(models.Model):
     def __str__(self):
         return f"{self.method} {self.endpoint} - {self.status_code}"
 
+class APILogHourly(models.Model):
+    """APILog rows rolled up per hour by compact_logs"""
+    hour = models.DateTimeField()
+    endpoint = models.CharField(max_length=200)
+    method = models.CharField(max_length=10)
+    status_code = models.IntegerField()
+    count = models.PositiveIntegerField()
+    duration_min = models.FloatField()
+    duration_avg = models.FloatField()
+    duration_max = models.FloatField()
+    duration_p95 = models.FloatField()
+
+    class Meta:
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'endpoint', 'method', 'status_code'], name='unique_apilog_hour'),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.method} {self.endpoint} {self.status_code} x{self.count}"
+
 class APIKey(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     key = models.CharField(max_length=100, unique=True)
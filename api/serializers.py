@@ -12,6 +12,6 @@ class DonationSerializer(serializers.ModelSerializer):
 class ProgramSerializer(serializers.ModelSerializer):
     class Meta:
         model = Program
-        fields = ['id', 'title', 'description', 'category', 'image', 
-                 'start_date', 'end_date', 'is_active']
+        fields = ['id', 'title', 'description', 'category', 'image',
+                 'duration', 'is_active']
 
@@ -3,29 +3,51 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
-import requests
 import base64
 import json
 from datetime import datetime
-import stripe
+from . import log_buffer
 from .models import APILog
+from core.page_cache import conditional_on
 from donations.models import Donation
-
-# Initialize Stripe
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from donations.providers import CircuitOpenError, provider_request, stripe_call
+from programs.models import Program
 
 def log_api_request(endpoint, method, request_data, response_data, status_code, ip_address, user_agent, duration):
-    """Log API requests"""
-    APILog.objects.create(
+    """Queue an API log entry; successful calls are sampled and large payloads truncated"""
+    if not log_buffer.should_log(status_code):
+        return
+    log_buffer.write(APILog(
         endpoint=endpoint,
         method=method,
-        request_data=request_data,
-        response_data=response_data,
+        request_data=log_buffer.truncate_payload(request_data),
+        response_data=log_buffer.truncate_payload(response_data),
         status_code=status_code,
         ip_address=ip_address,
         user_agent=user_agent,
         duration=duration
+    ))
+
+def degraded_response(request, endpoint, request_data, error, start_time):
+    """Fail fast with 503 while a provider's circuit breaker is open"""
+    duration = (datetime.now() - start_time).total_seconds() * 1000
+    log_api_request(
+        endpoint=endpoint,
+        method='POST',
+        request_data=request_data,
+        response_data={'error': str(error), 'degraded': True},
+        status_code=503,
+        ip_address=request.META.get('REMOTE_ADDR'),
+        user_agent=request.META.get('HTTP_USER_AGENT', ''),
+        duration=duration
     )
+    return Response({
+        'success': False,
+        'degraded': True,
+        'provider': error.name,
+        'error': str(error),
+        'retry_after': error.retry_after
+    }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={'Retry-After': str(error.retry_after)})
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -33,6 +55,8 @@ def initiate_mpesa_stk_push(request):
     """
     Initiate M-Pesa STK Push
     """
+    import requests
+
     start_time = datetime.now()
     
     phone = request.data.get('phone')
@@ -40,14 +64,14 @@ def initiate_mpesa_stk_push(request):
     account_ref = request.data.get('account_reference', 'DONATION')
     
     # Get access token
-    auth_url = "https://sandbox.safaricom.co.ke/oauth/v1/generate?grant_type=client_credentials"
+    auth_url = f"{settings.MPESA_BASE_URL}/oauth/v1/generate?grant_type=client_credentials"
     auth = base64.b64encode(f"{settings.MPESA_CONSUMER_KEY}:{settings.MPESA_CONSUMER_SECRET}".encode()).decode()
     
     headers = {'Authorization': f'Basic {auth}'}
     
     try:
         # Get access token
-        token_response = requests.get(auth_url, headers=headers, timeout=30)
+        token_response = provider_request('mpesa', 'oauth', 'GET', auth_url, headers=headers)
         token_response.raise_for_status()
         access_token = token_response.json().get('access_token')
         
@@ -57,7 +81,7 @@ def initiate_mpesa_stk_push(request):
             f"{settings.MPESA_SHORTCODE}{settings.MPESA_PASSKEY}{timestamp}".encode()
         ).decode()
         
-        stk_url = "https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest"
+        stk_url = f"{settings.MPESA_BASE_URL}/mpesa/stkpush/v1/processrequest"
         stk_headers = {
             'Authorization': f'Bearer {access_token}',
             'Content-Type': 'application/json'
@@ -72,12 +96,12 @@ def initiate_mpesa_stk_push(request):
             "PartyA": phone,
             "PartyB": settings.MPESA_SHORTCODE,
             "PhoneNumber": phone,
-            "CallBackURL": f"{settings.BASE_URL}/api/mpesa-callback/",
+            "CallBackURL": f"{settings.BASE_URL}/api/mpesa/callback/",
             "AccountReference": account_ref,
             "TransactionDesc": "Donation"
         }
         
-        stk_response = requests.post(stk_url, json=stk_payload, headers=stk_headers, timeout=30)
+        stk_response = provider_request('mpesa', 'stk_push', 'POST', stk_url, json=stk_payload, headers=stk_headers)
         stk_response.raise_for_status()
         data = stk_response.json()
         
@@ -103,6 +127,11 @@ def initiate_mpesa_stk_push(request):
             'message': data.get('ResponseDescription')
         })
         
+    except CircuitOpenError as e:
+        return degraded_response(
+            request, '/api/mpesa/stk-push/',
+            {'phone': phone, 'amount': amount, 'account_reference': account_ref}, e, start_time
+        )
     except requests.exceptions.RequestException as e:
         duration = (datetime.now() - start_time).total_seconds() * 1000
         
@@ -169,12 +198,14 @@ def create_paypal_order(request):
     """
     Create PayPal order
     """
+    import requests
+
     start_time = datetime.now()
     
     amount = request.data.get('amount')
     currency = request.data.get('currency', 'USD')
     
-    paypal_url = "https://api-m.sandbox.paypal.com/v2/checkout/orders"
+    paypal_url = f"{settings.PAYPAL_BASE_URL}/v2/checkout/orders"
     auth = base64.b64encode(f"{settings.PAYPAL_CLIENT_ID}:{settings.PAYPAL_SECRET}".encode()).decode()
     
     headers = {
@@ -197,7 +228,7 @@ def create_paypal_order(request):
     }
     
     try:
-        response = requests.post(paypal_url, json=payload, headers=headers, timeout=30)
+        response = provider_request('paypal', 'create_order', 'POST', paypal_url, json=payload, headers=headers)
         response.raise_for_status()
         data = response.json()
         
@@ -220,6 +251,10 @@ def create_paypal_order(request):
             'links': data.get('links', [])
         })
         
+    except CircuitOpenError as e:
+        return degraded_response(
+            request, '/api/paypal/create-order/', {'amount': amount, 'currency': currency}, e, start_time
+        )
     except requests.exceptions.RequestException as e:
         duration = (datetime.now() - start_time).total_seconds() * 1000
         
@@ -245,6 +280,8 @@ def capture_paypal_order(request, order_id):
     """
     Capture PayPal order
     """
+    import requests
+
     start_time = datetime.now()
     
     auth = base64.b64encode(f"{settings.PAYPAL_CLIENT_ID}:{settings.PAYPAL_SECRET}".encode()).decode()
@@ -254,10 +291,10 @@ def capture_paypal_order(request, order_id):
         'Content-Type': 'application/json'
     }
     
-    capture_url = f"https://api-m.sandbox.paypal.com/v2/checkout/orders/{order_id}/capture"
+    capture_url = f"{settings.PAYPAL_BASE_URL}/v2/checkout/orders/{order_id}/capture"
     
     try:
-        response = requests.post(capture_url, headers=headers, json={}, timeout=30)
+        response = provider_request('paypal', 'capture_order', 'POST', capture_url, headers=headers, json={})
         response.raise_for_status()
         data = response.json()
         
@@ -280,6 +317,10 @@ def capture_paypal_order(request, order_id):
             'payment_id': data.get('id')
         })
         
+    except CircuitOpenError as e:
+        return degraded_response(
+            request, f'/api/paypal/capture-order/{order_id}/', {'order_id': order_id}, e, start_time
+        )
     except requests.exceptions.RequestException as e:
         duration = (datetime.now() - start_time).total_seconds() * 1000
         
@@ -305,6 +346,8 @@ def create_stripe_payment_intent(request):
     """
     Create Stripe payment intent
     """
+    import stripe
+
     start_time = datetime.now()
     
     amount = request.data.get('amount')
@@ -315,14 +358,14 @@ def create_stripe_payment_intent(request):
         # Convert amount to cents
         amount_cents = int(float(amount) * 100)
         
-        intent = stripe.PaymentIntent.create(
-            amount=amount_cents,
-            currency=currency,
-            metadata=metadata,
-            automatic_payment_methods={
+        intent = stripe_call('payment_intent', 'payment_intents.create', {
+            'amount': amount_cents,
+            'currency': currency,
+            'metadata': metadata,
+            'automatic_payment_methods': {
                 'enabled': True,
             },
-        )
+        })
         
         duration = (datetime.now() - start_time).total_seconds() * 1000
         
@@ -345,6 +388,11 @@ def create_stripe_payment_intent(request):
             'currency': intent.currency
         })
         
+    except CircuitOpenError as e:
+        return degraded_response(
+            request, '/api/stripe/create-payment-intent/',
+            {'amount': amount, 'currency': currency, 'metadata': metadata}, e, start_time
+        )
     except stripe.error.StripeError as e:
         duration = (datetime.now() - start_time).total_seconds() * 1000
         
@@ -370,6 +418,8 @@ def stripe_webhook(request):
     """
     Handle Stripe webhook
     """
+    import stripe
+
     payload = request.body
     sig_header = request.META.get('HTTP_STRIPE_SIGNATURE')
     
@@ -424,46 +474,52 @@ def donation_stats(request):
     Get donation statistics
     """
     from django.db.models import Count, Sum, Avg
-    from datetime import datetime, timedelta
-    
+    from django.db.models.functions import TruncDate
+    from django.utils import timezone
+    from datetime import timedelta
+
     # Get filters
     days = int(request.GET.get('days', 30))
-    start_date = datetime.now() - timedelta(days=days)
-    
+    start_date = timezone.localtime() - timedelta(days=days)
+
     # Get donation statistics
     donations = Donation.objects.filter(created_at__gte=start_date, status='completed')
-    
+    totals = donations.aggregate(count=Count('id'), total=Sum('amount'), average=Avg('amount'))
+
     stats = {
-        'total_donations': donations.count(),
-        'total_amount': donations.aggregate(Sum('amount'))['amount__sum'] or 0,
-        'average_donation': donations.aggregate(Avg('amount'))['amount__avg'] or 0,
+        'total_donations': totals['count'],
+        'total_amount': totals['total'] or 0,
+        'average_donation': totals['average'] or 0,
         'by_method': list(donations.values('payment_method').annotate(
             count=Count('id'),
             total=Sum('amount')
         )),
         'daily_totals': []
     }
-    
-    # Get daily totals
+
+    # Get daily totals in one grouped query rather than one query per day
+    day_totals = dict(
+        donations.annotate(date=TruncDate('created_at'))
+        .values('date')
+        .annotate(total=Sum('amount'))
+        .values_list('date', 'total')
+    )
     for i in range(days):
         date = start_date + timedelta(days=i)
-        day_total = donations.filter(created_at__date=date.date()).aggregate(
-            total=Sum('amount')
-        )['total'] or 0
         stats['daily_totals'].append({
             'date': date.strftime('%Y-%m-%d'),
-            'amount': float(day_total)
+            'amount': float(day_totals.get(date.date()) or 0)
         })
     
     return Response(stats)
 
+@conditional_on(Program)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def program_list(request):
     """
     Get program list
     """
-    from programs.models import Program
     from .serializers import ProgramSerializer
 
     programs = Program.objects.filter(is_active=True)
@@ -4,3 +4,21 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from . import images, page_cache, profiling, site_settings, static_site, theme
+        from .middleware import install_query_counting
+        from .models import WebsiteSetting
+        from .slow_queries import install
+
+        connection_created.connect(install, dispatch_uid='core.slow_queries')
+        connection_created.connect(install_query_counting, dispatch_uid='core.query_counting')
+        post_save.connect(site_settings.invalidate, sender=WebsiteSetting, dispatch_uid='core.site_settings.save')
+        post_delete.connect(site_settings.invalidate, sender=WebsiteSetting, dispatch_uid='core.site_settings.delete')
+        post_save.connect(theme.recompile, sender=WebsiteSetting, dispatch_uid='core.theme.save')
+        page_cache.connect_signals()
+        images.connect_signals()
+        static_site.connect_signals()
+        profiling.install_hooks()
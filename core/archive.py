@@ -0,0 +1,221 @@
+"""
+Cold storage for bulky JSON payload fields.
+
+`manage.py archive_payloads` moves old payloads (provider raw_response,
+APILog request/response data, AuditLog details) into append-only segment
+files and leaves a pointer in the row:
+
+    {"__archived__": {"segment": "...", "offset": 1234, "length": 567, "line": 8}}
+
+A segment is a series of gzip members, one per archived batch, each holding
+JSONL records of {"pk", "field", "value"}; the whole file is still readable
+with zcat. Next to every segment a sidecar `.idx` file has one JSON line
+per member with its offset, length and the (pk, field) of each line, so
+payloads can be found without the pointer.
+
+Models with payload fields use PayloadManager, which defers them on every
+query, and ArchivedPayloadMixin.payload(), which reads a value back from
+cold storage only when it is asked for. Their admins use PayloadAdminMixin,
+which shows payloads through payload() rather than as raw pointers.
+
+Once no row points into a segment any more (compact_logs deleted them, or a
+donation and its transactions were removed), collect_garbage() deletes it
+and its index; compact_logs runs it after every compaction.
+"""
+import gzip
+import json
+import os
+import time
+from functools import lru_cache
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+from django.utils.html import format_html
+
+DEFAULTS = {
+    'PATH': None,
+    'AFTER_DAYS': 7,
+    'BATCH_SIZE': 500,
+    'MIN_BYTES': 256,
+    'SEGMENT_MAX_BYTES': 64 * 1024 * 1024,
+    # Segments younger than this are never collected: archive_payloads writes a
+    # block before it updates the rows that point at it
+    'GC_MIN_AGE': 60 * 60,
+}
+
+POINTER_KEY = '__archived__'
+SEGMENT_SUFFIX = '.jsonl.gz'
+INDEX_SUFFIX = '.idx'
+
+
+def get_setting(name):
+    return getattr(settings, 'PAYLOAD_ARCHIVE', {}).get(name, DEFAULTS[name])
+
+
+def archive_dir():
+    return str(get_setting('PATH') or os.path.join(settings.BASE_DIR, 'archive'))
+
+
+def is_pointer(value):
+    return isinstance(value, dict) and POINTER_KEY in value
+
+
+@lru_cache(maxsize=32)
+def read_block(segment, offset, length):
+    """Decompress one archived batch; recently read batches stay in memory"""
+    with open(os.path.join(archive_dir(), segment), 'rb') as f:
+        f.seek(offset)
+        data = gzip.decompress(f.read(length))
+    return data.decode('utf-8').splitlines()
+
+
+def load(value):
+    """Return a payload, reading it back from its segment if it was archived"""
+    if not is_pointer(value):
+        return value
+    pointer = value[POINTER_KEY]
+    lines = read_block(pointer['segment'], pointer['offset'], pointer['length'])
+    return json.loads(lines[pointer['line']])['value']
+
+
+class SegmentWriter:
+    """Append batches to a segment, starting a new one past SEGMENT_MAX_BYTES"""
+
+    def __init__(self, label):
+        self.label = label
+        self.directory = archive_dir()
+        self.max_bytes = get_setting('SEGMENT_MAX_BYTES')
+        self.segment = None
+        self.part = 0
+
+    def _next_segment(self):
+        self.part += 1
+        stamp = timezone.now().strftime('%Y%m%dT%H%M%S')
+        self.segment = f'{self.label}-{stamp}-{self.part:03d}{SEGMENT_SUFFIX}'
+
+    def write_batch(self, records):
+        """
+        Append [(pk, field, value), ...] as one gzip member and return a pointer
+        per record. The member is fsynced before returning, so rows may be
+        pointed at it as soon as this returns.
+        """
+        path = self.segment and os.path.join(self.directory, self.segment)
+        if path is None or os.path.getsize(path) >= self.max_bytes:
+            os.makedirs(self.directory, exist_ok=True)
+            self._next_segment()
+            path = os.path.join(self.directory, self.segment)
+
+        lines = [
+            json.dumps({'pk': pk, 'field': field, 'value': value}, cls=DjangoJSONEncoder)
+            for pk, field, value in records
+        ]
+        block = gzip.compress(('\n'.join(lines) + '\n').encode('utf-8'))
+        with open(path, 'ab') as f:
+            offset = f.tell()
+            f.write(block)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with open(path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX, 'a', encoding='utf-8') as index:
+            keys = [[pk, field] for pk, field, _value in records]
+            index.write(json.dumps({'offset': offset, 'length': len(block), 'keys': keys}) + '\n')
+        return [
+            {POINTER_KEY: {'segment': self.segment, 'offset': offset, 'length': len(block), 'line': line}}
+            for line in range(len(records))
+        ]
+
+
+def index_path(segment):
+    return os.path.join(archive_dir(), segment[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX)
+
+
+def read_index(segment):
+    """{field: [pk, ...]} of everything ever archived to segment"""
+    keys = {}
+    with open(index_path(segment), encoding='utf-8') as index:
+        for line in index:
+            for pk, field in json.loads(line)['keys']:
+                keys.setdefault(field, []).append(pk)
+    return keys
+
+
+def in_use(segment, chunk_size=500):
+    """Whether any row still points into segment"""
+    model = apps.get_model(segment.split('-', 1)[0])
+    for field, pks in read_index(segment).items():
+        for i in range(0, len(pks), chunk_size):
+            values = model._base_manager.filter(pk__in=pks[i:i + chunk_size]).values_list(field, flat=True)
+            if any(is_pointer(value) and value[POINTER_KEY]['segment'] == segment for value in values):
+                return True
+    return False
+
+
+def collect_garbage(dry_run=False):
+    """Delete segments no row points into; returns [(segment, bytes)] of those removed"""
+    directory = archive_dir()
+    if not os.path.isdir(directory):
+        return []
+    removed = []
+    oldest = time.time() - get_setting('GC_MIN_AGE')
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.endswith(SEGMENT_SUFFIX) or os.path.getmtime(path) > oldest:
+            continue
+        if not os.path.exists(index_path(name)) or in_use(name):
+            continue  # Without its index there is no telling what points into it
+        removed.append((name, os.path.getsize(path)))
+        if not dry_run:
+            os.remove(path)
+            os.remove(index_path(name))
+    if removed and not dry_run:
+        read_block.cache_clear()
+    return removed
+
+
+class PayloadQuerySet(models.QuerySet):
+    def without_payloads(self):
+        return self.defer(*self.model.PAYLOAD_FIELDS)
+
+
+class PayloadManager(models.Manager.from_queryset(PayloadQuerySet)):
+    """Default manager that leaves PAYLOAD_FIELDS out of every query; use .defer(None) to load them"""
+
+    def get_queryset(self):
+        return super().get_queryset().without_payloads()
+
+
+class ArchivedPayloadMixin:
+    PAYLOAD_FIELDS = ()
+
+    def payload(self, field):
+        """Value of a payload field, read back from cold storage if it was archived"""
+        return load(getattr(self, field))
+
+
+def payload_display(field):
+    """Admin read-only column showing a payload field through payload()"""
+    def display(obj):
+        value = obj.payload(field) if obj is not None and obj.pk else None
+        return format_html('<pre>{}</pre>', json.dumps(value, indent=2, cls=DjangoJSONEncoder))
+    display.short_description = field.replace('_', ' ')
+    return display
+
+
+class PayloadAdminMixin:
+    """ModelAdmin mixin: PAYLOAD_FIELDS are shown read-only, read back from cold storage if archived"""
+
+    def __getattr__(self, name):
+        # The read-only `<field>_payload` columns added below
+        field = name.removesuffix('_payload')
+        if name.endswith('_payload') and field in self.model.PAYLOAD_FIELDS:
+            return payload_display(field)
+        raise AttributeError(name)
+
+    def get_exclude(self, request, obj=None):
+        return [*(super().get_exclude(request, obj) or ()), *self.model.PAYLOAD_FIELDS]
+
+    def get_readonly_fields(self, request, obj=None):
+        return [*super().get_readonly_fields(request, obj), *(f'{field}_payload' for field in self.model.PAYLOAD_FIELDS)]
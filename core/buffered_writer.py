@@ -0,0 +1,163 @@
+"""
+In-process write buffer for high-volume log models.
+
+Rows are queued in memory and inserted with bulk_create by a background
+thread once BATCH_SIZE rows are waiting or FLUSH_INTERVAL seconds have
+passed, so request threads never open a write transaction for them. Every
+writer is flushed at interpreter exit and from gunicorn's worker_exit hook.
+
+A batch that fails with a transient error (SQLite's "database is locked",
+a dropped connection) is retried with backoff, then put back at the head
+of the queue for the next flush, up to MAX_REQUEUES times. Other errors,
+and batches that keep failing, are dropped and counted.
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+
+from django.db import InterfaceError, OperationalError, close_old_connections
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_writers = []
+_registry_lock = threading.Lock()
+
+# OperationalError also covers schema problems ("no such column"), which no
+# retry fixes; only these messages mean a later attempt can get through
+TRANSIENT_MESSAGES = ('locked', 'busy', 'deadlock', 'timeout', 'timed out', 'connection', 'could not serialize')
+
+
+def is_transient(error):
+    if isinstance(error, InterfaceError):
+        return True
+    message = str(error).lower()
+    return isinstance(error, OperationalError) and any(text in message for text in TRANSIENT_MESSAGES)
+
+
+class BufferedWriter:
+    """
+    Queue unsaved model instances and bulk insert them from a daemon thread.
+
+    prepare, if given, is called on each instance just before it is inserted,
+    so expensive field values can be computed off the request thread.
+    """
+
+    def __init__(self, model, batch_size=100, flush_interval=2.0, max_queue=10000, prepare=None,
+                 retries=3, retry_delay=0.1, max_requeues=5):
+        self.model = model
+        self.prepare = prepare
+        self.label = model._meta.label
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_requeues = max_requeues
+        self._requeues = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+        with _registry_lock:
+            _writers.append(self)
+
+    def add(self, obj):
+        """Queue one instance; returns False if the queue is full and it was dropped"""
+        with self._lock:
+            if len(self._buffer) >= self.max_queue:
+                metrics.BUFFER_DROPPED.labels(self.label).inc()
+                return False
+            self._buffer.append(obj)
+            pending = len(self._buffer)
+        metrics.BUFFER_DEPTH.labels(self.label).set(pending)
+        self._ensure_thread()
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self):
+        """Insert everything queued so far; safe to call from any thread"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._buffer = self._buffer, []
+            metrics.BUFFER_DEPTH.labels(self.label).set(0)
+            if not pending:
+                return 0
+            try:
+                self._insert(pending)
+            except Exception as e:
+                if is_transient(e):
+                    self._requeue(pending, e)
+                else:
+                    self._drop(pending, e)
+                return 0
+            self._requeues = 0
+            metrics.BUFFER_WRITTEN.labels(self.label).inc(len(pending))
+            return len(pending)
+
+    def _insert(self, pending):
+        if self.prepare:
+            for obj in pending:
+                self.prepare(obj)
+        for attempt in range(self.retries + 1):
+            try:
+                # bulk_create is atomic, so a failed attempt inserted nothing
+                self.model.objects.bulk_create(pending, batch_size=self.batch_size)
+                return
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise
+                close_old_connections()  # Replaces a connection the error left unusable
+                time.sleep(self.retry_delay * 2 ** attempt)
+
+    def _requeue(self, pending, error):
+        self._requeues += 1
+        if self._requeues > self.max_requeues:
+            self._requeues = 0
+            self._drop(pending, error)
+            return
+        with self._lock:
+            kept = pending[:max(self.max_queue - len(self._buffer), 0)]
+            self._buffer[:0] = kept
+            queued = len(self._buffer)
+        metrics.BUFFER_DEPTH.labels(self.label).set(queued)
+        logger.warning(f"Requeued {len(kept)} buffered {self.label} rows after: {error}")
+        if len(kept) < len(pending):
+            self._drop(pending[len(kept):], 'queue full')
+
+    def _drop(self, rows, error):
+        metrics.BUFFER_DROPPED.labels(self.label).inc(len(rows))
+        logger.error(f"Dropped {len(rows)} buffered {self.label} rows: {error}")
+
+    def _ensure_thread(self):
+        # A thread started before gunicorn forks does not exist in the worker
+        if self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == os.getpid() and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=f'buffered-writer-{self.label}', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            close_old_connections()
+            self.flush()
+
+
+def flush_all():
+    """Flush every writer in this process, e.g. on worker shutdown"""
+    for writer in list(_writers):
+        writer.flush()
+
+
+atexit.register(flush_all)
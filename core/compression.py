@@ -0,0 +1,183 @@
+"""
+Response compression.
+
+CompressionMiddleware (core.middleware) compresses text responses with
+brotli or gzip, whichever the client prefers (brotli on a tie), streaming
+responses chunk by chunk. Images, archives and anything already carrying a
+Content-Encoding pass through untouched, as do responses other than 200 and
+range requests and responses: it sits above WhiteNoise, whose 206s and 304s
+must reach the client exactly as sent.
+
+Cached public pages are also stored gzipped, so a page cache hit is served
+without compressing anything. Those pages contain a per-response CSRF
+token, so the cached copy is a list of raw deflate segments split at the
+token placeholder. Each segment is compressed independently and ends on a
+byte boundary. For every response, the token is deflated on its own and
+spliced in, and the gzip header and trailer (CRC32 and length of the
+final content) are written around the whole.
+"""
+import os
+import re
+import struct
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+try:
+    import brotli
+except ImportError:  # Optional: without it, only gzip is offered
+    brotli = None
+
+DEFAULTS = {
+    'ENABLED': True,
+    'MIN_LENGTH': 200,
+    'BROTLI_QUALITY': 5,
+    'GZIP_LEVEL': 6,
+    # Random bytes in the gzip header, as django.middleware.gzip does against BREACH
+    'MAX_RANDOM_BYTES': 100,
+}
+
+# Content types worth compressing; everything else (images, video, archives,
+# fonts other than SVG) is usually compressed already
+COMPRESSIBLE_TYPES = re.compile(
+    r'^(text/|application/(json|javascript|xml|xhtml\+xml|rss\+xml|atom\+xml|ld\+json|problem\+json)|image/svg\+xml)'
+)
+
+ACCEPT_ENCODING = re.compile(r'\s*([^\s;,]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?')
+
+
+def get_setting(name):
+    return getattr(settings, 'RESPONSE_COMPRESSION', {}).get(name, DEFAULTS[name])
+
+
+def supported_encodings():
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(request, available=None):
+    """The content coding to use for request, from available (default: all supported), or None"""
+    available = available or supported_encodings()
+    weights = {}
+    for match in ACCEPT_ENCODING.finditer(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        coding = match.group(1).lower()
+        try:
+            weights[coding] = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+    choices = []
+    for preference, coding in enumerate(available):
+        weight = weights.get(coding, weights.get('*', 0.0))
+        if weight > 0:
+            choices.append((-weight, preference, coding))
+    return min(choices)[2] if choices else None
+
+
+def compressible(request, response):
+    if response.status_code != 200 or response.has_header('Content-Range') or 'HTTP_RANGE' in request.META:
+        return False
+    if response.has_header('Content-Encoding') or getattr(response, 'is_async', False):
+        return False
+    if not COMPRESSIBLE_TYPES.match(response.get('Content-Type', '')):
+        return False
+    return response.streaming or len(response.content) >= get_setting('MIN_LENGTH')
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=get_setting('BROTLI_QUALITY'))
+    return compress_string(content, max_random_bytes=get_setting('MAX_RANDOM_BYTES'))
+
+
+def compress_stream(chunks, encoding):
+    # Every chunk is flushed so the client gets each piece as soon as the view yields it
+    if encoding == 'br':
+        compressor = brotli.Compressor(quality=get_setting('BROTLI_QUALITY'))
+        for chunk in chunks:
+            yield compressor.process(chunk) + compressor.flush()
+        yield compressor.finish()
+        return
+    compressor = zlib.compressobj(get_setting('GZIP_LEVEL'), zlib.DEFLATED, -zlib.MAX_WBITS)
+    crc = length = 0
+    yield gzip_header()
+    for chunk in chunks:
+        crc = zlib.crc32(chunk, crc)
+        length += len(chunk)
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush() + struct.pack('<II', crc, length & 0xFFFFFFFF)
+
+
+def weaken_etag(response):
+    """Compressed bytes differ per coding, so a strong ETag must become weak (RFC 9110 8.8.1)"""
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+
+
+def compress_response(request, response):
+    """Compress response in place for request's preferred coding, if it is worth it"""
+    if not get_setting('ENABLED') or not compressible(request, response):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = negotiate(request)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        response.streaming_content = compress_stream(response.streaming_content, encoding)
+        # The compressed size isn't known until the stream ends
+        del response.headers['Content-Length']
+    else:
+        compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+    weaken_etag(response)
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def deflate_segment(data):
+    """Raw deflate blocks for data that a following segment can be appended to"""
+    compressor = zlib.compressobj(get_setting('GZIP_LEVEL'), zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+# An empty, final fixed-Huffman block: ends a stream of Z_SYNC_FLUSH segments
+FINAL_BLOCK = b'\x03\x00'
+
+
+def gzip_header():
+    random_bytes = os.urandom(1)[0] % (get_setting('MAX_RANDOM_BYTES') + 1)
+    if not random_bytes:
+        return b'\x1f\x8b\x08\x00\x00\x00\x00\x00\x00\xff'
+    # FNAME flag with a random-length, random name, like compress_string()
+    name = os.urandom(random_bytes).replace(b'\x00', b'\x01')
+    return b'\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff' + name + b'\x00'
+
+
+def presplit(content, placeholder):
+    """Cacheable gzip form of content: deflated segments between occurrences of placeholder"""
+    return [deflate_segment(segment) for segment in content.split(placeholder)]
+
+
+def splice_gzip(content, segments, placeholder, replacement):
+    """
+    gzip body of content with placeholder replaced by replacement, built from
+    presplit() segments without compressing content again.
+    """
+    crc = 0
+    body = [gzip_header()]
+    token = deflate_segment(replacement)
+    for index, (raw, deflated) in enumerate(zip(content.split(placeholder), segments)):
+        if index:
+            body.append(token)
+            crc = zlib.crc32(replacement, crc)
+        body.append(deflated)
+        crc = zlib.crc32(raw, crc)
+    length = len(content) + content.count(placeholder) * (len(replacement) - len(placeholder))
+    body.append(FINAL_BLOCK)
+    body.append(struct.pack('<II', crc, length & 0xFFFFFFFF))
+    return b''.join(body)
@@ -1,11 +1,17 @@
-from .models import WebsiteSetting
+from django.utils.functional import SimpleLazyObject
+
+from . import page_cache, site_settings
+
 
 def website_info(request):
-    try:
-        website_settings = WebsiteSetting.objects.first()
-    except:
-        website_settings = None
-    
+    # Lazy, so pages that never use website_settings don't touch the cache
     return {
-        'website_settings': website_settings,
-    }
\ No newline at end of file
+        'website_settings': SimpleLazyObject(site_settings.get),
+    }
+
+
+def page_cache_csrf(request):
+    # Pages rendered for the page cache get a placeholder; each response swaps in a real token
+    if getattr(request, 'page_cache_fill', False):
+        return {'csrf_token': page_cache.CSRF_PLACEHOLDER}
+    return {}
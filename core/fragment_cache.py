@@ -0,0 +1,48 @@
+"""
+Fragment cache for the shared layout partials.
+
+    {% load fragment_cache %}
+    {% cache_fragment "navbar" request.resolver_match.url_name %}...{% endcache_fragment %}
+
+The rendered fragment is stored in the default cache under its name, any
+extra vary-on values, the visitor's user-state bucket (anonymous, user or
+staff), the WebsiteSetting version (core.site_settings) and the static
+manifest hash. Saving the settings therefore starts fresh fragments
+everywhere, and pages that can't be cached whole (anything a signed-in user
+sees) still reuse the navbar, topbar and footer. Fragments must not contain
+per-user content beyond what the bucket captures, or a CSRF token.
+"""
+import hashlib
+
+from django.conf import settings
+
+from . import metrics, page_cache, site_settings
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TIMEOUT': 60 * 60,
+}
+
+
+def get_setting(name):
+    return getattr(settings, 'FRAGMENT_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def user_bucket(context):
+    request = context.get('request')
+    user = getattr(request, 'user', None) or context.get('user')
+    if user is None or not user.is_authenticated:
+        return 'anonymous'
+    return 'staff' if user.is_staff or user.is_superuser else 'user'
+
+
+def fragment_key(name, vary_on, context):
+    raw = '|'.join([
+        user_bucket(context), site_settings.version(), page_cache.static_version(),
+        *(str(value) for value in vary_on),
+    ])
+    return f'fragment_cache:{name}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def record(name, result):
+    metrics.FRAGMENT_CACHE.labels(name, result).inc()
@@ -0,0 +1,229 @@
+"""
+Responsive image derivatives.
+
+When an image in IMAGE_FIELDS is uploaded, a background thread writes WebP
+copies of it at IMAGE_DERIVATIVES['WIDTHS'] (never wider than the
+original, EXIF orientation applied) next to it:
+
+    programs/camp.jpg
+    programs/derivatives/camp-3f9a1c0e4b2d-320w.webp
+    programs/derivatives/camp.json      <- manifest: digest and width -> name
+
+Derivative names carry a hash of the original's bytes, so replacing an
+image under the same name never serves stale copies from a browser cache.
+The {% responsive_src %} tag reads the manifest to build srcset/sizes;
+images without one just get their original src. `manage.py
+backfill_derivatives` processes existing media.
+
+Each process keeps the last MANIFEST_CACHE_SIZE manifests it read (or found
+missing) in an LRU. Generating derivatives replaces a version token in the
+shared cache, which processes re-check at most every MANIFEST_TTL seconds,
+so storage is only read again after something changed.
+"""
+import hashlib
+import io
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'WIDTHS': [160, 320, 640, 1280],
+    'QUALITY': 80,
+    'ASYNC': True,
+    'MANIFEST_TTL': 5,
+    'MANIFEST_CACHE_SIZE': 1000,
+}
+
+# (model label, image field) pairs that get derivatives
+IMAGE_FIELDS = [
+    ('users.CustomUser', 'profile_picture'),
+    ('programs.Program', 'image'),
+    ('core.BoardMember', 'photo'),
+    ('core.ExecutiveCommittee', 'photo'),
+    ('core.WebsiteSetting', 'logo'),
+]
+
+# Cached pages that show another model's images: testimonials show their author's avatar
+SHOWN_ON_PAGES_OF = {
+    'users.CustomUser': ['testimonials.Testimonial'],
+}
+
+DERIVATIVE_DIR = 'derivatives'
+VERSION_KEY = 'images:manifest_version'
+
+_manifests = OrderedDict()  # name -> manifest or None, least recently used first
+_manifests_state = {'version': None, 'checked': 0.0}
+_manifests_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_setting(name):
+    return getattr(settings, 'IMAGE_DERIVATIVES', {}).get(name, DEFAULTS[name])
+
+
+def manifest_name(name):
+    directory, filename = os.path.split(name)
+    return os.path.join(directory, DERIVATIVE_DIR, os.path.splitext(filename)[0] + '.json')
+
+
+def derivative_name(name, digest, width):
+    directory, filename = os.path.split(name)
+    return os.path.join(directory, DERIVATIVE_DIR, f'{os.path.splitext(filename)[0]}-{digest}-{width}w.webp')
+
+
+def generate(name, storage=default_storage, force=False):
+    """Write the WebP derivatives and manifest of one stored image; returns the manifest"""
+    from PIL import Image, ImageOps
+
+    with storage.open(name, 'rb') as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:12]
+
+    manifest_path = manifest_name(name)
+    if not force and storage.exists(manifest_path):
+        with storage.open(manifest_path, 'rb') as f:
+            existing = json.load(f)
+        if existing.get('digest') == digest:
+            return existing
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info or image.mode in ('LA', 'P') else 'RGB')
+
+        widths = sorted({min(width, image.width) for width in get_setting('WIDTHS')})
+        derivatives = {}
+        for width in widths:
+            height = max(1, round(image.height * width / image.width))
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, 'WEBP', quality=get_setting('QUALITY'), method=4)
+            target = derivative_name(name, digest, width)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(target, ContentFile(buffer.getvalue()))
+            derivatives[str(width)] = target
+
+    manifest = {'digest': digest, 'width': image.width, 'derivatives': derivatives}
+    if storage.exists(manifest_path):
+        storage.delete(manifest_path)
+    storage.save(manifest_path, ContentFile(json.dumps(manifest).encode()))
+    _remember(name, manifest)
+    return manifest
+
+
+def manifests_changed():
+    """Make every process read manifests from storage again, e.g. after generate()"""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    with _manifests_lock:
+        _manifests.clear()
+        _manifests_state.update(version=None, checked=0.0)
+
+
+def _remember(name, manifest):
+    with _manifests_lock:
+        _manifests[name] = manifest
+        _manifests.move_to_end(name)
+        while len(_manifests) > get_setting('MANIFEST_CACHE_SIZE'):
+            _manifests.popitem(last=False)
+
+
+def _check_version():
+    now = time.monotonic()
+    if _manifests_state['version'] is not None and now - _manifests_state['checked'] < get_setting('MANIFEST_TTL'):
+        return
+    version = cache.get_or_set(VERSION_KEY, uuid.uuid4().hex, None)
+    with _manifests_lock:
+        if version != _manifests_state['version']:
+            _manifests.clear()
+        _manifests_state.update(version=version, checked=now)
+
+
+def get_manifest(name, storage=default_storage):
+    """The derivative manifest of an image, or None"""
+    _check_version()
+    with _manifests_lock:
+        if name in _manifests:
+            _manifests.move_to_end(name)
+            return _manifests[name]
+    manifest = None
+    try:
+        with storage.open(manifest_name(name), 'rb') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        pass
+    _remember(name, manifest)
+    return manifest
+
+
+def _generate_in_background(model, name):
+    try:
+        if not default_storage.exists(name):
+            return
+        generate(name)
+    except Exception as e:
+        logger.warning(f"Could not create derivatives for {name}: {e}")
+        return
+    manifests_changed()
+    # Cached public pages were rendered without a srcset for this image
+    from django.apps import apps
+    from . import page_cache, static_site
+    for label in [model._meta.label, *SHOWN_ON_PAGES_OF.get(model._meta.label, [])]:
+        if label in page_cache.CACHED_MODELS:
+            page_model = apps.get_model(label)
+            page_cache.invalidate(sender=page_model)
+            static_site.schedule(sender=page_model)
+    # Layout fragments show the logo and are keyed on the settings version
+    if model._meta.label == 'core.WebsiteSetting':
+        from . import site_settings
+        site_settings.invalidate()
+
+
+def _submit(model, name):
+    global _executor, _executor_pid
+    if not get_setting('ASYNC'):
+        _generate_in_background(model, name)
+        return
+    with _executor_lock:
+        # The executor's thread does not survive a fork into a gunicorn worker
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-derivatives')
+            _executor_pid = os.getpid()
+        _executor.submit(_generate_in_background, model, name)
+
+
+def create_derivatives(sender, instance, update_fields=None, raw=False, **kwargs):
+    """post_save receiver: queue derivatives for image fields whose file has no manifest yet"""
+    if raw:
+        return
+    from django.db import transaction
+
+    for label, field_name in IMAGE_FIELDS:
+        if sender._meta.label != label or (update_fields is not None and field_name not in update_fields):
+            continue
+        name = getattr(instance, field_name).name
+        if name and get_manifest(name) is None:
+            transaction.on_commit(lambda name=name: _submit(sender, name))
+
+
+def connect_signals():
+    """Connect derivative generation for IMAGE_FIELDS; called from CoreConfig.ready"""
+    from django.apps import apps
+    from django.db.models.signals import post_save
+
+    for label, _field_name in IMAGE_FIELDS:
+        post_save.connect(create_derivatives, sender=apps.get_model(label), dispatch_uid=f'core.images.{label}')
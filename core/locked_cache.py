@@ -0,0 +1,70 @@
+"""
+FileBasedCache with atomic add() and incr().
+
+FileBasedCache writes each entry atomically, but add() and incr() are a read
+followed by a write, so two processes can both "add" the same key or lose an
+increment (and incr() resets the key's expiry). This backend holds an
+exclusive lock on a file in the cache directory around them, which makes
+them atomic across every process on the host (the gunicorn workers).
+Circuit breakers rely on this to share one failure count and a single
+half-open probe without Redis.
+
+The lock is fcntl.flock; where fcntl is missing (Windows) it falls back to a
+lock that only covers the threads of one process.
+"""
+import os
+import pickle
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+LOCK_FILE = 'cache.lock'  # Not *.djcache, so cull() and clear() leave it alone
+
+_thread_lock = threading.Lock()
+
+
+class LockedFileBasedCache(FileBasedCache):
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            with _thread_lock:
+                yield
+            return
+        os.makedirs(self._dir, exist_ok=True)
+        with open(os.path.join(self._dir, LOCK_FILE), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._locked():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        """Add delta to the value of key, keeping its expiry; ValueError if it is missing"""
+        with self._locked():
+            try:
+                with open(self._key_to_file(key, version), 'rb') as f:
+                    expires = pickle.load(f)
+                    value = pickle.loads(zlib.decompress(f.read()))
+            except FileNotFoundError:
+                raise ValueError(f"Key '{key}' not found")
+            remaining = None if expires is None else expires - time.time()
+            if remaining is not None and remaining <= 0:
+                self.delete(key, version)
+                raise ValueError(f"Key '{key}' not found")
+            value += delta
+            self.set(key, value, remaining, version)
+            return value
@@ -0,0 +1,76 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q, TextField
+from django.db.models.functions import Cast, Length
+from django.utils import timezone
+
+from api.models import APILog
+from core import archive
+from donations.models import CardTransaction, MpesaTransaction, PayPalTransaction
+from staff_dashboard.models import AuditLog
+
+# (model, field that dates a row) for every model with PAYLOAD_FIELDS
+TARGETS = [
+    (MpesaTransaction, 'donation__created_at'),
+    (PayPalTransaction, 'donation__created_at'),
+    (CardTransaction, 'donation__created_at'),
+    (APILog, 'created_at'),
+    (AuditLog, 'timestamp'),
+]
+
+
+class Command(BaseCommand):
+    help = 'Move old JSON payloads into compressed cold-storage segments, leaving a pointer in each row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=archive.get_setting('AFTER_DAYS'),
+                            help='Archive payloads of rows older than this many days')
+        parser.add_argument('--batch-size', type=int, default=archive.get_setting('BATCH_SIZE'),
+                            help='Payloads per compressed block')
+        parser.add_argument('--min-bytes', type=int, default=archive.get_setting('MIN_BYTES'),
+                            help='Leave payloads smaller than this in place; a pointer would not save space')
+        parser.add_argument('--model', action='append', help='Only archive this model (e.g. AuditLog); repeatable')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be archived')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        self.stdout.write(f'Archiving payloads older than {cutoff:%Y-%m-%d %H:%M} to {archive.archive_dir()}')
+
+        for model, time_field in TARGETS:
+            if options['model'] and model._meta.object_name not in options['model']:
+                continue
+            writer = archive.SegmentWriter(model._meta.label_lower)
+            for field in model.PAYLOAD_FIELDS:
+                pending = self.pending(model, time_field, field, cutoff, options['min_bytes'])
+                if options['dry_run']:
+                    self.stdout.write(f'{model._meta.object_name}.{field}: {pending.count()} payloads would be archived')
+                    continue
+                count = self.archive_field(model, field, pending, writer, options['batch_size'])
+                self.stdout.write(self.style.SUCCESS(f'{model._meta.object_name}.{field}: archived {count} payloads'))
+
+    def pending(self, model, time_field, field, cutoff, min_bytes):
+        """Old rows whose payload is big enough to archive and not archived already"""
+        return model._base_manager.filter(**{f'{time_field}__lt': cutoff}).alias(
+            payload_size=Length(Cast(field, output_field=TextField())),
+        ).filter(payload_size__gte=min_bytes).exclude(
+            Q(**{f'{field}__isnull': True}) | Q(**{f'{field}__has_key': archive.POINTER_KEY})
+        )
+
+    def archive_field(self, model, field, pending, writer, batch_size):
+        count = 0
+        last_pk = 0
+        while True:
+            # Keyset pagination: archived rows drop out of `pending`, but a failed batch must not loop forever
+            batch = list(pending.filter(pk__gt=last_pk).order_by('pk').values_list('pk', field)[:batch_size])
+            if not batch:
+                return count
+            last_pk = batch[-1][0]
+
+            # The block is on disk before any row points at it
+            pointers = writer.write_batch([(pk, field, value) for pk, value in batch])
+            rows = [model(pk=pk, **{field: pointer}) for (pk, _value), pointer in zip(batch, pointers)]
+            with transaction.atomic():
+                model._base_manager.bulk_update(rows, [field], batch_size=batch_size)
+            count += len(rows)
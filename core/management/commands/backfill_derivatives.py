@@ -0,0 +1,62 @@
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core import images
+
+
+def generate_one(name, force):
+    """Worker: returns (name, number of derivatives, error)"""
+    try:
+        manifest = images.generate(name, force=force)
+    except Exception as e:
+        return name, 0, str(e)
+    return name, len(manifest['derivatives']), None
+
+
+class Command(BaseCommand):
+    help = 'Create responsive WebP derivatives for every existing uploaded image, in parallel'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--force', action='store_true', help='Regenerate derivatives that are already up to date')
+
+    def handle(self, *args, **options):
+        names = set()
+        for label, field_name in images.IMAGE_FIELDS:
+            model = apps.get_model(label)
+            names.update(
+                model._base_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                .values_list(field_name, flat=True)
+            )
+        missing = sorted(name for name in names if not default_storage.exists(name))
+        names = sorted(names - set(missing))
+        for name in missing:
+            self.stdout.write(self.style.WARNING(f'Missing file, skipped: {name}'))
+        self.stdout.write(f'Processing {len(names)} images with {options["workers"]} workers')
+
+        # Workers are forked and only touch storage; don't share the database connection with them
+        connections.close_all()
+        created = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers']) as pool:
+            futures = [pool.submit(generate_one, name, options['force']) for name in names]
+            for future in as_completed(futures):
+                name, count, error = future.result()
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.ERROR(f'{name}: {error}'))
+                else:
+                    created += count
+                    self.stdout.write(f'{name}: {count} derivatives')
+
+        # The workers' manifests are new to every running process, and cached public pages lack srcset
+        images.manifests_changed()
+        from core import page_cache, static_site
+        for label in page_cache.CACHED_MODELS:
+            page_cache.invalidate(sender=apps.get_model(label))
+            static_site.schedule(sender=apps.get_model(label))
+        self.stdout.write(self.style.SUCCESS(f'Done: {created} derivatives, {failed} failures'))
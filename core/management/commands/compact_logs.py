@@ -0,0 +1,196 @@
+from collections import defaultdict
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from api.models import APILog, APILogHourly
+from core import archive
+from staff_dashboard.models import AuditLog, AuditLogHourly
+
+
+def hour_of(value):
+    return value.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Rollup:
+    """How one log model is summarised into its hourly table"""
+
+    def __init__(self, model, rollup_model, time_field, keys, duration_field=None):
+        self.model = model
+        self.rollup_model = rollup_model
+        self.time_field = time_field
+        self.keys = keys
+        self.duration_field = duration_field
+
+    @property
+    def name(self):
+        return self.model._meta.object_name
+
+    def summarise(self, group, values):
+        """Fill the aggregate fields of a new rollup row from one hour's values"""
+        group.count = len(values)
+        if self.duration_field:
+            group.duration_min = min(values)
+            group.duration_max = max(values)
+            group.duration_avg = sum(values) / len(values)
+            group.duration_p95 = percentile(values, 0.95)
+
+    def merge(self, existing, new):
+        """Fold a new rollup into one already stored for the same hour and key"""
+        if self.duration_field:
+            total = existing.count + new.count
+            existing.duration_avg = (existing.duration_avg * existing.count + new.duration_avg * new.count) / total
+            existing.duration_min = min(existing.duration_min, new.duration_min)
+            existing.duration_max = max(existing.duration_max, new.duration_max)
+            # Exact p95 needs the raw rows, which are gone; keep the worse of the two
+            existing.duration_p95 = max(existing.duration_p95, new.duration_p95)
+        existing.count += new.count
+
+
+ROLLUPS = [
+    Rollup(APILog, APILogHourly, 'created_at', ['endpoint', 'method', 'status_code'], duration_field='duration'),
+    Rollup(AuditLog, AuditLogHourly, 'timestamp', ['action']),
+]
+
+
+class Command(BaseCommand):
+    help = 'Roll APILog and AuditLog rows older than the hot window into hourly summaries and delete them'
+
+    def add_arguments(self, parser):
+        retention = getattr(settings, 'LOG_RETENTION', {})
+        parser.add_argument('--hot-days', type=float, default=retention.get('HOT_DAYS', 30),
+                            help='Keep raw rows newer than this many days')
+        parser.add_argument('--chunk-size', type=int, default=retention.get('CHUNK_SIZE', 2000),
+                            help='Rows deleted per DELETE statement')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be compacted')
+        parser.add_argument('--no-vacuum', action='store_true', help='Skip reclaiming free pages afterwards')
+        parser.add_argument('--enable-incremental-vacuum', action='store_true',
+                            help='SQLite only: switch the database to auto_vacuum=INCREMENTAL (runs a full VACUUM once)')
+
+    def handle(self, *args, **options):
+        if options['enable_incremental_vacuum']:
+            self.enable_incremental_vacuum()
+
+        cutoff = hour_of(timezone.now() - timedelta(days=options['hot_days']))
+        self.stdout.write(f'Compacting log rows older than {cutoff:%Y-%m-%d %H:00} UTC')
+
+        deleted = 0
+        for rollup in ROLLUPS:
+            stale = rollup.model.objects.filter(**{f'{rollup.time_field}__lt': cutoff})
+            if options['dry_run']:
+                self.stdout.write(f'{rollup.name}: {stale.count()} rows would be rolled up')
+                continue
+            rows, hours = self.compact(rollup, stale, cutoff, options['chunk_size'])
+            deleted += rows
+            self.stdout.write(self.style.SUCCESS(f'{rollup.name}: rolled {rows} rows into {hours} hourly summaries'))
+
+        # Archived payloads of the deleted rows are now unreachable
+        for segment, size in archive.collect_garbage(dry_run=options['dry_run']):
+            verb = 'Would remove' if options['dry_run'] else 'Removed'
+            self.stdout.write(f'{verb} archive segment {segment} ({size} bytes), no rows point into it')
+
+        if deleted and not options['dry_run'] and not options['no_vacuum']:
+            self.vacuum()
+
+    def compact(self, rollup, stale, cutoff, chunk_size):
+        """Roll up and delete stale rows one day at a time; each day is one transaction"""
+        oldest = stale.order_by(rollup.time_field).values_list(rollup.time_field, flat=True).first()
+        if oldest is None:
+            return 0, 0
+
+        rows = hours = 0
+        start = hour_of(oldest).replace(hour=0)
+        while start < cutoff:
+            end = min(start + timedelta(days=1), cutoff)
+            with transaction.atomic():
+                day_rows, day_hours = self.compact_window(rollup, start, end, chunk_size)
+            rows += day_rows
+            hours += day_hours
+
+            # Skip straight to the next day that has rows
+            following = stale.filter(**{f'{rollup.time_field}__gte': end}).order_by(rollup.time_field)
+            following = following.values_list(rollup.time_field, flat=True).first()
+            if following is None:
+                break
+            start = max(end, hour_of(following).replace(hour=0))
+        return rows, hours
+
+    def compact_window(self, rollup, start, end, chunk_size):
+        fields = ['pk', rollup.time_field, *rollup.keys]
+        if rollup.duration_field:
+            fields.append(rollup.duration_field)
+
+        window = rollup.model.objects.filter(**{
+            f'{rollup.time_field}__gte': start,
+            f'{rollup.time_field}__lt': end,
+        })
+        values = defaultdict(list)
+        ids = []
+        for row in window.order_by().values_list(*fields).iterator(chunk_size=chunk_size):
+            ids.append(row[0])
+            key = (hour_of(row[1]), *row[2:2 + len(rollup.keys)])
+            values[key].append(row[-1] if rollup.duration_field else 1)
+        if not ids:
+            return 0, 0
+
+        existing = {
+            (group.hour, *(getattr(group, key) for key in rollup.keys)): group
+            for group in rollup.rollup_model.objects.filter(hour__gte=start, hour__lt=end)
+        }
+        created, updated = [], []
+        for key, group_values in values.items():
+            group = rollup.rollup_model(hour=key[0], **dict(zip(rollup.keys, key[1:])))
+            rollup.summarise(group, group_values)
+            if key in existing:
+                rollup.merge(existing[key], group)
+                updated.append(existing[key])
+            else:
+                created.append(group)
+
+        rollup.rollup_model.objects.bulk_create(created, batch_size=500)
+        if updated:
+            update_fields = ['count'] + (
+                ['duration_min', 'duration_avg', 'duration_max', 'duration_p95'] if rollup.duration_field else []
+            )
+            rollup.rollup_model.objects.bulk_update(updated, update_fields, batch_size=500)
+
+        for i in range(0, len(ids), chunk_size):
+            rollup.model.objects.filter(pk__in=ids[i:i + chunk_size]).delete()
+        return len(ids), len(values)
+
+    def vacuum(self):
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('PRAGMA auto_vacuum')
+                if cursor.fetchone()[0] != 2:
+                    self.stdout.write(self.style.WARNING(
+                        'SQLite auto_vacuum is not INCREMENTAL, so freed pages stay in the file. '
+                        'Run once with --enable-incremental-vacuum to switch it on.'
+                    ))
+                    return
+                cursor.execute('PRAGMA freelist_count')
+                free_pages = cursor.fetchone()[0]
+                cursor.execute('PRAGMA incremental_vacuum')
+                cursor.fetchall()
+                self.stdout.write(f'Incremental vacuum released {free_pages} free pages')
+            elif connection.vendor == 'postgresql':
+                for rollup in ROLLUPS:
+                    cursor.execute(f'VACUUM ANALYZE {connection.ops.quote_name(rollup.model._meta.db_table)}')
+                self.stdout.write('Vacuumed log tables')
+
+    def enable_incremental_vacuum(self):
+        if connection.vendor != 'sqlite':
+            self.stdout.write('--enable-incremental-vacuum only applies to SQLite; skipping')
+            return
+        self.stdout.write('Switching SQLite to auto_vacuum=INCREMENTAL (full VACUUM, may take a while)...')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA auto_vacuum = INCREMENTAL')
+            cursor.execute('VACUUM')
@@ -0,0 +1,108 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+from django.db import models
+
+from core.images import DERIVATIVE_DIR
+from core.storage import LEGACY_BLOB_DIR, ContentAddressedStorage
+from core.theme import THEME_DIR
+
+# Interrupted uploads leave temp files in the blob store; older ones are removed
+STALE_UPLOAD_SECONDS = 60 * 60
+
+# A blob is stored before its first link is made; younger unlinked blobs are kept
+MIN_BLOB_AGE = 60 * 60
+
+
+class Command(BaseCommand):
+    help = 'Remove media blobs that no file links to any more (content-addressed storage)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adopt', action='store_true',
+                            help='First move existing plain media files into the blob store, deduplicating them')
+        parser.add_argument('--prune-unreferenced', action='store_true',
+                            help='Also delete media files no FileField/ImageField row refers to '
+                                 '(derivatives and theme stylesheets are kept), so their blobs can be collected')
+        parser.add_argument('--dry-run', action='store_true', help='Report what would be removed')
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, ContentAddressedStorage):
+            raise CommandError('The default storage is not core.storage.ContentAddressedStorage')
+
+        if not options['dry_run']:
+            moved = storage.move_legacy_blobs()
+            if moved:
+                self.stdout.write(f'Moved {moved} blobs out of MEDIA_ROOT/{LEGACY_BLOB_DIR} to {storage.blob_root}')
+        if options['adopt']:
+            self.adopt(storage, options['dry_run'])
+        if options['prune_unreferenced']:
+            self.prune_unreferenced(storage, options['dry_run'])
+
+        removed = freed = kept = 0
+        cutoff = time.time() - MIN_BLOB_AGE
+        for path, references in storage.iter_blobs():
+            if references > 0 or os.path.getmtime(path) > cutoff:
+                kept += 1
+                continue
+            removed += 1
+            freed += os.path.getsize(path)
+            if not options['dry_run']:
+                os.remove(path)
+        self.remove_stale_uploads(storage, options['dry_run'])
+
+        verb = 'Would remove' if options['dry_run'] else 'Removed'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {removed} orphaned blobs ({freed / 1024:.0f} KB); {kept} blobs still referenced'
+        ))
+
+    def media_files(self, storage):
+        for root, directories, files in os.walk(storage.location):
+            directories[:] = [directory for directory in directories if directory != LEGACY_BLOB_DIR]
+            for filename in files:
+                yield os.path.relpath(os.path.join(root, filename), storage.location).replace('\\', '/')
+
+    def adopt(self, storage, dry_run):
+        adopted = shared = 0
+        for name in self.media_files(storage):
+            if dry_run:
+                adopted += 1
+                continue
+            shared += storage.adopt(name)
+            adopted += 1
+        self.stdout.write(f'Adopted {adopted} files; {shared} were duplicates of an existing blob')
+
+    def referenced_names(self):
+        names = set()
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField):
+                    names.update(
+                        model._base_manager.exclude(**{field.attname: ''}).exclude(**{f'{field.attname}__isnull': True})
+                        .values_list(field.attname, flat=True)
+                    )
+        return names
+
+    def prune_unreferenced(self, storage, dry_run):
+        referenced = self.referenced_names()
+        pruned = 0
+        for name in self.media_files(storage):
+            if name in referenced or f'/{DERIVATIVE_DIR}/' in f'/{name}' or name.startswith(f'{THEME_DIR}/'):
+                continue
+            pruned += 1
+            self.stdout.write(f'{"Would delete" if dry_run else "Deleting"} unreferenced {name}')
+            if not dry_run:
+                storage.delete(name)
+        self.stdout.write(f'{pruned} unreferenced media files')
+
+    def remove_stale_uploads(self, storage, dry_run):
+        if not os.path.isdir(storage.blob_root):
+            return
+        cutoff = time.time() - STALE_UPLOAD_SECONDS
+        for filename in os.listdir(storage.blob_root):
+            path = os.path.join(storage.blob_root, filename)
+            if filename.startswith('.upload-') and os.path.getmtime(path) < cutoff and not dry_run:
+                os.remove(path)
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client, RequestFactory, override_settings
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = 'Render a page with the template profiler on and show where the render time goes, per include/for node'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='URL path to render, e.g. /staff/donations/')
+        parser.add_argument('--user', help='Email or username to render the page as')
+        parser.add_argument('--repeat', type=int, default=5, help='Renders to average over (after one warm-up render)')
+        parser.add_argument('--limit', type=int, default=20, help='Number of nodes to show')
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST='localhost')
+        if options['user']:
+            from django.contrib.auth import get_user_model
+            from django.db.models import Q
+
+            User = get_user_model()
+            user = User.objects.filter(Q(email=options['user']) | Q(username=options['user'])).first()
+            if user is None:
+                raise CommandError(f"No user {options['user']}")
+            client.force_login(user)
+
+        # Cached pages skip rendering, so profile the real render
+        with override_settings(PAGE_CACHE={'ENABLED': False}):
+            client.get(options['path'])
+            profiles = [self.render(client, options['path']) for _ in range(max(1, options['repeat']))]
+
+        runs = len(profiles)
+        template_ms = sum(profile.template_ms for profile in profiles) / runs
+        totals = {}
+        for profile in profiles:
+            for label, (renders, seconds) in profile.template_nodes.items():
+                entry = totals.setdefault(label, [0, 0.0])
+                entry[0] += renders
+                entry[1] += seconds
+        self.stdout.write(
+            f"{options['path']}: {sum(profile.duration_ms for profile in profiles) / runs:.1f} ms total, "
+            f"{template_ms:.1f} ms in templates (mean of {runs})\n"
+        )
+        self.stdout.write(f"{'ms':>8} {'share':>6} {'renders':>8}  node")
+        for label, (renders, seconds) in sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:options['limit']]:
+            ms = seconds * 1000 / runs
+            share = ms / template_ms * 100 if template_ms else 0
+            self.stdout.write(f"{ms:>8.1f} {share:>5.0f}% {renders // runs:>8}  {label}")
+
+    def render(self, client, path):
+        profile = profiling.RequestProfile(RequestFactory().get(path))
+        token = profiling.activate(profile)
+        try:
+            response = client.get(path)
+        finally:
+            profiling.deactivate(token)
+        if response.status_code != 200:
+            raise CommandError(f'{path} returned {response.status_code}')
+        profile.finish(response)
+        return profile
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import static_site
+
+
+class Command(BaseCommand):
+    help = 'Pre-render the public pages to HTML files a front-end server can serve directly'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--root', help="Output directory (default: STATIC_SITE['ROOT'])")
+
+    def handle(self, *args, **options):
+        root = options['root'] or static_site.get_setting('ROOT')
+        start = time.perf_counter()
+        written, removed = static_site.export(root=root)
+        for path in removed:
+            self.stdout.write(f'Removed {path}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Rendered {len(written)} pages to {root} in {time.perf_counter() - start:.1f}s'
+            + (f', removed {len(removed)}' if removed else '')
+        ))
@@ -0,0 +1,434 @@
+import json
+import random
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, models, transaction
+from django.db.models import DateTimeField, JSONField
+from django.utils import timezone
+
+from core.models import ContactMessage
+from donations.models import Donation
+from staff_dashboard.models import AuditLog
+from testimonials.models import Testimonial
+from users.models import CustomUser
+
+FIRST_NAMES = [
+    'Wanjiku', 'Kamau', 'Achieng', 'Otieno', 'Njeri', 'Mwangi', 'Akinyi', 'Kiprop', 'Chebet', 'Mutua',
+    'Auma', 'Odhiambo', 'Wambui', 'Kiptoo', 'Nyambura', 'Omondi', 'Jepkosgei', 'Kariuki', 'Atieno', 'Maina',
+    'Grace', 'Brian', 'Faith', 'Kevin', 'Mercy', 'Dennis', 'Sarah', 'James', 'Emily', 'David',
+    'Anna', 'Peter', 'Maria', 'John', 'Laura', 'Michael', 'Sophie', 'Daniel', 'Hannah', 'Samuel',
+]
+LAST_NAMES = [
+    'Kamau', 'Otieno', 'Mwangi', 'Ochieng', 'Wanjiru', 'Kiprotich', 'Mutiso', 'Njoroge', 'Onyango', 'Kiplagat',
+    'Wafula', 'Nyaga', 'Muthoni', 'Chege', 'Odera', 'Koech', 'Barasa', 'Ndungu', 'Kimani', 'Rotich',
+    'Smith', 'Johnson', 'Brown', 'Müller', 'Schmidt', 'Dubois', 'Rossi', 'Andersson', 'Tanaka', 'Wilson',
+]
+EMAIL_DOMAINS = [('gmail.com', 60), ('yahoo.com', 15), ('outlook.com', 12), ('hotmail.com', 8), ('example.org', 5)]
+
+# payment method -> weight, and the currency mix each method is used with
+PAYMENT_METHODS = [('mpesa', 62), ('card', 26), ('paypal', 12)]
+METHOD_CURRENCIES = {
+    'mpesa': [('KES', 1)],
+    'card': [('USD', 40), ('KES', 18), ('EUR', 14), ('GBP', 10), ('CAD', 5), ('AUD', 4), ('CHF', 2),
+             ('SEK', 2), ('JPY', 2), ('NZD', 2), ('CNY', 1)],
+    'paypal': [('USD', 50), ('EUR', 20), ('GBP', 15), ('CAD', 6), ('AUD', 5), ('CHF', 2), ('JPY', 2)],
+}
+# median donation and the "round" amounts people actually pick, per currency
+CURRENCY_AMOUNTS = {
+    'KES': (1000, [100, 200, 500, 1000, 2000, 5000, 10000]),
+    'USD': (25, [5, 10, 20, 25, 50, 100, 250]),
+    'EUR': (25, [5, 10, 20, 25, 50, 100]),
+    'GBP': (20, [5, 10, 20, 25, 50, 100]),
+    'CAD': (30, [10, 20, 25, 50, 100]),
+    'AUD': (30, [10, 20, 25, 50, 100]),
+    'CHF': (25, [10, 20, 50, 100]),
+    'SEK': (250, [100, 200, 250, 500, 1000]),
+    'JPY': (3000, [1000, 3000, 5000, 10000]),
+    'NZD': (30, [10, 20, 50, 100]),
+    'CNY': (150, [50, 100, 200, 500]),
+}
+STATUSES = {
+    'mpesa': [('completed', 74), ('failed', 14), ('cancelled', 7), ('pending', 5)],
+    'card': [('completed', 85), ('failed', 9), ('pending', 4), ('cancelled', 2)],
+    'paypal': [('completed', 80), ('cancelled', 10), ('pending', 6), ('failed', 4)],
+}
+
+MESSAGE_SUBJECTS = [
+    'Volunteering opportunities', 'Question about my donation receipt', 'Partnership enquiry',
+    'Mentorship programme', 'Request for support', 'Media enquiry', 'Speaking at our school',
+    'Corporate sponsorship', 'Feedback on the website', 'Update my contact details',
+]
+MESSAGE_BODIES = [
+    'Hello, I would like to know more about {subject_lower}. Please get back to me when you can.',
+    'Hi team, I came across your work and wanted to reach out regarding {subject_lower}. Thank you.',
+    'Good afternoon. Could someone from Youth Shield contact me about {subject_lower}? Regards.',
+]
+TESTIMONIAL_BODIES = [
+    'The mentorship programme changed how I see my future. I am now back in school and confident.',
+    'Youth Shield gave our community a safe space for young people. The volunteers are amazing.',
+    'I donated for the first time last year and the updates on the programmes have been inspiring.',
+    'The career building sessions helped me land my first job. I am grateful to every mentor.',
+    'Through the rehabilitation programme my brother found support when we had nowhere else to turn.',
+]
+TESTIMONIAL_POSITIONS = ['Programme graduate', 'Parent', 'Volunteer', 'Donor', 'Mentor', 'Teacher', None]
+TESTIMONIAL_STATUSES = [('approved', 70), ('pending', 20), ('rejected', 10)]
+
+AUDIT_ACTIONS = [
+    ('view', 55), ('login', 14), ('logout', 8), ('update', 8), ('create', 5),
+    ('export', 3), ('delete', 2), ('other', 2), ('settings', 2), ('backup', 1),
+]
+AUDIT_URLS = {
+    'view': ['/staff/', '/staff/donations/', '/staff/users/', '/staff/testimonials/', '/staff/messages/',
+             '/staff/programs/', '/staff/audit-logs/'],
+    'login': ['/users/login/'],
+    'logout': ['/users/logout/'],
+    'create': ['/staff/programs/create/', '/staff/users/create/'],
+    'update': ['/staff/settings/', '/staff/testimonials/', '/staff/users/'],
+    'delete': ['/staff/messages/', '/staff/testimonials/'],
+    'export': ['/staff/donations/export/', '/staff/audit-logs/export/'],
+    'settings': ['/staff/settings/'],
+    'backup': ['/staff/backup/'],
+    'other': ['/staff/'],
+}
+AUDIT_MODELS = {
+    'create': ['Program', 'CustomUser'],
+    'update': ['WebsiteSetting', 'Testimonial', 'CustomUser', 'Donation'],
+    'delete': ['ContactMessage', 'Testimonial'],
+}
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15',
+    'Mozilla/5.0 (Linux; Android 13; SM-A145F) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Mobile Safari/537.36',
+    'Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148',
+]
+
+
+def split(weighted):
+    """Turn [(value, weight), ...] into (values, cumulative weights) for random.choices"""
+    values, cum_weights, total = [], [], 0
+    for value, weight in weighted:
+        total += weight
+        values.append(value)
+        cum_weights.append(total)
+    return values, cum_weights
+
+
+class RowWriter:
+    """
+    Insert plain tuples for ``columns`` of ``model`` with one prepared
+    executemany per batch.
+
+    bulk_create runs every value of every row through the SQL compiler and
+    splits batches to fit SQLite's 999-parameter limit, which caps it at a few
+    thousand rows a second; that is hours for 10M donations. Values here are
+    prepared once per column type, and every other concrete field gets its
+    model default, so rows look exactly like ones the ORM would write.
+    """
+
+    def __init__(self, model, columns):
+        ops = connection.ops
+        fields = [field for field in model._meta.concrete_fields if not field.primary_key]
+        given = [model._meta.get_field(name) for name in columns]
+        rest = [field for field in fields if field.attname not in columns]
+        self.preparers = [self.preparer(field) for field in given]
+        self.defaults = tuple(field.get_db_prep_save(field.get_default(), connection) for field in rest)
+        names = ', '.join(ops.quote_name(field.column) for field in given + rest)
+        placeholders = ', '.join(['%s'] * (len(given) + len(rest)))
+        self.sql = f'INSERT INTO {ops.quote_name(model._meta.db_table)} ({names}) VALUES ({placeholders})'
+
+    @staticmethod
+    def preparer(field):
+        if isinstance(field, DateTimeField):
+            return connection.ops.adapt_datetimefield_value
+        if isinstance(field, JSONField):
+            return lambda value: json.dumps(value) if value is not None else None
+        return None
+
+    def write(self, rows):
+        preparers = list(enumerate(self.preparers))
+        prepared = []
+        for row in rows:
+            row = list(row)
+            for index, prepare in preparers:
+                if prepare is not None and row[index] is not None:
+                    row[index] = prepare(row[index])
+            prepared.append(tuple(row) + self.defaults)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(self.sql, prepared)
+
+
+class Command(BaseCommand):
+    help = 'Generate a large synthetic dataset (users, donations, messages, audit logs) for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=0, help='Number of users to create')
+        parser.add_argument('--donations', type=int, default=0, help='Number of donations to create')
+        parser.add_argument('--messages', type=int, default=0, help='Number of contact messages to create')
+        parser.add_argument('--audit', type=int, default=0, help='Number of audit log entries to create')
+        parser.add_argument(
+            '--testimonials',
+            type=int,
+            help='Number of testimonials for the new users (default: 5%% of --users, at most one per user)',
+        )
+        parser.add_argument('--staff-ratio', type=float, default=0.002, help='Share of new users that are staff')
+        parser.add_argument('--years', type=float, default=5, help='How far back the timestamps go')
+        parser.add_argument(
+            '--growth',
+            type=float,
+            default=2.0,
+            help='How strongly activity is skewed towards the present (1 = even spread)',
+        )
+        parser.add_argument('--guest-ratio', type=float, default=0.35, help='Share of donations made without an account')
+        parser.add_argument('--password', default='seed-password', help='Password shared by every generated user')
+        parser.add_argument('--batch-size', type=int, default=10000, help='Rows per INSERT batch and transaction')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed, for reproducible datasets')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive')
+        if options['growth'] <= 0:
+            raise CommandError('--growth must be positive')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.growth = options['growth']
+        self.end = timezone.now().timestamp()
+        self.start = self.end - options['years'] * 365 * 86400
+
+        if connection.vendor == 'sqlite' and not connection.in_atomic_block:
+            # Throwaway data: skip the fsync on every commit. Only affects this connection.
+            with connection.cursor() as cursor:
+                cursor.execute('PRAGMA synchronous = OFF')
+                cursor.execute('PRAGMA cache_size = -200000')
+
+        started = time.monotonic()
+        new_users = self.create_users(options['users'], options['staff_ratio'], options['password'])
+        testimonials = options['testimonials']
+        if testimonials is None:
+            testimonials = len(new_users) // 20
+        self.create_testimonials(new_users, testimonials)
+        self.create_donations(options['donations'], options['guest_ratio'])
+        self.create_messages(options['messages'])
+        self.create_audit_logs(options['audit'])
+        self.stdout.write(self.style.SUCCESS(f'Done in {time.monotonic() - started:.1f}s'))
+
+    # Helpers
+
+    def timestamps(self, count):
+        """
+        Yield ``count`` ascending datetimes between --years ago and now.
+
+        Stratified samples pushed through the inverse CDF of x**growth, so the
+        series is skewed towards the present and already in chronological order
+        (ids and receipt numbers then grow with time, as they do in production).
+        """
+        span = self.end - self.start
+        exponent = 1 / self.growth
+        rng = self.rng.random
+        for i in range(count):
+            fraction = ((i + rng()) / count) ** exponent
+            yield datetime.fromtimestamp(self.start + span * fraction, dt_timezone.utc)
+
+    def batches(self, count):
+        for offset in range(0, count, self.batch_size):
+            yield offset, min(self.batch_size, count - offset)
+
+    def insert(self, label, model, columns, count, build):
+        """Write ``count`` rows built by ``build(offset, size)``, one transaction per batch"""
+        if count <= 0:
+            return
+        writer = RowWriter(model, columns)
+        started = time.monotonic()
+        for offset, size in self.batches(count):
+            writer.write(build(offset, size))
+            done = offset + size
+            if done == count or (done // self.batch_size) % 10 == 0:
+                elapsed = time.monotonic() - started
+                self.stdout.write(f'  {label}: {done:,}/{count:,} ({done / elapsed:,.0f} rows/s)')
+
+    def person(self):
+        first = self.rng.choice(FIRST_NAMES)
+        last = self.rng.choice(LAST_NAMES)
+        return first, last
+
+    def amount(self, currency):
+        median, round_amounts = CURRENCY_AMOUNTS[currency]
+        if self.rng.random() < 0.7:
+            value = self.rng.choice(round_amounts)
+        else:
+            value = round(self.rng.lognormvariate(0, 0.9) * median, 2) or median
+        return Decimal(value).quantize(Decimal('0.01'))
+
+    def ip_address(self):
+        rng = self.rng
+        return f'{rng.choice([41, 102, 105, 154, 196, 197])}.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}'
+
+    # Generators
+
+    def create_users(self, count, staff_ratio, password):
+        if count <= 0:
+            return []
+        self.stdout.write(f'Creating {count:,} users...')
+        # One hash for everyone: hashing per user would dominate the run time
+        password_hash = make_password(password)
+        first_index = (CustomUser.objects.aggregate(models.Max('pk'))['pk__max'] or 0) + 1
+        domains, domain_weights = split(EMAIL_DOMAINS)
+        joined_times = self.timestamps(count)
+        rng = self.rng
+        columns = [
+            'username', 'email', 'first_name', 'last_name', 'password', 'user_type', 'is_staff',
+            'phone_number', 'date_joined', 'last_login', 'created_at', 'updated_at',
+        ]
+
+        def build(offset, size):
+            for i in range(first_index + offset, first_index + offset + size):
+                joined = next(joined_times)
+                first, last = self.person()
+                is_staff = rng.random() < staff_ratio
+                domain = rng.choices(domains, cum_weights=domain_weights)[0]
+                last_login = joined + timedelta(days=rng.randint(0, 400)) if rng.random() < 0.6 else None
+                yield (
+                    f'seed_{i:08d}', f'{first}.{last}.{i}@{domain}'.lower(), first, last, password_hash,
+                    'staff' if is_staff else 'user', is_staff, f'07{rng.randint(0, 99999999):08d}',
+                    joined, last_login, joined, joined,
+                )
+
+        self.insert('users', CustomUser, columns, count, build)
+        return list(
+            CustomUser.objects.filter(username__startswith='seed_', pk__gte=first_index).values_list('pk', flat=True)
+        )
+
+    def create_testimonials(self, user_ids, count):
+        count = min(count, len(user_ids))
+        if count <= 0:
+            return
+        self.stdout.write(f'Creating {count:,} testimonials...')
+        # One per user (the one_testimonial_per_user constraint), dated after the author joined
+        authors = sorted(self.rng.sample(user_ids, count))
+        joined = dict(CustomUser.objects.filter(pk__in=authors).values_list('pk', 'date_joined'))
+        reviewers = list(CustomUser.objects.filter(is_staff=True).values_list('pk', flat=True)[:50])
+        statuses, status_weights = split(TESTIMONIAL_STATUSES)
+        rng = self.rng
+        columns = [
+            'user_id', 'content', 'position', 'rating', 'status', 'reviewed_by_id', 'reviewed_at',
+            'created_at', 'updated_at',
+        ]
+
+        def build(offset, size):
+            for user_id in authors[offset:offset + size]:
+                since_joined = self.end - joined[user_id].timestamp()
+                created = joined[user_id] + timedelta(seconds=rng.random() * since_joined)
+                status = rng.choices(statuses, cum_weights=status_weights)[0]
+                reviewed_at = created + timedelta(hours=rng.randint(1, 96)) if status != 'pending' else None
+                yield (
+                    user_id, rng.choice(TESTIMONIAL_BODIES), rng.choice(TESTIMONIAL_POSITIONS),
+                    rng.choices([5, 4, 3, 2, 1], weights=[55, 28, 10, 4, 3])[0], status,
+                    rng.choice(reviewers) if reviewed_at and reviewers else None, reviewed_at,
+                    created, reviewed_at or created,
+                )
+
+        self.insert('testimonials', Testimonial, columns, count, build)
+
+    def create_donations(self, count, guest_ratio):
+        if count <= 0:
+            return
+        self.stdout.write(f'Creating {count:,} donations...')
+        donors = list(CustomUser.objects.values_list('pk', 'first_name', 'last_name', 'email', 'phone_number'))
+        # Receipt numbers are allocated up front as one contiguous block after the current maximum
+        next_receipt = (Donation.objects.aggregate(models.Max('receipt_number'))['receipt_number__max'] or 0) + 1
+        methods, method_weights = split(PAYMENT_METHODS)
+        currencies = {method: split(mix) for method, mix in METHOD_CURRENCIES.items()}
+        statuses = {method: split(mix) for method, mix in STATUSES.items()}
+        created_times = self.timestamps(count)
+        rng = self.rng
+        columns = [
+            'donor_id', 'amount', 'currency', 'payment_method', 'transaction_id', 'receipt_number', 'status',
+            'donor_name', 'donor_email', 'donor_phone', 'is_anonymous', 'created_at', 'updated_at',
+        ]
+
+        def build(offset, size):
+            for i in range(offset, offset + size):
+                created = next(created_times)
+                method = rng.choices(methods, cum_weights=method_weights)[0]
+                currency_values, currency_weights = currencies[method]
+                currency = rng.choices(currency_values, cum_weights=currency_weights)[0]
+                status_values, status_weights = statuses[method]
+                status = rng.choices(status_values, cum_weights=status_weights)[0]
+                if donors and rng.random() >= guest_ratio:
+                    donor_id, first, last, email, phone = rng.choice(donors)
+                    name = f'{first} {last}'.strip() or email
+                else:
+                    donor_id = None
+                    first, last = self.person()
+                    name = f'{first} {last}'
+                    email = f'{first}.{last}{rng.randint(1, 999)}@gmail.com'.lower()
+                    phone = f'07{rng.randint(0, 99999999):08d}'
+                updated = created + timedelta(seconds=rng.randint(5, 300)) if status != 'pending' else created
+                yield (
+                    donor_id, self.amount(currency), currency, method, f'DON-{created:%Y%m%d%H%M%S}-{i:08X}',
+                    next_receipt + i, status, name, email, phone if method == 'mpesa' else '',
+                    rng.random() < 0.12, created, updated,
+                )
+
+        self.insert('donations', Donation, columns, count, build)
+
+    def create_messages(self, count):
+        if count <= 0:
+            return
+        self.stdout.write(f'Creating {count:,} contact messages...')
+        created_times = self.timestamps(count)
+        rng = self.rng
+        columns = ['name', 'email', 'phone', 'subject', 'message', 'is_seen', 'resolved', 'created_at']
+
+        def build(offset, size):
+            for _ in range(size):
+                created = next(created_times)
+                first, last = self.person()
+                subject = rng.choice(MESSAGE_SUBJECTS)
+                age_days = (self.end - created.timestamp()) / 86400
+                # Older messages have almost all been read and dealt with
+                is_seen = age_days > 14 or rng.random() < 0.5
+                resolved = is_seen and (age_days > 30 or rng.random() < 0.4)
+                yield (
+                    f'{first} {last}', f'{first}.{last}{rng.randint(1, 999)}@gmail.com'.lower(),
+                    f'07{rng.randint(0, 99999999):08d}', subject,
+                    rng.choice(MESSAGE_BODIES).format(subject_lower=subject.lower()), is_seen, resolved, created,
+                )
+
+        self.insert('messages', ContactMessage, columns, count, build)
+
+    def create_audit_logs(self, count):
+        if count <= 0:
+            return
+        self.stdout.write(f'Creating {count:,} audit log entries...')
+        staff = list(CustomUser.objects.filter(is_staff=True).values_list('pk', flat=True))
+        if not staff:
+            staff = list(CustomUser.objects.values_list('pk', flat=True)[:100])
+        actions, action_weights = split(AUDIT_ACTIONS)
+        ips = [self.ip_address() for _ in range(max(50, len(staff) * 3))]
+        created_times = self.timestamps(count)
+        rng = self.rng
+        columns = [
+            'user_id', 'action', 'ip_address', 'url', 'method', 'details', 'model_name', 'object_id', 'message',
+            'timestamp', 'user_agent',
+        ]
+
+        def build(offset, size):
+            for _ in range(size):
+                created = next(created_times)
+                action = rng.choices(actions, cum_weights=action_weights)[0]
+                url = rng.choice(AUDIT_URLS[action])
+                model_name = rng.choice(AUDIT_MODELS[action]) if action in AUDIT_MODELS else ''
+                yield (
+                    rng.choice(staff) if staff else None, action, rng.choice(ips), url,
+                    'GET' if action in ('view', 'export') else 'POST',
+                    {'path': url} if action != 'view' else None, model_name,
+                    str(rng.randint(1, 5000)) if model_name else '', f'{action.title()} {model_name or url}',
+                    created, rng.choice(USER_AGENTS),
+                )
+
+        self.insert('audit logs', AuditLog, columns, count, build)
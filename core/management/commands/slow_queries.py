@@ -0,0 +1,118 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.slow_queries import log_path
+
+# Plan lines that mean a table is read without a usable index
+FULL_SCAN_MARKERS = ('Seq Scan', 'Full Table Scan', 'type: ALL')
+
+
+def needs_index(plan_line):
+    """True for plan lines that read a whole table or sort without an index"""
+    if plan_line.startswith('SCAN ') and plan_line != 'SCAN CONSTANT ROW':
+        return True  # SQLite reads every row of the table (or of an index, in index order)
+    if 'USE TEMP B-TREE' in plan_line:
+        return True  # SQLite sort/group without a usable index
+    return any(marker in plan_line for marker in FULL_SCAN_MARKERS)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class Command(BaseCommand):
+    help = 'Summarise the slow-query log by SQL fingerprint, with query plans that suggest missing indexes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', help='Slow-query log to read (default: SLOW_QUERY_LOG["PATH"])')
+        parser.add_argument('--days', type=float, help='Only include queries from the last N days')
+        parser.add_argument('--sort', choices=['total', 'count', 'mean', 'max'], default='total')
+        parser.add_argument('--limit', type=int, default=20, help='Number of fingerprints to show')
+        parser.add_argument('--scans-only', action='store_true',
+                            help='Only show fingerprints whose plan reads a table without an index')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+        parser.add_argument('--clear', action='store_true', help='Delete the log after reporting')
+
+    def handle(self, *args, **options):
+        path = options['path'] or log_path()
+        if not os.path.exists(path):
+            raise CommandError(f'No slow-query log at {path}')
+
+        since = timezone.now() - timedelta(days=options['days']) if options['days'] else None
+        groups = self.aggregate(path, since)
+        rows = sorted(groups.values(), key=lambda group: group[options['sort']], reverse=True)
+        if options['scans_only']:
+            rows = [row for row in rows if row['index_hints']]
+        rows = rows[:options['limit']]
+
+        if options['json']:
+            self.stdout.write(json.dumps(rows, indent=2))
+        else:
+            self.print_report(rows, len(groups), path)
+
+        if options['clear']:
+            os.remove(path)
+            self.stdout.write(f'Removed {path}')
+
+    def aggregate(self, path, since):
+        groups = {}
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if since and datetime.fromisoformat(entry['timestamp']) < since:
+                    continue
+
+                group = groups.setdefault(entry['fingerprint_id'], {
+                    'fingerprint_id': entry['fingerprint_id'],
+                    'fingerprint': entry['fingerprint'],
+                    'durations': [],
+                    'call_sites': {},
+                    'plan': None,
+                    'last_seen': entry['timestamp'],
+                })
+                group['durations'].append(entry['duration_ms'])
+                site = entry.get('call_site') or 'unknown'
+                group['call_sites'][site] = group['call_sites'].get(site, 0) + 1
+                group['last_seen'] = max(group['last_seen'], entry['timestamp'])
+                if entry.get('plan'):
+                    group['plan'] = entry['plan']
+
+        for group in groups.values():
+            durations = group.pop('durations')
+            group['count'] = len(durations)
+            group['total'] = round(sum(durations), 2)
+            group['mean'] = round(group['total'] / len(durations), 2)
+            group['p95'] = percentile(durations, 0.95)
+            group['max'] = max(durations)
+            group['index_hints'] = [line for line in group['plan'] or [] if needs_index(line)]
+        return groups
+
+    def print_report(self, rows, fingerprint_count, path):
+        self.stdout.write(f'{fingerprint_count} slow query fingerprints in {path}\n')
+        if not rows:
+            self.stdout.write('Nothing to report.')
+            return
+
+        for rank, row in enumerate(rows, 1):
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"#{rank} [{row['fingerprint_id']}] {row['count']} calls, total {row['total']:.0f} ms, "
+                f"mean {row['mean']:.1f} ms, p95 {row['p95']:.1f} ms, max {row['max']:.1f} ms"
+            ))
+            self.stdout.write(f"  {row['fingerprint'][:500]}")
+            for site, count in sorted(row['call_sites'].items(), key=lambda item: -item[1])[:5]:
+                self.stdout.write(f'  called from {site} ({count}x)')
+            if row['plan']:
+                self.stdout.write('  plan:')
+                for line in row['plan']:
+                    self.stdout.write(f'    {line}')
+            for hint in row['index_hints']:
+                self.stdout.write(self.style.WARNING(f'  possible missing index: {hint}'))
+            self.stdout.write('')
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from core.warmup import warm_up
+
+
+class Command(BaseCommand):
+    help = 'Compile every URL pattern and template and prime the settings and page caches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--show-broken', action='store_true', help='List templates that failed to compile')
+
+    def handle(self, *args, **options):
+        results = warm_up()
+        failed = False
+        for step, (result, seconds) in results.items():
+            if isinstance(result, Exception):
+                failed = True
+                self.stdout.write(self.style.ERROR(f'{step}: failed after {seconds * 1000:.0f} ms: {result}'))
+            elif step == 'templates':
+                loaded, broken = result
+                self.stdout.write(f'{step}: {loaded} compiled, {len(broken)} broken in {seconds * 1000:.0f} ms')
+                if options['show_broken']:
+                    for line in broken:
+                        self.stdout.write(f'  {line}')
+            elif step == 'urls':
+                self.stdout.write(f'{step}: {result} patterns in {seconds * 1000:.0f} ms')
+            else:
+                self.stdout.write(f'{step}: done in {seconds * 1000:.0f} ms')
+        if not failed:
+            self.stdout.write(self.style.SUCCESS('Warm'))
@@ -0,0 +1,162 @@
+"""
+Prometheus metrics served at /metrics.
+
+Under gunicorn each worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+(set up in gunicorn.conf.py) and the scrape merges every worker's files, so
+whichever worker answers the scrape reports totals for the whole server.
+Without that variable the metrics only cover the current process, which is
+what runserver and the test suite use.
+"""
+import os
+import time
+
+from django.utils import timezone
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import GaugeMetricFamily
+from prometheus_client.multiprocess import MultiProcessCollector
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+PROVIDERS = ('mpesa', 'paypal', 'stripe')
+
+REQUEST_LATENCY = Histogram(
+    'youthshield_http_request_duration_seconds',
+    'Time spent handling a request, by URL name',
+    ['view', 'method', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+REQUEST_QUERIES = Histogram(
+    'youthshield_http_request_db_queries',
+    'Database queries run while handling a request',
+    ['view'],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_TIME = Histogram(
+    'youthshield_http_request_db_duration_seconds',
+    'Time spent in database queries while handling a request',
+    ['view'],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_LATENCY = Histogram(
+    'youthshield_provider_request_duration_seconds',
+    'Outbound payment provider call latency',
+    ['provider', 'operation'],
+    buckets=LATENCY_BUCKETS,
+)
+PROVIDER_ERRORS = Counter(
+    'youthshield_provider_errors_total',
+    'Failed or rejected payment provider calls',
+    ['provider', 'operation', 'reason'],
+)
+BACKUP_RUNS = Counter(
+    'youthshield_backup_runs_total',
+    'Database backup attempts by outcome',
+    ['job', 'outcome'],
+)
+BACKUP_LAST_SUCCESS = Gauge(
+    'youthshield_backup_last_success_timestamp_seconds',
+    'Unix time of the last successful database backup',
+    ['job'],
+    multiprocess_mode='max',
+)
+BACKUP_SIZE = Gauge(
+    'youthshield_backup_last_size_bytes',
+    'Size of the most recent successful database backup',
+    ['job'],
+    multiprocess_mode='mostrecent',
+)
+BUFFER_DEPTH = Gauge(
+    'youthshield_write_buffer_pending_rows',
+    'Rows queued in buffered writers and not yet inserted',
+    ['model'],
+    multiprocess_mode='livesum',
+)
+BUFFER_WRITTEN = Counter(
+    'youthshield_write_buffer_written_rows_total',
+    'Rows inserted by buffered writers',
+    ['model'],
+)
+BUFFER_DROPPED = Counter(
+    'youthshield_write_buffer_dropped_rows_total',
+    'Rows dropped because a write buffer was full or its insert failed',
+    ['model'],
+)
+PAGE_CACHE = Counter(
+    'youthshield_page_cache_requests_total',
+    'Anonymous public page requests answered from the page cache (hit) or rendered (miss)',
+    ['view', 'result'],
+)
+FRAGMENT_CACHE = Counter(
+    'youthshield_fragment_cache_renders_total',
+    'Layout fragments served from the fragment cache (hit) or rendered (miss)',
+    ['fragment', 'result'],
+)
+
+
+def multiprocess_dir():
+    return os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+
+def observe_request(view, method, status, seconds, query_count, query_seconds):
+    REQUEST_LATENCY.labels(view, method, status).observe(seconds)
+    REQUEST_QUERIES.labels(view).observe(query_count)
+    REQUEST_DB_TIME.labels(view).observe(query_seconds)
+
+
+def observe_provider_call(provider, operation, seconds):
+    PROVIDER_LATENCY.labels(provider, operation).observe(seconds)
+
+
+def count_provider_error(provider, operation, reason):
+    PROVIDER_ERRORS.labels(provider, operation, reason).inc()
+
+
+def record_backup(job, success, file_size=None):
+    """Count one backup attempt; job is the BackupJob name or 'manual'"""
+    BACKUP_RUNS.labels(job, 'success' if success else 'failure').inc()
+    if success:
+        BACKUP_LAST_SUCCESS.labels(job).set(time.time())
+        if file_size is not None:
+            BACKUP_SIZE.labels(job).set(file_size)
+
+
+class ScrapeTimeCollector:
+    """Gauges read from the database and cache when /metrics is scraped"""
+
+    def collect(self):
+        from django.db.models import Count, Min
+        from donations.models import Donation
+        from donations.providers import get_breaker
+
+        pending = GaugeMetricFamily(
+            'youthshield_donations_pending', 'Donations awaiting payment confirmation',
+            labels=['payment_method'],
+        )
+        oldest = GaugeMetricFamily(
+            'youthshield_donations_pending_oldest_age_seconds', 'Age of the oldest pending donation',
+            labels=['payment_method'],
+        )
+        now = timezone.now()
+        rows = (Donation.objects.filter(status='pending').order_by()
+                .values('payment_method').annotate(count=Count('id'), oldest=Min('created_at')))
+        for row in rows:
+            pending.add_metric([row['payment_method']], row['count'])
+            oldest.add_metric([row['payment_method']], (now - row['oldest']).total_seconds())
+        yield pending
+        yield oldest
+
+        circuits = GaugeMetricFamily(
+            'youthshield_provider_circuit_open', '1 while the provider\'s circuit breaker is open or half-open',
+            labels=['provider'],
+        )
+        for provider in PROVIDERS:
+            circuits.add_metric([provider], 0 if get_breaker(provider).state == 'closed' else 1)
+        yield circuits
+
+
+def render_metrics():
+    """Return the exposition text for every worker plus the scrape-time gauges"""
+    registry = CollectorRegistry()
+    registry.register(MultiProcessCollector(None) if multiprocess_dir() else REGISTRY)
+    registry.register(ScrapeTimeCollector())
+    return generate_latest(registry)
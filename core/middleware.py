@@ -0,0 +1,185 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+from django.shortcuts import render
+
+from . import compression, metrics, profiling, site_settings
+
+# The QueryCounters of the request being handled in this thread
+_query_counters = ContextVar('query_counters', default=())
+
+
+class QueryCounter:
+    """Counts the queries run, and their total time, while active() in this context"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    @contextmanager
+    def active(self):
+        token = _query_counters.set(_query_counters.get() + (self,))
+        try:
+            yield self
+        finally:
+            _query_counters.reset(token)
+
+
+def count_queries(execute, sql, params, many, context):
+    """execute_wrapper that adds each query to the active QueryCounters"""
+    counters = _query_counters.get()
+    if not counters:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        for counter in counters:
+            counter.count += 1
+            counter.duration += duration
+
+
+def install_query_counting(sender=None, connection=None, **kwargs):
+    """connection_created receiver: add count_queries once per connection, for the life of the connection"""
+    connection = connection or connections['default']
+    if count_queries not in connection.execute_wrappers:
+        # At the front so execute_wrapper()'s pop() never removes it
+        connection.execute_wrappers.insert(0, count_queries)
+
+
+class QueryCountMiddleware:
+    """
+    Add X-DB-Query-Count and X-DB-Query-Time (ms) headers to every response.
+
+    Only installed when the LOADTEST_QUERY_COUNTS environment variable is set,
+    so the load-test harness can attribute database work to each endpoint.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with QueryCounter().active() as counter:
+            response = self.get_response(request)
+
+        response['X-DB-Query-Count'] = str(counter.count)
+        response['X-DB-Query-Time'] = f"{counter.duration * 1000:.2f}"
+        return response
+
+
+class MetricsMiddleware:
+    """Record request latency and per-request database work for /metrics"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with QueryCounter().active() as counter:
+            response = self.get_response(request)
+
+        match = request.resolver_match
+        metrics.observe_request(
+            match.view_name if match else '<unresolved>', request.method, response.status_code,
+            time.perf_counter() - start, counter.count, counter.duration,
+        )
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compress text responses with brotli or gzip as the client prefers,
+    streaming responses incrementally; see core.compression.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if getattr(response, 'precompressed', False):
+            # A page cache hit served from its stored gzip copy
+            compression.weaken_etag(response)
+            return response
+        return compression.compress_response(request, response)
+
+
+class ProfilingMiddleware:
+    """
+    Profile a sample of requests and report the timings in a Server-Timing header.
+
+    Requests are picked at REQUEST_PROFILING['SAMPLE_RATE'], or always for a
+    staff user who turned profiling on from the staff dashboard (a signed
+    cookie holding their id). Unsampled requests pass straight through.
+    """
+    cookie_salt = 'core.profiling'
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not self.should_profile(request):
+            return self.get_response(request)
+
+        profile = profiling.RequestProfile(request)
+        token = profiling.activate(profile)
+        try:
+            with QueryCounter().active() as counter:
+                response = self.get_response(request)
+        finally:
+            profiling.deactivate(token)
+
+        profile.finish(response)
+        profile.db_count = counter.count
+        profile.db_time = counter.duration
+        if request.resolver_match:
+            profile.view = request.resolver_match.view_name
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            profile.user = user.email
+
+        response['Server-Timing'] = profile.server_timing()
+        if profile.duration_ms >= profiling.get_setting('SLOW_THRESHOLD_MS'):
+            profiling.slow_requests.add(profile)
+        return response
+
+    def should_profile(self, request):
+        cookie_name = profiling.get_setting('COOKIE_NAME')
+        if cookie_name in request.COOKIES:
+            user_id = request.get_signed_cookie(cookie_name, default=None, salt=self.cookie_salt)
+            user = request.user
+            if user_id and user.is_authenticated and str(user.pk) == user_id and (user.is_staff or user.is_superuser):
+                return True
+        sample_rate = profiling.get_setting('SAMPLE_RATE')
+        return sample_rate > 0 and random.random() < sample_rate
+
+
+class MaintenanceModeMiddleware:
+    """
+    Serve a 503 maintenance page to visitors while WebsiteSetting.maintenance_mode
+    is on, if settings.MAINTENANCE_MODE_ENFORCED; otherwise the flag is only stored
+    """
+
+    # Staff need to sign in and switch it off; payment providers still call back
+    EXEMPT_PREFIXES = ('/admin/', '/staff/', '/login/', '/users/login/', '/api/', '/metrics', '/theme/',
+                       '/donations/mpesa-callback/', '/donations/stripe-webhook/',
+                       settings.STATIC_URL, settings.MEDIA_URL)
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.MAINTENANCE_MODE_ENFORCED or request.path.startswith(self.EXEMPT_PREFIXES):
+            return self.get_response(request)
+        if not site_settings.maintenance_mode():
+            return self.get_response(request)
+        user = request.user
+        if user.is_authenticated and (user.is_staff or user.is_superuser):
+            return self.get_response(request)
+        response = render(request, 'maintenance.html', {'website_settings': site_settings.get()}, status=503)
+        response['Retry-After'] = '3600'
+        return response
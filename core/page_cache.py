@@ -0,0 +1,238 @@
+"""
+Full-page cache for public pages.
+
+@cache_public_page(Model, ...) caches the rendered response of anonymous GET
+requests, keyed by path, query string and the current version token of
+every model the page is built from (WebsiteSetting is always included).
+Saving or deleting a row of a registered model replaces that model's token,
+so only pages built from it miss the cache on their next request.
+
+The CSRF token is not baked into cached HTML: the page is rendered with a
+placeholder token, and each response gets a freshly masked token swapped in.
+Entries also hold the page as gzip segments split at that placeholder, so
+clients accepting gzip get a hit without it being compressed again.
+
+The same tokens back conditional GET: conditional_on(Model, ...) answers
+If-None-Match/If-Modified-Since with a 304 before the view runs. The ETag
+and Last-Modified come from the row count and max(updated_at) of each model
+(one UNION ALL query) plus the version tokens, cached until a token changes.
+
+Pages link hashed static asset names, so the staticfiles manifest hash is
+part of every key and ETag too: a deploy with changed assets misses once.
+"""
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from functools import wraps
+
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import cache
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models as db_models, transaction
+from django.db.models import Count, Max, Value
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
+
+from . import compression, metrics
+
+DEFAULTS = {
+    'ENABLED': True,
+    'TIMEOUT': 60 * 60,
+}
+
+CSRF_PLACEHOLDER = 'page-cache-csrf-placeholder-0e5c7b2d'
+
+# Models public pages are built from; a save or delete of any of them
+# invalidates the cached pages that declared it
+CACHED_MODELS = [
+    'core.WebsiteSetting', 'core.CoreValue', 'core.BoardMember', 'core.ExecutiveCommittee',
+    'programs.Program', 'programs.Service', 'programs.Objective', 'testimonials.Testimonial',
+]
+
+
+def get_setting(name):
+    return getattr(settings, 'PAGE_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def version_key(model):
+    return f'page_cache:version:{model._meta.label_lower}'
+
+
+def new_version():
+    # Starts with the time of the change, which is the Last-Modified of models without updated_at
+    return f'{time.time():.0f}.{uuid.uuid4().hex}'
+
+
+def versions(models):
+    """Current version token of each model, creating tokens that are missing"""
+    keys = [version_key(model) for model in models]
+    found = cache.get_many(keys)
+    missing = {key: new_version() for key in keys if key not in found}
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    return [found[key] for key in keys]
+
+
+def static_version():
+    """Hash of the collectstatic manifest; empty with storages that don't hash file names"""
+    return getattr(staticfiles_storage, 'manifest_hash', '')
+
+
+def invalidate(sender, **kwargs):
+    """post_save/post_delete receiver: drop every cached page built from sender"""
+    transaction.on_commit(lambda: cache.set(version_key(sender), new_version(), None))
+
+
+def page_models(models):
+    from .models import WebsiteSetting
+    models = (WebsiteSetting, *models)
+    for model in models:
+        if model._meta.label not in CACHED_MODELS:
+            raise ImproperlyConfigured(f'{model._meta.label} must be in page_cache.CACHED_MODELS to be invalidated')
+    return models
+
+
+def cacheable(request):
+    if request.method not in ('GET', 'HEAD') or not get_setting('ENABLED'):
+        return False
+    if request.user.is_authenticated:
+        return False
+    # A pending flash message is rendered into the page, so that response is one-off
+    return not len(messages.get_messages(request))
+
+
+def cache_key(request, models):
+    query = '&'.join(sorted(request.GET.urlencode().split('&')))
+    raw = '|'.join([request.path, query, static_version(), *versions(models)])
+    return f'page_cache:page:v2:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def model_stats(models):
+    """(label, row count, max updated_at) of each model, in a single query"""
+    queries = []
+    for model in models:
+        field_names = {field.name for field in model._meta.concrete_fields}
+        latest = Max('updated_at') if 'updated_at' in field_names else Value(None, output_field=db_models.DateTimeField())
+        queries.append(
+            model._base_manager.order_by()
+            .annotate(label=Value(model._meta.label, output_field=db_models.CharField()))
+            .values('label').annotate(rows=Count('pk'), latest=latest)
+            .values_list('label', 'rows', 'latest')
+        )
+    return list(queries[0].union(*queries[1:], all=True))
+
+
+def validator(models):
+    """(ETag, Last-Modified) for content built from models, recomputed only after one of them changes"""
+    tokens = [static_version(), *versions(models)]
+    key = 'page_cache:validator:' + hashlib.md5('|'.join(tokens).encode()).hexdigest()
+    cached = cache.get(key)
+    if cached is None:
+        stats = model_stats(models)
+        changed = [datetime.fromtimestamp(int(token.split('.')[0]), dt_timezone.utc) for token in tokens[1:]]
+        changed += [latest for _label, _rows, latest in stats if latest is not None]
+        etag = hashlib.md5(repr((sorted(stats, key=str), tokens)).encode()).hexdigest()
+        # Never in the future, or If-Modified-Since would match before the data changes again
+        last_modified = min(max(changed), datetime.now(dt_timezone.utc))
+        cached = (etag, last_modified.replace(microsecond=0))
+        cache.set(key, cached, get_setting('TIMEOUT'))
+    return cached
+
+
+def conditional_on(*models, anonymous_only=False):
+    """condition() decorator whose validators come from models; anonymous_only skips signed-in users"""
+    def applies(request):
+        return not anonymous_only or cacheable(request)
+
+    def etag(request, *args, **kwargs):
+        return validator(models)[0] if applies(request) else None
+
+    def last_modified(request, *args, **kwargs):
+        return validator(models)[1] if applies(request) else None
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
+
+
+def with_csrf_token(request, content):
+    if CSRF_PLACEHOLDER.encode() in content:
+        content = content.replace(CSRF_PLACEHOLDER.encode(), get_token(request).encode())
+    return content
+
+
+def cached_response(request, content, content_type, gzip_segments):
+    if gzip_segments is None or not compression.get_setting('ENABLED') or not compression.negotiate(request, ('gzip',)):
+        return HttpResponse(with_csrf_token(request, content), content_type=content_type)
+    token = get_token(request).encode() if CSRF_PLACEHOLDER.encode() in content else b''
+    response = HttpResponse(
+        compression.splice_gzip(content, gzip_segments, CSRF_PLACEHOLDER.encode(), token),
+        content_type=content_type,
+    )
+    response.headers['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    response.precompressed = True
+    return response
+
+
+def gzip_segments(content, content_type):
+    """The stored gzip form of a page, or None if it isn't worth compressing"""
+    if not compression.get_setting('ENABLED') or not compression.COMPRESSIBLE_TYPES.match(content_type):
+        return None
+    if len(content) < compression.get_setting('MIN_LENGTH'):
+        return None
+    return compression.presplit(content, CSRF_PLACEHOLDER.encode())
+
+
+def cache_public_page(*models):
+    """
+    Serve anonymous GETs of a view from the page cache until one of models
+    changes, answering conditional requests with a 304 first.
+    """
+    models = page_models(models)
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if not cacheable(request):
+                return view_func(request, *args, **kwargs)
+
+            key = cache_key(request, models)
+            cached = cache.get(key)
+            view_name = f'{view_func.__module__}.{view_func.__name__}'
+            if cached is not None:
+                metrics.PAGE_CACHE.labels(view_name, 'hit').inc()
+                return cached_response(request, *cached)
+
+            metrics.PAGE_CACHE.labels(view_name, 'miss').inc()
+            request.page_cache_fill = True
+            try:
+                response = view_func(request, *args, **kwargs)
+            finally:
+                request.page_cache_fill = False
+            if response.streaming:
+                return response
+            if response.status_code == 200 and not response.cookies:
+                content_type = response['Content-Type']
+                entry = (response.content, content_type, gzip_segments(response.content, content_type))
+                cache.set(key, entry, get_setting('TIMEOUT'))
+            response.content = with_csrf_token(request, response.content)
+            return response
+        wrapper.page_models = models  # Read by core.static_site to re-export only affected pages
+        return conditional_on(*models, anonymous_only=True)(wrapper)
+    return decorator
+
+
+def connect_signals():
+    """Connect invalidation for CACHED_MODELS; called from CoreConfig.ready"""
+    from django.apps import apps
+    from django.db.models.signals import post_delete, post_save
+
+    for label in CACHED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(invalidate, sender=model, dispatch_uid=f'page_cache.save.{model._meta.label}')
+        post_delete.connect(invalidate, sender=model, dispatch_uid=f'page_cache.delete.{model._meta.label}')
@@ -0,0 +1,253 @@
+"""
+Per-request profiling for ProfilingMiddleware.
+
+A RequestProfile is only active for sampled requests. The template and cache
+hooks are installed once, from CoreConfig.ready, and look the active profile
+up in a context variable: unprofiled requests pay that one lookup per hook,
+and concurrent profiled requests in other threads never see each other.
+
+The SLOWEST_KEPT slowest profiles over SLOW_THRESHOLD_MS are kept in a heap
+in each process, so the staff page lists those served by the worker that
+answers it (all of them with a single worker, or `runserver`).
+
+Template time is also attributed to each {% include %} and {% for %} node
+(inclusive of what they render), which shows the fragments worth caching.
+"""
+import heapq
+import itertools
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULTS = {
+    'SAMPLE_RATE': 0.0,
+    'SLOWEST_KEPT': 50,
+    'SLOW_THRESHOLD_MS': 0,
+    'COOKIE_NAME': 'ys_profile',
+    'COOKIE_MAX_AGE': 8 * 60 * 60,
+}
+
+_current = ContextVar('request_profile', default=None)
+_hooks_installed = False
+_hooks_lock = threading.Lock()
+_MISSING = object()
+
+
+def get_setting(name):
+    """Return a REQUEST_PROFILING setting, falling back to DEFAULTS"""
+    return getattr(settings, 'REQUEST_PROFILING', {}).get(name, DEFAULTS[name])
+
+
+class RequestProfile:
+    """Timings collected while handling one request"""
+
+    def __init__(self, request):
+        self.method = request.method
+        self.path = request.get_full_path()
+        self.started_at = timezone.now()
+        self.start = time.perf_counter()
+        self.user = ''
+        self.status = None
+        self.view = ''
+        self.duration = 0.0
+        self.db_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.template_nodes = {}  # '{% include ... %}' / '{% for ... %}' label -> [renders, seconds]
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_time = 0.0
+        self.provider_calls = 0
+        self.provider_time = 0.0
+        self.providers = {}
+
+    def finish(self, response):
+        self.duration = time.perf_counter() - self.start
+        self.status = response.status_code
+
+    def server_timing(self):
+        """Return the Server-Timing header value (durations in ms)"""
+        metrics = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.db_count} queries"',
+            f'tpl;dur={self.template_time * 1000:.2f};desc="Templates"',
+            f'cache;dur={self.cache_time * 1000:.2f};desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+        ]
+        if self.provider_calls:
+            names = ', '.join(sorted(self.providers))
+            metrics.append(f'provider;dur={self.provider_time * 1000:.2f};desc="{self.provider_calls} calls ({names})"')
+        metrics.append(f'total;dur={self.duration * 1000:.2f}')
+        return ', '.join(metrics)
+
+    def slowest_nodes(self, limit=5):
+        """[(label, renders, ms)] of the include/for nodes that took longest to render"""
+        nodes = sorted(self.template_nodes.items(), key=lambda item: item[1][1], reverse=True)[:limit]
+        return [(label, renders, seconds * 1000) for label, (renders, seconds) in nodes]
+
+    @property
+    def duration_ms(self):
+        return self.duration * 1000
+
+    @property
+    def db_ms(self):
+        return self.db_time * 1000
+
+    @property
+    def template_ms(self):
+        return self.template_time * 1000
+
+    @property
+    def cache_ms(self):
+        return self.cache_time * 1000
+
+    @property
+    def provider_ms(self):
+        return self.provider_time * 1000
+
+
+class SlowestRequests:
+    """The `size` slowest profiles seen by this process, in a min-heap on duration"""
+
+    def __init__(self, size):
+        self.size = size
+        self._heap = []  # (duration, sequence, profile); the fastest kept profile is first
+        self._sequence = itertools.count()  # Breaks ties; profiles don't compare
+        self._lock = threading.Lock()
+
+    def add(self, profile):
+        entry = (profile.duration, next(self._sequence), profile)
+        with self._lock:
+            if len(self._heap) < self.size:
+                heapq.heappush(self._heap, entry)
+            elif entry[0] > self._heap[0][0]:
+                heapq.heapreplace(self._heap, entry)
+
+    def slowest(self):
+        with self._lock:
+            entries = sorted(self._heap, reverse=True)
+        return [profile for _duration, _sequence, profile in entries]
+
+    def clear(self):
+        with self._lock:
+            self._heap.clear()
+
+
+slow_requests = SlowestRequests(get_setting('SLOWEST_KEPT'))
+
+
+def current_profile():
+    return _current.get()
+
+
+def activate(profile):
+    return _current.set(profile)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def record_provider(provider, seconds):
+    """Add an outbound provider call to the active profile, if any"""
+    profile = _current.get()
+    if profile is not None:
+        profile.provider_calls += 1
+        profile.provider_time += seconds
+        profile.providers[provider] = profile.providers.get(provider, 0) + 1
+
+
+def _hook_targets():
+    """(class, attribute, wrapper factory) for every hook"""
+    from django.template.base import Template
+    from django.template.defaulttags import ForNode
+    from django.template.loader_tags import IncludeNode
+
+    targets = [
+        (Template, 'render', _profiled_template_render),
+        (IncludeNode, 'render', lambda original: _profiled_node_render(original, _include_label)),
+        (ForNode, 'render', lambda original: _profiled_node_render(original, _for_label)),
+    ]
+    # Wrap get() where it is defined, once, even if several configured backends inherit it
+    owners = set()
+    for config in settings.CACHES.values():
+        backend = import_string(config['BACKEND'])
+        owners.add(next(klass for klass in backend.__mro__ if 'get' in klass.__dict__))
+    targets += [(owner, 'get', _profiled_get) for owner in owners]
+    return targets
+
+
+def install_hooks():
+    """Wrap template rendering and the configured cache backends' get(); called once from CoreConfig.ready"""
+    global _hooks_installed
+    with _hooks_lock:
+        if _hooks_installed:
+            return
+        for owner, name, wrap in _hook_targets():
+            setattr(owner, name, wrap(owner.__dict__[name]))
+        _hooks_installed = True
+
+
+def _profiled_template_render(original):
+    def render(self, context):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context)
+        # {% include %} renders nested templates; only time the outermost one
+        profile.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            profile.template_depth -= 1
+            if not profile.template_depth:
+                profile.template_time += time.perf_counter() - start
+
+    return render
+
+
+def _include_label(node):
+    return f'{{% include {node.template.var} %}}'
+
+
+def _for_label(node):
+    origin = getattr(node, 'origin', None)
+    token = getattr(node, 'token', None)
+    where = f' ({origin.template_name}:{token.lineno})' if origin and token else ''
+    return f'{{% for {", ".join(node.loopvars)} in {node.sequence.token} %}}{where}'
+
+
+def _profiled_node_render(original, label):
+    def render(self, context):
+        profile = _current.get()
+        if profile is None:
+            return original(self, context)
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            entry = profile.template_nodes.setdefault(label(self), [0, 0.0])
+            entry[0] += 1
+            entry[1] += time.perf_counter() - start
+
+    return render
+
+
+def _profiled_get(original):
+    def get(self, key, default=None, version=None):
+        profile = _current.get()
+        if profile is None:
+            return original(self, key, default, version)
+        start = time.perf_counter()
+        value = original(self, key, _MISSING, version)
+        profile.cache_time += time.perf_counter() - start
+        if value is _MISSING:
+            profile.cache_misses += 1
+            return default
+        profile.cache_hits += 1
+        return value
+
+    return get
@@ -0,0 +1,78 @@
+"""
+Cached WebsiteSetting snapshot.
+
+The settings row is read on nearly every page, so it is kept in two layers:
+a snapshot in the shared cache under a version token, and a copy in this
+process that re-checks the token at most every LOCAL_TTL seconds. Saving or
+deleting a WebsiteSetting replaces the token, so every process picks up the
+change within LOCAL_TTL seconds (immediately in the process that saved it).
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+DEFAULTS = {
+    'LOCAL_TTL': 5,
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+VERSION_KEY = 'website_settings:version'
+MISSING = 'missing'  # Cached when there is no settings row, so that is not re-queried either
+
+_lock = threading.Lock()
+_local = {'version': None, 'snapshot': None, 'checked': 0.0}
+
+
+def get_setting(name):
+    return getattr(settings, 'SITE_SETTINGS_CACHE', {}).get(name, DEFAULTS[name])
+
+
+def _load():
+    from .models import WebsiteSetting
+    return WebsiteSetting.objects.first() or MISSING
+
+
+def get():
+    """The WebsiteSetting row, or None if there isn't one"""
+    now = time.monotonic()
+    if _local['version'] is not None and now - _local['checked'] < get_setting('LOCAL_TTL'):
+        snapshot = _local['snapshot']
+    else:
+        version = cache.get_or_set(VERSION_KEY, uuid.uuid4().hex, None)
+        if version == _local['version']:
+            snapshot = _local['snapshot']
+        else:
+            snapshot = cache.get(f'website_settings:{version}')
+            if snapshot is None:
+                snapshot = _load()
+                cache.set(f'website_settings:{version}', snapshot, get_setting('TIMEOUT'))
+        with _lock:
+            _local.update(version=version, snapshot=snapshot, checked=now)
+    return None if snapshot == MISSING else snapshot
+
+
+def version():
+    """Token that changes whenever the settings row does, e.g. for cache keys derived from it"""
+    get()
+    return _local['version'] or ''
+
+
+def maintenance_mode():
+    snapshot = get()
+    return bool(snapshot and snapshot.maintenance_mode)
+
+
+def _bump_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+    with _lock:
+        _local.update(version=None, snapshot=None, checked=0.0)
+
+
+def invalidate(**kwargs):
+    """Signal receiver: start a new version so every process reloads the row"""
+    # After commit, or another process could cache the old row under the new version
+    transaction.on_commit(_bump_version)
@@ -0,0 +1,151 @@
+"""
+Slow-query log.
+
+install() is connected to connection_created and adds an execute_wrapper to
+every database connection. Statements slower than
+SLOW_QUERY_LOG['THRESHOLD_MS'] are appended to SLOW_QUERY_LOG['PATH'] as JSON
+lines with a literal-free fingerprint, the project call site that issued them
+and the database's query plan. `manage.py slow_queries` aggregates the file.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'THRESHOLD_MS': 100,
+    'PATH': None,
+    'EXPLAIN': True,
+}
+
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+PLACEHOLDER_LIST = re.compile(r"\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)")
+EXPLAINABLE = ('SELECT', 'WITH')
+# Instrumentation frames that sit between the caller and the database
+SKIPPED_FRAMES = tuple(os.path.join('core', name) for name in ('slow_queries.py', 'middleware.py', 'profiling.py'))
+
+_state = threading.local()
+_write_lock = threading.Lock()
+_explained = set()
+
+
+def get_setting(name):
+    return getattr(settings, 'SLOW_QUERY_LOG', {}).get(name, DEFAULTS[name])
+
+
+def log_path():
+    return get_setting('PATH') or os.path.join(settings.BASE_DIR, 'logs', 'slow_queries.jsonl')
+
+
+def fingerprint(sql):
+    """Normalise SQL so statements differing only in literals share a fingerprint"""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER_LITERAL.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = PLACEHOLDER_LIST.sub('(...)', sql)
+    return ' '.join(sql.split())
+
+
+def fingerprint_id(normalized):
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+def call_site():
+    """Return 'path:line in function' for the innermost project frame outside Django"""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-1]):
+        filename = frame.filename
+        if (filename.startswith(base_dir) and 'site-packages' not in filename
+                and not filename.endswith(SKIPPED_FRAMES)):
+            return f"{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}"
+    return ''
+
+
+def explain(connection, sql, params):
+    """Return the query plan lines for a SELECT, or None"""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE):
+        return None
+    prefix = connection.ops.explain_query_prefix()
+    try:
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(f"{prefix} {sql}", params)
+                rows = cursor.fetchall()
+    except Exception as e:
+        return [f'EXPLAIN failed: {e}']
+    # SQLite returns (id, parent, notused, detail); other backends one text column
+    return [str(row[-1]) for row in rows]
+
+
+class SlowQueryLogger:
+    """execute_wrapper that records statements slower than the threshold"""
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_state, 'active', False):
+            return execute(sql, params, many, context)
+
+        start = time.perf_counter()
+        result = execute(sql, params, many, context)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if duration_ms >= get_setting('THRESHOLD_MS'):
+            _state.active = True
+            try:
+                self.record(context['connection'], sql, params, many, duration_ms)
+            except Exception as e:
+                logger.error(f"Could not record slow query: {e}")
+            finally:
+                _state.active = False
+        return result
+
+    def record(self, connection, sql, params, many, duration_ms):
+        normalized = fingerprint(sql)
+        key = fingerprint_id(normalized)
+        plan = None
+        if get_setting('EXPLAIN') and not many and key not in _explained:
+            plan = explain(connection, sql, params)
+            _explained.add(key)
+
+        entry = {
+            'timestamp': timezone.now().isoformat(),
+            'fingerprint_id': key,
+            'fingerprint': normalized,
+            'sql': sql[:2000],
+            'duration_ms': round(duration_ms, 2),
+            'alias': self.alias,
+            'vendor': connection.vendor,
+            'many': many,
+            'call_site': call_site(),
+            'plan': plan,
+        }
+        logger.warning(f"Slow query ({duration_ms:.0f} ms) at {entry['call_site'] or 'unknown'}: {normalized[:200]}")
+
+        path = log_path()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with _write_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + '\n')
+
+
+def install(sender=None, connection=None, **kwargs):
+    """connection_created receiver: add the slow-query wrapper once per connection"""
+    if not get_setting('ENABLED'):
+        return
+    connection = connection or connections['default']
+    if not any(isinstance(wrapper, SlowQueryLogger) for wrapper in connection.execute_wrappers):
+        # Outermost, and at the front so execute_wrapper()'s pop() never removes it
+        connection.execute_wrappers.insert(0, SlowQueryLogger(connection.alias))
@@ -0,0 +1,230 @@
+"""
+Static export of the public pages.
+
+`manage.py render_static_site` renders every page served through
+@cache_public_page (home, about, programs, testimonials and each active
+program's detail page) the way an anonymous visitor sees it, and writes it
+under STATIC_SITE['ROOT'] with precompressed copies for gzip_static and
+brotli_static:
+
+    static_site/index.html              <- /
+    static_site/about/index.html        <- /about/
+    static_site/programs/7/index.html   <- /programs/7/
+    static_site/about/index.html.gz, .br
+
+A front-end server answers anonymous requests from these files and passes
+everything else (and any request carrying a session cookie) to Django.
+With STATIC_SITE['ENABLED'], saving or deleting a row of a model a page is
+built from re-renders only the pages that declared it, in a background
+thread once the transaction commits. Pages of programs that are deleted
+or deactivated are removed, and while maintenance mode is enforced the whole
+export is, so those requests fall through to Django.
+
+Exported pages carry no CSRF token: static-site.js fetches one from
+core:csrf_token when a form is submitted, so only visitors who post
+something reach Python.
+"""
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import close_old_connections, transaction
+from django.urls import resolve, reverse
+
+from . import compression, page_cache, site_settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,
+    'ROOT': settings.BASE_DIR / 'static_site',
+    'HOST': 'localhost',
+}
+
+# Exported pages besides the program detail pages, which are added per active program
+PAGES = ['core:home', 'core:about', 'core:programs', 'core:testimonials']
+
+MANIFEST = '.static-site.json'
+INDEX = 'index.html'
+
+_pending = set()
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def get_setting(name):
+    return getattr(settings, 'STATIC_SITE', {}).get(name, DEFAULTS[name])
+
+
+def page_paths():
+    from programs.models import Program
+
+    paths = [reverse(name) for name in PAGES]
+    program_ids = Program.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+    paths += [reverse('programs:program_detail', args=[program_id]) for program_id in program_ids]
+    return paths
+
+
+def page_labels(path):
+    """Labels of the models the page at path is built from (its @cache_public_page models)"""
+    models = getattr(resolve(path).func, 'page_models', ())
+    return {model._meta.label for model in models}
+
+
+def render(path):
+    """HTML of the page at path for an anonymous visitor, without a CSRF token; None unless it is a 200"""
+    from django.test import RequestFactory
+
+    match = resolve(path)
+    request = RequestFactory(SERVER_NAME=get_setting('HOST')).get(path)
+    request.user = AnonymousUser()
+    request.resolver_match = match
+    # The view itself, not the page cache: its hits carry a real token for the requesting client
+    request.page_cache_fill = True
+    request.static_export = True
+    view = match.func
+    while hasattr(view, '__wrapped__') and hasattr(view, 'page_models'):
+        view = view.__wrapped__
+    response = view(request, *match.args, **match.kwargs)
+    if response.status_code != 200 or response.streaming:
+        return None
+    return response.content.replace(page_cache.CSRF_PLACEHOLDER.encode(), b'')
+
+
+def _write_file(path, data):
+    # Written beside the target and renamed, so the front-end server never reads half a page
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix='.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(temp, 0o644)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def page_file(root, path):
+    return Path(root, *path.strip('/').split('/'), INDEX) if path.strip('/') else Path(root, INDEX)
+
+
+def write_page(root, path, content):
+    target = page_file(root, path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    _write_file(target.with_name(INDEX + '.gz'), compression.compress(content, 'gzip'))
+    if 'br' in compression.supported_encodings():
+        _write_file(target.with_name(INDEX + '.br'), compression.compress(content, 'br'))
+    _write_file(target, content)
+
+
+def remove_page(root, path):
+    target = page_file(root, path)
+    for name in (INDEX, INDEX + '.gz', INDEX + '.br'):
+        target.with_name(name).unlink(missing_ok=True)
+    directory = target.parent
+    while directory != Path(root):
+        try:
+            directory.rmdir()
+        except OSError:
+            break  # Not empty
+        directory = directory.parent
+
+
+def read_manifest(root):
+    try:
+        return json.loads(Path(root, MANIFEST).read_text())
+    except (OSError, ValueError):
+        return {'paths': [], 'static_version': None}
+
+
+def export(labels=None, root=None):
+    """
+    Render the pages built from any model in labels (every page if None) and
+    remove pages that no longer exist; returns (paths written, paths removed)
+    """
+    root = Path(root or get_setting('ROOT'))
+    root.mkdir(parents=True, exist_ok=True)
+    manifest = read_manifest(root)
+    # Pages link hashed asset names, so a deploy with changed assets re-renders everything
+    if manifest['static_version'] != page_cache.static_version():
+        labels = None
+
+    offline = settings.MAINTENANCE_MODE_ENFORCED and site_settings.maintenance_mode()
+    paths = [] if offline else page_paths()
+    exported, written = [], []
+    for path in paths:
+        if labels is not None and path in manifest['paths'] and not labels & page_labels(path):
+            exported.append(path)
+            continue
+        content = render(path)
+        if content is None:
+            continue  # Removed below if it was exported before
+        write_page(root, path, content)
+        exported.append(path)
+        written.append(path)
+    removed = [path for path in manifest['paths'] if path not in exported]
+    for path in removed:
+        remove_page(root, path)
+
+    _write_file(root / MANIFEST, json.dumps({
+        'paths': exported,
+        'static_version': page_cache.static_version(),
+        'exported_at': time.time(),
+    }, indent=2).encode())
+    return written, removed
+
+
+def _run():
+    with _lock:
+        labels = set(_pending)
+        _pending.clear()
+    close_old_connections()
+    try:
+        written, removed = export(labels)
+        logger.info(f"Static site: re-rendered {len(written)} pages, removed {len(removed)} after changes to {', '.join(sorted(labels))}")
+    except Exception as e:
+        logger.warning(f"Static site export failed: {e}")
+    finally:
+        close_old_connections()
+
+
+def _submit(label):
+    global _executor, _executor_pid
+    with _lock:
+        # Changes that arrive while an export is queued are rendered by that export
+        queued = bool(_pending)
+        _pending.add(label)
+        if queued:
+            return
+        # The executor's thread does not survive a fork into a gunicorn worker
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='static-site')
+            _executor_pid = os.getpid()
+        _executor.submit(_run)
+
+
+def schedule(sender, **kwargs):
+    """post_save/post_delete receiver: re-export the pages built from sender once the transaction commits"""
+    if not get_setting('ENABLED'):
+        return
+    label = sender._meta.label
+    transaction.on_commit(lambda: _submit(label))
+
+
+def connect_signals():
+    """Connect re-export for page_cache.CACHED_MODELS; called from CoreConfig.ready"""
+    from django.apps import apps
+    from django.db.models.signals import post_delete, post_save
+
+    for label in page_cache.CACHED_MODELS:
+        model = apps.get_model(label)
+        post_save.connect(schedule, sender=model, dispatch_uid=f'static_site.save.{model._meta.label}')
+        post_delete.connect(schedule, sender=model, dispatch_uid=f'static_site.delete.{model._meta.label}')
@@ -0,0 +1,159 @@
+"""
+Content-addressed, deduplicating media storage.
+
+Every upload is hashed while it is streamed to disk and kept once, as
+MEDIA_BLOB_ROOT/<2 hex>/<sha256>. The name handed back to the model
+(programs/EMC.jpg, programs/EMC_s9jiucc.jpg, ...) is a hard link to that
+blob, so URLs, backups and the static file server see ordinary files while
+identical uploads share one copy on disk. A blob's link count is its
+reference count: deleting a logical name drops a reference, and
+`manage.py gc_media_blobs` removes blobs nothing links to any more.
+
+The blob store is kept outside MEDIA_ROOT so blobs are never served under
+MEDIA_URL, but it must be on the same filesystem for the hard links.
+"""
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.core.files.utils import validate_file_name
+
+# Where blobs used to be kept, inside MEDIA_ROOT; gc_media_blobs moves them out
+LEGACY_BLOB_DIR = '.blobs'
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+
+    def __init__(self, blob_location=None, **kwargs):
+        super().__init__(**kwargs)
+        self._blob_location = blob_location
+
+    @property
+    def blob_root(self):
+        return os.path.abspath(self._blob_location or settings.MEDIA_BLOB_ROOT)
+
+    def blob_path(self, digest):
+        return os.path.join(self.blob_root, digest[:2], digest)
+
+    def store_blob(self, content):
+        """Stream content into the blob store; returns the blob's path"""
+        os.makedirs(self.blob_root, exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(dir=self.blob_root, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode()
+                    digest.update(chunk)
+                    f.write(chunk)
+            blob = self.blob_path(digest.hexdigest())
+            if os.path.exists(blob):
+                os.remove(temp_path)
+            else:
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                if self.file_permissions_mode is not None:
+                    os.chmod(temp_path, self.file_permissions_mode)
+                os.replace(temp_path, blob)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return blob
+
+    def _save(self, name, content):
+        blob = self.store_blob(content)
+        while True:
+            full_path = self.path(name)
+            directory = os.path.dirname(full_path)
+            os.makedirs(directory, exist_ok=True)
+            try:
+                os.link(blob, full_path)
+                break
+            except FileExistsError:
+                # Taken between get_available_name() and here; pick another name
+                name = self.get_available_name(name)
+            except FileNotFoundError:
+                if os.path.exists(blob):
+                    raise
+                # gc_media_blobs removed the blob while it had no links yet; store it again
+                blob = self.store_blob(content)
+        name = os.path.relpath(full_path, self.location)
+        validate_file_name(name, allow_relative_path=True)
+        return str(name).replace('\\', '/')
+
+    def listdir(self, path):
+        directories, files = super().listdir(path)
+        if not path or path in ('.', '/'):
+            directories = [directory for directory in directories if directory != LEGACY_BLOB_DIR]
+        return directories, files
+
+    def iter_blobs(self):
+        """(path, reference count) of every blob"""
+        if not os.path.isdir(self.blob_root):
+            return
+        for prefix in os.listdir(self.blob_root):
+            directory = os.path.join(self.blob_root, prefix)
+            if not os.path.isdir(directory):
+                continue
+            for digest in os.listdir(directory):
+                path = os.path.join(directory, digest)
+                yield path, os.stat(path).st_nlink - 1
+
+    def adopt(self, name):
+        """
+        Move an existing plain file into the blob store and replace it with a
+        link; returns True if an identical blob already existed (space saved).
+        """
+        full_path = self.path(name)
+        if os.stat(full_path).st_nlink > 1:
+            return False  # Already linked to a blob
+        blob = self.blob_path(file_sha256(full_path))
+        shared = os.path.exists(blob)
+        if not shared:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            os.link(full_path, blob)
+            return False
+        temp_path = f'{full_path}.adopt'
+        os.link(blob, temp_path)
+        os.replace(temp_path, full_path)
+        return True
+
+    def move_legacy_blobs(self):
+        """
+        Move blobs from MEDIA_ROOT/.blobs into the blob store; returns how many
+        moved. A blob already in the store is dropped from the old directory
+        instead, leaving its names as plain files for adopt() to link again.
+        """
+        legacy_root = os.path.join(self.location, LEGACY_BLOB_DIR)
+        if not os.path.isdir(legacy_root):
+            return 0
+        moved = 0
+        for root, _directories, files in os.walk(legacy_root):
+            for digest in files:
+                path = os.path.join(root, digest)
+                if digest.startswith('.upload-'):
+                    os.remove(path)
+                    continue
+                blob = self.blob_path(digest)
+                if os.path.exists(blob):
+                    os.remove(path)
+                    continue
+                os.makedirs(os.path.dirname(blob), exist_ok=True)
+                os.replace(path, blob)
+                moved += 1
+        for root, _directories, _files in os.walk(legacy_root, topdown=False):
+            os.rmdir(root)
+        return moved
@@ -0,0 +1,42 @@
+from django import template
+from django.core.cache import cache
+
+from core import fragment_cache
+
+register = template.Library()
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        if not fragment_cache.get_setting('ENABLED'):
+            return self.nodelist.render(context)
+        key = fragment_cache.fragment_key(self.name, [value.resolve(context) for value in self.vary_on], context)
+        content = cache.get(key)
+        if content is not None:
+            fragment_cache.record(self.name, 'hit')
+            return content
+        fragment_cache.record(self.name, 'miss')
+        content = self.nodelist.render(context)
+        cache.set(key, content, fragment_cache.get_setting('TIMEOUT'))
+        return content
+
+
+@register.tag
+def cache_fragment(parser, token):
+    """
+    {% cache_fragment "name" [vary_on ...] %}...{% endcache_fragment %}; see core.fragment_cache
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' needs a fragment name")
+    name = bits[1]
+    if name[0] not in ('"', "'") or name[-1] != name[0]:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' fragment name must be a quoted string")
+    nodelist = parser.parse(('endcache_fragment',))
+    parser.delete_first_token()
+    return FragmentCacheNode(nodelist, name[1:-1], [parser.compile_filter(bit) for bit in bits[2:]])
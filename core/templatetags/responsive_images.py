@@ -0,0 +1,25 @@
+from django import template
+from django.core.files.storage import default_storage
+from django.utils.html import format_html
+
+from core import images
+
+register = template.Library()
+
+
+@register.simple_tag
+def responsive_src(image, sizes='100vw'):
+    """
+    src, srcset and sizes attributes for an <img>, e.g.
+    <img {% responsive_src member.photo "(max-width: 576px) 100vw, 240px" %} alt="...">
+    """
+    if not image:
+        return ''
+    manifest = images.get_manifest(image.name)
+    if not manifest or not manifest.get('derivatives'):
+        return format_html('src="{}"', image.url)
+    srcset = ', '.join(
+        f'{default_storage.url(name)} {width}w'
+        for width, name in sorted(manifest['derivatives'].items(), key=lambda item: int(item[0]))
+    )
+    return format_html('src="{}" srcset="{}" sizes="{}"', image.url, srcset, sizes)
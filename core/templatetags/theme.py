@@ -0,0 +1,12 @@
+from django import template
+from django.utils.html import format_html
+
+from core import theme
+
+register = template.Library()
+
+
+@register.simple_tag
+def theme_stylesheet():
+    """<link> to the compiled theme stylesheet"""
+    return format_html('<link rel="stylesheet" href="{}">', theme.stylesheet_url())
@@ -1,3 +1,1001 @@
-from django.test import TestCase
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zlib
+from collections import Counter, namedtuple
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import IntegrityError, OperationalError, connection, transaction
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from django.utils import timezone
+
+from api import log_buffer
+from api.models import APILog
+from core import archive, compression, images, metrics, page_cache, profiling, theme
+from core.buffered_writer import BufferedWriter
+from core.middleware import QueryCounter, count_queries
+from core.models import BoardMember, ContactMessage, CoreValue, ExecutiveCommittee, WebsiteSetting
+from core.storage import LEGACY_BLOB_DIR, ContentAddressedStorage
+from core.templatetags.responsive_images import responsive_src
+from donations.models import Donation
+from programs.models import Objective, Program, Service
+from staff_dashboard import audit
+from staff_dashboard.models import BackupJob, BackupLog
+from testimonials.models import Testimonial
+from users.models import CustomUser
+
+ViewBudget = namedtuple('ViewBudget', 'name role method kwargs data json status queries ms')
+
+
+# Wall-clock budgets are multiplied by this, so slower or shared machines (CI) can scale
+# them without touching VIEW_BUDGETS; 0 checks query counts only.
+VIEW_BUDGET_MS_FACTOR = float(os.environ.get('VIEW_BUDGET_MS_FACTOR', 1))
+
+
+def budget(name, queries, ms, role='anonymous', method='get', kwargs=None, data=None, json=False, status=200):
+    return ViewBudget(name, role, method, kwargs or {}, data, json, status, queries, ms)
+
+
+# Per-view budgets: the most queries a view may run and the most milliseconds it may
+# take to respond, against the mid-size dataset built in setUpTestData. String kwargs
+# that name a fixture on the test class are replaced by that fixture's pk (or by the
+# fixture itself if it has no pk). When a view legitimately needs more, raise its
+# budget here in the same change.
+VIEW_BUDGETS = [
+    # core
+    budget('core:home', queries=1, ms=100),
+    budget('core:about', queries=4, ms=100),
+    budget('core:programs', queries=3, ms=100),
+    budget('core:testimonials', queries=2, ms=100),
+    budget('core:contact', queries=1, ms=100),
+    budget('core:newsletter_subscribe', queries=0, ms=100, method='post', data={'email': 'reader@example.com'}, status=302),
+    budget('core:metrics', queries=1, ms=100),
+    budget('core:csrf_token', queries=0, ms=100),
+    budget('core:theme_stylesheet', queries=0, ms=100, kwargs={'name': 'theme_name'}),
+
+    # programs
+    budget('programs:program_list', queries=3, ms=100),
+    budget('programs:program_detail', queries=3, ms=100, kwargs={'program_id': 'program'}),
+    budget('programs:program_modal', queries=2, ms=100, kwargs={'program_id': 'program'}),
+    budget('programs:toggle_program', queries=4, ms=100, role='staff', method='post',
+           kwargs={'program_id': 'program'}, data={'justification': 'Budget test'}, status=302),
+    budget('programs:add_service', queries=3, ms=100, role='staff', method='post', status=302,
+           data={'title': 'Counselling', 'description': 'One to one', 'icon_class': 'fas fa-heart', 'order': 9,
+                 'is_active': 'on'}),
+    budget('programs:add_objective', queries=3, ms=100, role='staff', method='post', status=302,
+           data={'title': 'Reach', 'description': 'More schools', 'icon_class': 'fas fa-school', 'order': 9,
+                 'is_active': 'on'}),
+
+    # donations
+    budget('donations:donate', queries=1, ms=100),
+    budget('donations:process_payment', queries=1, ms=100, kwargs={'donation_id': 'pending_donation', 'method': 'mpesa'},
+           status=302),
+    budget('donations:success', queries=2, ms=100, kwargs={'donation_id': 'completed_donation'}),
+    budget('donations:failed', queries=2, ms=100, kwargs={'donation_id': 'failed_donation'}),
+    budget('donations:payment_pending', queries=2, ms=100, kwargs={'donation_id': 'pending_donation'}),
+    budget('donations:check_payment', queries=1, ms=100, kwargs={'donation_id': 'pending_donation'}, status=302),
+    budget('donations:history', queries=4, ms=100, role='donor'),
+    budget('donations:receipt', queries=5, ms=100, role='donor', kwargs={'donation_id': 'completed_donation'}),
+    budget('donations:paypal_cancel', queries=3, ms=100, kwargs={'donation_id': 'pending_donation'}, status=302),
+    budget('donations:mpesa_callback', queries=4, ms=100, method='post', json=True, status=200, data={
+        'Body': {'stkCallback': {'MerchantRequestID': '1-1-1', 'CheckoutRequestID': 'ws_CO_UNKNOWN',
+                                 'ResultCode': 0, 'ResultDesc': 'Budget test'}},
+    }),
+    budget('donations:stripe_webhook', queries=0, ms=100, method='post', json=True, data={'type': 'ping'}, status=400),
+
+    # staff_dashboard
+    budget('staff_dashboard:dashboard', queries=20, ms=300, role='staff'),
+    budget('staff_dashboard:dashboard_chart_data', queries=3, ms=150, role='staff'),
+    budget('staff_dashboard:manage_users', queries=8, ms=100, role='staff'),
+    budget('staff_dashboard:manage_donations', queries=13, ms=400, role='staff'),
+    budget('staff_dashboard:manage_programs', queries=8, ms=100, role='staff'),
+    budget('staff_dashboard:manage_testimonials', queries=9, ms=100, role='staff'),
+    budget('staff_dashboard:manage_contact_messages', queries=8, ms=100, role='staff'),
+    budget('staff_dashboard:manage_backups', queries=5, ms=100, role='staff'),
+    budget('staff_dashboard:manage_website_settings', queries=4, ms=100, role='staff'),
+    budget('staff_dashboard:manage_audit_logs', queries=12, ms=150, role='staff'),
+    budget('staff_dashboard:request_profiles', queries=3, ms=100, role='staff'),
+    budget('staff_dashboard:create_user', queries=4, ms=100, role='staff', method='post', data={
+        'username': 'budget_new', 'email': 'budget_new@example.com', 'password': 'x-Budget-123',
+        'first_name': 'New', 'last_name': 'User', 'user_type': 'user', 'is_active': 'on',
+    }),
+    budget('staff_dashboard:edit_user', queries=4, ms=100, role='staff', method='post', kwargs={'user_id': 'donor'}, data={
+        'username': 'budget_donor', 'email': 'donor@example.com', 'first_name': 'Dee', 'last_name': 'Donor',
+        'user_type': 'user', 'is_active': 'on',
+    }),
+    budget('staff_dashboard:get_user', queries=3, ms=100, role='staff', kwargs={'user_id': 'donor'}),
+    budget('staff_dashboard:delete_user', queries=13, ms=100, role='staff', method='post', kwargs={'user_id': 'donor'}),
+    budget('staff_dashboard:edit_donation', queries=5, ms=100, role='staff', method='post',
+           kwargs={'donation_id': 'pending_donation'},
+           data={'amount': '150.00', 'currency': 'KES', 'status': 'completed', 'payment_method': 'mpesa'}),
+    budget('staff_dashboard:get_donation', queries=3, ms=100, role='staff', kwargs={'donation_id': 'pending_donation'}),
+    budget('staff_dashboard:create_program', queries=3, ms=100, role='staff', method='post', data={
+        'title': 'Budget Program', 'category': 'education', 'description': 'd', 'objectives': 'o',
+        'target_audience': 't', 'duration': '3 months', 'is_active': 'on',
+    }),
+    budget('staff_dashboard:get_program', queries=3, ms=100, role='staff', kwargs={'program_id': 'program'}),
+    budget('staff_dashboard:edit_program', queries=4, ms=100, role='staff', method='post', kwargs={'program_id': 'program'},
+           data={'title': 'Renamed', 'category': 'education', 'description': 'd', 'objectives': 'o',
+                 'target_audience': 't', 'duration': '3 months', 'is_active': 'on'}),
+    budget('staff_dashboard:delete_program', queries=4, ms=100, role='staff', method='post', kwargs={'program_id': 'program'}),
+    budget('staff_dashboard:edit_testimonial', queries=4, ms=100, role='staff', method='post',
+           kwargs={'testimonial_id': 'testimonial'}, data={'content': 'Edited', 'position': 'Parent', 'status': 'approved'}),
+    budget('staff_dashboard:get_testimonial', queries=4, ms=100, role='staff', kwargs={'testimonial_id': 'testimonial'}),
+    budget('staff_dashboard:approve_testimonial', queries=4, ms=100, role='staff', method='post',
+           kwargs={'testimonial_id': 'testimonial'}),
+    budget('staff_dashboard:reject_testimonial', queries=4, ms=100, role='staff', method='post',
+           kwargs={'testimonial_id': 'testimonial'}),
+    budget('staff_dashboard:unapprove_testimonial', queries=4, ms=100, role='staff', method='post',
+           kwargs={'testimonial_id': 'testimonial'}),
+    budget('staff_dashboard:delete_testimonial', queries=4, ms=100, role='staff', method='post',
+           kwargs={'testimonial_id': 'testimonial'}),
+    budget('staff_dashboard:get_contact_message', queries=3, ms=100, role='staff', kwargs={'message_id': 'message'}),
+    budget('staff_dashboard:reply_contact_message', queries=4, ms=100, role='staff', method='post',
+           kwargs={'message_id': 'message'}, data={'reply_subject': 'Re: hello', 'reply_message': 'Thanks'}),
+    budget('staff_dashboard:edit_contact_message', queries=4, ms=100, role='staff', method='post', json=True,
+           kwargs={'message_id': 'message'}, data={'resolved': True}),
+    budget('staff_dashboard:delete_contact_message', queries=4, ms=100, role='staff', method='post',
+           kwargs={'message_id': 'message'}),
+    budget('staff_dashboard:save_auto_backup_settings', queries=5, ms=100, role='staff', method='post',
+           data={'frequency': 'daily', 'time': '02:00', 'max_backups': '5'}),
+
+    # api
+    budget('api:mpesa_callback', queries=2, ms=100, method='post', json=True, data={
+        'Body': {'stkCallback': {'CheckoutRequestID': 'ws_CO_UNKNOWN', 'ResultCode': 0, 'ResultDesc': 'Budget test'}},
+    }),
+    budget('api:stripe_webhook', queries=0, ms=100, method='post', json=True, data={'type': 'ping'}, status=400),
+    budget('api:donation_stats', queries=5, ms=100, role='donor'),
+    budget('api:program_list', queries=1, ms=100),
+    budget('api:event_list', queries=0, ms=100),
+    budget('api:paypal_success', queries=0, ms=100, method='post', json=True, data={'orderID': 'ORDER', 'paymentID': 'PAY'}),
+    budget('api:paypal_cancel', queries=0, ms=100, method='post', json=True),
+]
+
+# URLs in the covered apps that are deliberately not budgeted, and why
+UNBUDGETED_VIEWS = {
+    'programs:add_program': 'GET renders programs/add_program.html, which does not exist; replaced by staff_dashboard:create_program',
+    'programs:edit_program': 'GET renders staff_dashboard/edit_program.html, which does not exist; replaced by staff_dashboard:edit_program',
+    'donations:paypal_payment': 'calls the PayPal API',
+    'donations:paypal_success': 'calls the PayPal API',
+    'donations:card_payment': 'calls the Stripe API',
+    'staff_dashboard:create_backup': 'copies the real database file into backups/',
+    'staff_dashboard:delete_backup': 'deletes files from backups/',
+    'staff_dashboard:download_backup': 'reads files from backups/',
+    'api:mpesa_stk_push': 'calls the M-Pesa API',
+    'api:create_paypal_order': 'calls the PayPal API',
+    'api:capture_paypal_order': 'calls the PayPal API',
+    'api:stripe_payment_intent': 'calls the Stripe API',
+}
+
+BUDGETED_NAMESPACES = ('core', 'programs', 'donations', 'staff_dashboard', 'api')
+
+SQL_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+
+def url_names(namespaces):
+    """Every named URL under the given namespaces, as 'namespace:name'"""
+    names = set()
+    for entry in get_resolver().url_patterns:
+        if isinstance(entry, URLResolver) and entry.namespace in namespaces:
+            for pattern in entry.url_patterns:
+                if isinstance(pattern, URLPattern) and pattern.name:
+                    names.add(f'{entry.namespace}:{pattern.name}')
+    return names
+
+
+def duplicate_queries(captured):
+    """Group captured SQL by shape (literals replaced with ?) and return the repeated ones"""
+    shapes = Counter(SQL_LITERALS.sub('?', query['sql']) for query in captured)
+    return [(count, sql) for sql, count in shapes.most_common() if count > 1]
+
+
+def temp_media():
+    """MEDIA_ROOT and MEDIA_BLOB_ROOT in a throwaway directory, for override_settings"""
+    root = tempfile.mkdtemp(prefix='youthshield-test-media-')
+    return {'MEDIA_ROOT': os.path.join(root, 'media'), 'MEDIA_BLOB_ROOT': os.path.join(root, 'blobs')}
+
+
+def remove_temp_media():
+    shutil.rmtree(os.path.dirname(settings.MEDIA_ROOT), ignore_errors=True)
+
+
+@override_settings(
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    # The test client's REMOTE_ADDR, so core:metrics is reachable without a token
+    METRICS_ALLOWED_IPS=['127.0.0.1'],
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+        'circuit_breaker': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'circuit-breaker'},
+    },
+    # Budgets are for rendering the page; PageCacheTests covers the cache-hit path
+    PAGE_CACHE={'ENABLED': False},
+    # Files written while rendering (the theme stylesheet) go to a throwaway directory
+    **temp_media(),
+    # No collectstatic manifest in tests
+    STORAGES={
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class ViewBudgetTests(TestCase):
+    """Query-count and wall-time budgets for every view, against a mid-size dataset"""
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command(
+            'seed_scale', users=150, donations=2000, messages=150, audit=1000, testimonials=80, stdout=StringIO(),
+        )
+        setting = WebsiteSetting.objects.create(
+            name='Youth Shield Foundation', logo='logos/logo.png', mission='Mission', vision='Vision',
+            contact_email='info@example.com', contact_phone='0700000000', address='Nairobi',
+        )
+        cls.theme_name = os.path.basename(theme.stylesheet_name(theme.render_css(theme.colors(setting))))
+        for i in range(6):
+            CoreValue.objects.create(name=f'Value {i}', description='Description', icon_class='fas fa-star', order=i)
+            BoardMember.objects.create(name=f'Board {i}', position='Member', bio='Bio', photo=f'board/{i}.jpg', order=i)
+            ExecutiveCommittee.objects.create(name=f'Executive {i}', position='Officer', display_order=i)
+            Service.objects.create(title=f'Service {i}', description='Description', icon_class='fas fa-hands', order=i)
+            Objective.objects.create(title=f'Objective {i}', description='Description', icon_class='fas fa-flag', order=i)
+        categories = [key for key, _ in Program.PROGRAM_CATEGORIES]
+        for i in range(12):
+            Program.objects.create(
+                title=f'Program {i}', description='Description', category=categories[i % len(categories)],
+                image=f'programs/{i}.jpg', objectives='One\nTwo\nThree', target_audience='Youth', duration='3 months',
+            )
+        job = BackupJob.objects.create(name='Auto Backup', frequency='daily')
+        for _ in range(5):
+            BackupLog.objects.create(job=job, action='created', message='Backup created')
+
+        cls.staff = CustomUser.objects.create_user(
+            username='budget_staff', email='staff@example.com', password='x', user_type='staff', is_staff=True,
+        )
+        cls.donor = CustomUser.objects.create_user(
+            username='budget_donor', email='donor@example.com', password='x', user_type='user',
+            first_name='Dee', last_name='Donor',
+        )
+        for status in ['completed'] * 20 + ['pending', 'failed']:
+            Donation.objects.create(
+                donor=cls.donor, amount=500, currency='KES', payment_method='mpesa', status=status,
+                donor_name='Dee Donor', donor_email='donor@example.com', donor_phone='0712345678',
+            )
+        cls.completed_donation = Donation.objects.filter(donor=cls.donor, status='completed').first()
+        cls.pending_donation = Donation.objects.get(donor=cls.donor, status='pending')
+        cls.failed_donation = Donation.objects.get(donor=cls.donor, status='failed')
+        cls.program = Program.objects.filter(is_active=True).first()
+        cls.testimonial = Testimonial.objects.first()
+        cls.message = ContactMessage.objects.first()
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_temp_media()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Buffered log rows are inserted off the request thread, so they are not part of any
+        # view's budget; keep them out of the test database instead of flushing them
+        for writer in (log_buffer.writer, audit.writer):
+            patcher = mock.patch.object(writer, 'add')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def client_for(self, role):
+        client = Client(HTTP_HOST='localhost')
+        if role == 'staff':
+            client.force_login(self.staff)
+        elif role == 'donor':
+            client.force_login(self.donor)
+        return client
+
+    def send(self, client, case):
+        kwargs = {
+            key: getattr(getattr(self, value), 'pk', getattr(self, value))
+            if isinstance(value, str) and hasattr(self, value) else value
+            for key, value in case.kwargs.items()
+        }
+        url = reverse(case.name, kwargs=kwargs)
+        if case.method == 'get':
+            return client.get(url, case.data or {})
+        if case.json:
+            return client.post(url, json.dumps(case.data or {}), content_type='application/json')
+        return client.post(url, case.data or {})
+
+    def measure(self, case, runs=3):
+        """
+        Send ``case`` once to warm up, then ``runs`` more times, rolling each back.
+
+        Returns the last response and its queries, and the fastest of the timed
+        runs so a stray GC pause does not fail the budget.
+        """
+        client = self.client_for(case.role)
+        timings = []
+        for attempt in range(runs + 1):
+            with transaction.atomic():
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = self.send(client, case)
+                    elapsed_ms = (time.perf_counter() - started) * 1000
+                transaction.set_rollback(True)
+            if attempt:
+                timings.append(elapsed_ms)
+        return response, captured.captured_queries, min(timings)
+
+    def test_every_view_has_a_budget(self):
+        declared = {case.name for case in VIEW_BUDGETS}
+        missing = url_names(BUDGETED_NAMESPACES) - declared - set(UNBUDGETED_VIEWS)
+        self.assertFalse(missing, f'Add these views to VIEW_BUDGETS (or UNBUDGETED_VIEWS with a reason): {sorted(missing)}')
+        self.assertFalse(declared & set(UNBUDGETED_VIEWS), 'A view cannot be both budgeted and unbudgeted')
+
+    def test_view_budgets(self):
+        for case in VIEW_BUDGETS:
+            with self.subTest(view=case.name):
+                response, queries, elapsed_ms = self.measure(case)
+                self.assertEqual(response.status_code, case.status, f'{case.name} returned {response.status_code}')
+
+                if len(queries) > case.queries:
+                    duplicates = duplicate_queries(queries)
+                    details = '\n'.join(f'  {count}x {sql}' for count, sql in duplicates) or '  (no repeated queries)'
+                    self.fail(
+                        f'{case.name} ran {len(queries)} queries, budget is {case.queries}.\n'
+                        f'Repeated queries:\n{details}'
+                    )
+                if VIEW_BUDGET_MS_FACTOR:
+                    limit_ms = case.ms * VIEW_BUDGET_MS_FACTOR
+                    self.assertLessEqual(
+                        elapsed_ms, limit_ms,
+                        f'{case.name} took {elapsed_ms:.0f}ms, budget is {limit_ms:.0f}ms '
+                        f'({case.ms}ms x VIEW_BUDGET_MS_FACTOR {VIEW_BUDGET_MS_FACTOR:g})',
+                    )
+
+
+@override_settings(METRICS_AUTH_TOKEN='', METRICS_ALLOWED_IPS=[])
+class MetricsEndpointTests(TestCase):
+    """/metrics is closed unless a token is sent or the address was explicitly allowed"""
+
+    def test_forbidden_by_default_even_from_localhost(self):
+        response = Client(HTTP_HOST='localhost', REMOTE_ADDR='127.0.0.1').get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_AUTH_TOKEN='s3cret')
+    def test_bearer_token(self):
+        client = Client(HTTP_HOST='localhost')
+        self.assertEqual(client.get(reverse('core:metrics'), HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        self.assertEqual(client.get(reverse('core:metrics'), HTTP_AUTHORIZATION='Bearer s3cret').status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.5'])
+    def test_allowed_ip_opt_in(self):
+        response = Client(HTTP_HOST='localhost', REMOTE_ADDR='10.0.0.5').get(reverse('core:metrics'))
+        self.assertEqual(response.status_code, 200)
+
+
+class QueryCounterTests(TestCase):
+    """One long-lived execute_wrapper per connection feeds the counters active in this context"""
+
+    def test_counts_only_while_active(self):
+        with QueryCounter().active() as outer:
+            Program.objects.count()
+            with QueryCounter().active() as inner:
+                Program.objects.count()
+        Program.objects.count()
+        self.assertEqual((outer.count, inner.count), (2, 1))
+        self.assertGreater(outer.duration, 0)
+
+    def test_requests_leave_the_connection_wrappers_alone(self):
+        wrappers = list(connection.execute_wrappers)
+        self.assertEqual(wrappers.count(count_queries), 1)
+        with mock.patch.object(metrics, 'observe_request') as observe:
+            Client(HTTP_HOST='localhost').get(reverse('core:csrf_token'))
+        self.assertEqual(connection.execute_wrappers, wrappers)
+        view, method, status, _duration, queries, _query_time = observe.call_args.args
+        self.assertEqual((view, method, status, queries), ('core:csrf_token', 'GET', 200, 0))
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'maintenance-tests'},
+        'circuit_breaker': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'circuit-breaker'},
+    },
+    PAGE_CACHE={'ENABLED': False},
+    **temp_media(),
+    STORAGES={
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class MaintenanceModeTests(TestCase):
+    """WebsiteSetting.maintenance_mode only takes the site offline when enforcement is switched on"""
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_temp_media()
+        super().tearDownClass()
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WebsiteSetting.objects.create(name='Youth Shield Foundation', maintenance_mode=True)
+
+    def tearDown(self):
+        # Drop this process's copy of the row so later tests don't see it
+        with self.captureOnCommitCallbacks(execute=True):
+            WebsiteSetting.objects.all().delete()
+
+    def test_flag_alone_keeps_site_online(self):
+        response = Client(HTTP_HOST='localhost').get(reverse('core:home'))
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MAINTENANCE_MODE_ENFORCED=True)
+    def test_enforced_serves_503_to_visitors_only(self):
+        client = Client(HTTP_HOST='localhost')
+        response = client.get(reverse('core:home'))
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '3600')
+
+        staff = CustomUser.objects.create_user(username='maint_staff', password='x', user_type='staff', is_staff=True)
+        with mock.patch.object(audit.writer, 'add'):
+            client.force_login(staff)
+            self.assertEqual(client.get(reverse('core:home')).status_code, 200)
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'page-cache-tests'},
+        'circuit_breaker': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'circuit-breaker'},
+    },
+    **temp_media(),
+    STORAGES={
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class PageCacheTests(TestCase):
+    """Hits run no queries and 304s are sent until a model the page is built from is saved"""
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_temp_media()
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            WebsiteSetting.objects.create(name='Youth Shield Foundation')
+        self.client = Client(HTTP_HOST='localhost')
+
+    def tearDown(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WebsiteSetting.objects.all().delete()
+
+    def test_hit_runs_no_queries(self):
+        self.client.get(reverse('core:about'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:about'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_save_invalidates_only_pages_built_from_the_model(self):
+        self.client.get(reverse('core:about'))
+        self.client.get(reverse('core:testimonials'))
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardMember.objects.create(name='Newly Appointed', position='Member', bio='Bio', photo='board/new.jpg')
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('core:testimonials'))
+        self.assertContains(self.client.get(reverse('core:about')), 'Newly Appointed')
+
+    def test_conditional_get_until_the_model_changes(self):
+        etag = self.client.get(reverse('core:about'))['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:about'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardMember.objects.create(name='Newly Appointed', position='Member', bio='Bio', photo='board/new.jpg')
+        response = self.client.get(reverse('core:about'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_conditional_get_on_read_api(self):
+        response = self.client.get(reverse('api:program_list'))
+        self.assertEqual(self.client.get(reverse('api:program_list'), HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(
+            self.client.get(reverse('api:program_list'), HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304,
+        )
+
+    def test_gzip_hit_spliced_with_a_token(self):
+        self.client.get(reverse('core:about'))
+        response = self.client.get(reverse('core:about'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        html = gzip.decompress(response.content).decode()
+        self.assertNotIn(page_cache.CSRF_PLACEHOLDER, html)
+        self.assertIn('name="csrf-token"', html)
+
+    def test_csrf_placeholder_replaced_with_a_working_token(self):
+        self.client.get(reverse('core:home'))
+        visitor = Client(HTTP_HOST='localhost', enforce_csrf_checks=True)
+        response = visitor.get(reverse('core:home'))
+        self.assertNotContains(response, page_cache.CSRF_PLACEHOLDER)
+        token = re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+
+        with mock.patch.object(audit.writer, 'add'):
+            posted = visitor.post(
+                reverse('core:newsletter_subscribe'), {'email': 'reader@example.com', 'csrfmiddlewaretoken': token},
+            )
+        self.assertEqual(posted.status_code, 302)
+
+
+@override_settings(
+    **temp_media(),
+    STORAGES={
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class ThemeStylesheetTests(TestCase):
+    """The compiled theme is served under its hashed name with an immutable Cache-Control"""
+
+    def setUp(self):
+        self.addCleanup(remove_temp_media)
+        self.client = Client(HTTP_HOST='localhost')
+
+    def test_served_immutable(self):
+        url = theme.stylesheet_url()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('private', response['Cache-Control'])
+        self.assertContains(response, '--primary-color: #4361ee')
+
+    def test_missing_file_written_again(self):
+        url = theme.stylesheet_url()
+        remove_temp_media()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_unknown_name_not_found(self):
+        response = self.client.get(reverse('core:theme_stylesheet', kwargs={'name': 'theme-000000000000.css'}))
+        self.assertEqual(response.status_code, 404)
+
+
+class CompressResponseTests(SimpleTestCase):
+    """Only whole 200 responses are compressed; partial, conditional and encoded ones pass through"""
+
+    def setUp(self):
+        self.factory = RequestFactory(HTTP_ACCEPT_ENCODING='gzip')
+        self.body = b'<p>' + b'compress me ' * 100 + b'</p>'
+
+    def compress(self, response, **headers):
+        return compression.compress_response(self.factory.get('/', **headers), response)
+
+    def test_whole_200_compressed(self):
+        response = self.compress(HttpResponse(self.body))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), self.body)
+
+    def test_other_statuses_untouched(self):
+        for status in (206, 304, 404, 500):
+            with self.subTest(status=status):
+                response = self.compress(HttpResponse(self.body, status=status))
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, self.body)
+
+    def test_ranges_untouched(self):
+        ranged = HttpResponse(self.body)
+        ranged['Content-Range'] = f'bytes 0-{len(self.body) - 1}/{len(self.body)}'
+        for response, headers in ((ranged, {}), (HttpResponse(self.body), {'HTTP_RANGE': 'bytes=0-99'})):
+            with self.subTest(headers=headers):
+                response = self.compress(response, **headers)
+                self.assertFalse(response.has_header('Content-Encoding'))
+                self.assertEqual(response.content, self.body)
+
+    def test_already_encoded_untouched(self):
+        encoded = gzip.compress(self.body)
+        response = HttpResponse(encoded)
+        response['Content-Encoding'] = 'gzip'
+        self.assertEqual(self.compress(response).content, encoded)
+
+
+class SpliceGzipTests(SimpleTestCase):
+    """Cached gzip segments spliced around a token decompress to the page with the token in place"""
+
+    PLACEHOLDER = b'@@token@@'
+
+    def assertSplices(self, content, replacement):
+        segments = compression.presplit(content, self.PLACEHOLDER)
+        body = compression.splice_gzip(content, segments, self.PLACEHOLDER, replacement)
+        # gzip.decompress checks the CRC and length in the trailer too
+        self.assertEqual(gzip.decompress(body), content.replace(self.PLACEHOLDER, replacement))
+        decompressor = zlib.decompressobj(wbits=16 + zlib.MAX_WBITS)
+        decompressor.decompress(body)
+        self.assertTrue(decompressor.eof)
+        self.assertEqual(decompressor.unused_data, b'')
+
+    def test_placeholders_anywhere(self):
+        content = b'@@token@@<p>' + os.urandom(3000).hex().encode() + b'@@token@@</p>' + b'x' * 5000 + b'@@token@@'
+        for replacement in (b'', b'short', b'a-much-longer-token-than-the-placeholder' * 3):
+            with self.subTest(replacement=replacement):
+                self.assertSplices(content, replacement)
+
+    def test_without_placeholder(self):
+        self.assertSplices(b'<html>' + b'plain ' * 1000 + b'</html>', b'unused')
+        self.assertSplices(b'', b'unused')
+
+    @override_settings(RESPONSE_COMPRESSION={'MAX_RANDOM_BYTES': 0})
+    def test_without_random_header_name(self):
+        self.assertSplices(b'<form>@@token@@</form>' * 200, b'token')
+
+
+@override_settings(
+    CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'profiling-tests'},
+        'circuit_breaker': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'circuit-breaker'},
+    },
+    # Profile the real render, not a page cache hit
+    PAGE_CACHE={'ENABLED': False},
+    **temp_media(),
+    STORAGES={
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class RequestProfilingTests(TestCase):
+    """Staff turn profiling on with a signed cookie and see the query and template breakdown"""
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_temp_media()
+        super().tearDownClass()
+
+    def setUp(self):
+        profiling.slow_requests.clear()
+        self.addCleanup(profiling.slow_requests.clear)
+        for writer in (log_buffer.writer, audit.writer):
+            patcher = mock.patch.object(writer, 'add')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        CoreValue.objects.create(name='Integrity', description='Description', icon_class='fas fa-star')
+
+    def test_profiled_request_through_signed_cookie(self):
+        client = Client(HTTP_HOST='localhost')
+        self.assertNotIn('Server-Timing', client.get(reverse('core:about')))
+
+        staff = CustomUser.objects.create_user(username='profiler', password='x', user_type='staff', is_staff=True)
+        client.force_login(staff)
+        client.post(reverse('staff_dashboard:request_profiles'), {'action': 'enable'})
+        response = client.get(reverse('core:about'))
+        self.assertRegex(response['Server-Timing'], r'db;dur=[\d.]+;desc="\d+ queries", tpl;dur=')
+
+        profile = next(p for p in profiling.slow_requests.slowest() if p.path == reverse('core:about'))
+        self.assertGreater(profile.db_count, 0)
+        self.assertGreater(profile.template_time, 0)
+        page = client.get(reverse('staff_dashboard:request_profiles'))
+        self.assertContains(page, f'{profile.db_count} queries')
+        self.assertContains(page, '{% for value in core_values %}')
+
+        # A forged or someone else's cookie is ignored
+        client.cookies[profiling.get_setting('COOKIE_NAME')] = str(staff.pk)
+        self.assertNotIn('Server-Timing', client.get(reverse('core:about')))
+
+    def test_keeps_only_the_slowest(self):
+        slowest = profiling.SlowestRequests(3)
+        for duration in (5, 1, 9, 3, 7, 2):
+            profile = profiling.RequestProfile(RequestFactory().get('/'))
+            profile.duration = duration
+            slowest.add(profile)
+        self.assertEqual([profile.duration for profile in slowest.slowest()], [9, 7, 5])
+
+    def test_profile_render_command(self):
+        out = StringIO()
+        call_command('profile_render', reverse('core:about'), repeat=1, stdout=out)
+        self.assertIn('ms in templates', out.getvalue())
+        self.assertIn('{% for value in core_values %}', out.getvalue())
+
+
+@override_settings(**temp_media())
+class ContentAddressedStorageTests(TestCase):
+    """Identical uploads share one blob outside MEDIA_ROOT; unreferenced blobs are collected"""
+
+    def setUp(self):
+        self.storage = ContentAddressedStorage()
+        self.addCleanup(remove_temp_media)
+
+    def collect(self, min_age=0):
+        with mock.patch('core.management.commands.gc_media_blobs.MIN_BLOB_AGE', min_age):
+            call_command('gc_media_blobs', stdout=StringIO())
+
+    def references(self):
+        return {os.path.basename(path): references for path, references in self.storage.iter_blobs()}
+
+    def test_identical_uploads_share_a_blob(self):
+        first = self.storage.save('programs/a.jpg', ContentFile(b'same bytes'))
+        second = self.storage.save('programs/a.jpg', ContentFile(b'same bytes'))
+        self.assertNotEqual(first, second)
+        digest = hashlib.sha256(b'same bytes').hexdigest()
+        self.assertEqual(self.references(), {digest: 2})
+        self.assertFalse(self.storage.blob_root.startswith(os.path.abspath(settings.MEDIA_ROOT)))
+        with self.storage.open(second) as f:
+            self.assertEqual(f.read(), b'same bytes')
+
+    def test_blob_collected_once_unreferenced(self):
+        names = [self.storage.save('board/b.jpg', ContentFile(b'photo')) for _ in range(2)]
+        kept = self.storage.save('board/c.jpg', ContentFile(b'other photo'))
+        self.storage.delete(names[0])
+        self.collect()
+        self.assertEqual(len(self.references()), 2)
+
+        self.storage.delete(names[1])
+        self.collect()
+        self.assertEqual(self.references(), {hashlib.sha256(b'other photo').hexdigest(): 1})
+        self.assertTrue(self.storage.exists(kept))
+
+    def test_young_unlinked_blob_kept(self):
+        self.storage.delete(self.storage.save('board/e.jpg', ContentFile(b'just uploaded')))
+        self.collect(min_age=60 * 60)
+        self.assertEqual(self.references(), {hashlib.sha256(b'just uploaded').hexdigest(): 0})
+
+    def test_blob_collected_before_link_is_stored_again(self):
+        link = os.link
+        collected = []
+
+        def link_after_gc(source, target):
+            if not collected:
+                collected.append(source)
+                os.remove(source)  # gc_media_blobs saw no links and removed the blob
+            return link(source, target)
+
+        with mock.patch('core.storage.os.link', side_effect=link_after_gc):
+            name = self.storage.save('board/f.jpg', ContentFile(b'raced'))
+        self.assertTrue(collected)
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'raced')
+        self.assertEqual(self.references(), {hashlib.sha256(b'raced').hexdigest(): 1})
+
+    def test_adopt_links_plain_files(self):
+        for name in ('logos/one.png', 'logos/two.png'):
+            path = self.storage.path(name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(b'logo')
+        self.assertFalse(self.storage.adopt('logos/one.png'))
+        self.assertTrue(self.storage.adopt('logos/two.png'))
+        self.assertEqual(self.references(), {hashlib.sha256(b'logo').hexdigest(): 2})
+
+    def test_legacy_blobs_moved_out_of_media_root(self):
+        name = self.storage.save('programs/d.jpg', ContentFile(b'legacy'))
+        digest = hashlib.sha256(b'legacy').hexdigest()
+        legacy = os.path.join(self.storage.location, LEGACY_BLOB_DIR, digest[:2], digest)
+        os.makedirs(os.path.dirname(legacy))
+        os.replace(self.storage.blob_path(digest), legacy)
+
+        self.collect()
+        self.assertFalse(os.path.exists(os.path.join(self.storage.location, LEGACY_BLOB_DIR)))
+        self.assertEqual(self.references(), {digest: 1})
+        self.assertTrue(self.storage.exists(name))
+
+
+def png(width, height):
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', (width, height), (200, 30, 30)).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@override_settings(
+    **temp_media(),
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'responsive-images'}},
+    IMAGE_DERIVATIVES={'WIDTHS': [160, 320, 640], 'QUALITY': 80, 'ASYNC': False},
+    STATIC_SITE={'ENABLED': False},
+)
+class ResponsiveImageTests(TestCase):
+    """Uploads get WebP derivatives and a manifest, which responsive_src turns into a srcset"""
+
+    def setUp(self):
+        cache.clear()
+        images.manifests_changed()
+        self.addCleanup(remove_temp_media)
+        self.data = png(400, 200)
+
+    def test_generate_writes_derivatives_and_manifest(self):
+        name = default_storage.save('programs/camp.png', ContentFile(self.data))
+        manifest = images.generate(name)
+        digest = hashlib.sha256(self.data).hexdigest()[:12]
+        self.assertEqual(manifest['digest'], digest)
+        self.assertEqual(manifest['width'], 400)
+        self.assertEqual(sorted(manifest['derivatives'], key=int), ['160', '320', '400'])
+        self.assertEqual(manifest['derivatives']['320'], f'programs/derivatives/camp-{digest}-320w.webp')
+        self.assertEqual(images.get_manifest(name), manifest)
+
+        from PIL import Image
+        with default_storage.open(manifest['derivatives']['160'], 'rb') as f, Image.open(f) as derivative:
+            self.assertEqual((derivative.format, derivative.size), ('WEBP', (160, 80)))
+
+        html = responsive_src(BoardMember(photo=name).photo, '50vw')
+        self.assertIn(f'src="{default_storage.url(name)}"', html)
+        self.assertIn(f'{default_storage.url(manifest["derivatives"]["160"])} 160w, ', html)
+        self.assertIn(f'{default_storage.url(manifest["derivatives"]["400"])} 400w"', html)
+        self.assertIn('sizes="50vw"', html)
+
+    def test_src_only_without_manifest(self):
+        name = default_storage.save('board/portrait.png', ContentFile(self.data))
+        self.assertIsNone(images.get_manifest(name))
+        self.assertEqual(responsive_src(BoardMember(photo=name).photo), f'src="{default_storage.url(name)}"')
+        self.assertEqual(responsive_src(BoardMember().photo), '')
+
+    def test_missing_manifest_read_again_after_generation(self):
+        name = default_storage.save('board/late.png', ContentFile(self.data))
+        self.assertIsNone(images.get_manifest(name))
+        with self.captureOnCommitCallbacks(execute=True):
+            BoardMember.objects.create(name='Late', position='Member', photo=name)
+        self.assertEqual(sorted(images.get_manifest(name)['derivatives'], key=int), ['160', '320', '400'])
+
+    def test_manifest_cache_bounded(self):
+        with self.settings(IMAGE_DERIVATIVES={'MANIFEST_CACHE_SIZE': 2}):
+            for name in ('a.png', 'b.png', 'c.png'):
+                images.get_manifest(name)
+            self.assertEqual(list(images._manifests), ['b.png', 'c.png'])
+
+    def test_avatar_derivatives_invalidate_testimonials(self):
+        before = page_cache.versions([Testimonial])
+        with self.captureOnCommitCallbacks(execute=True):
+            user = CustomUser(username='avatar-owner')
+            user.profile_picture.save('avatar.png', ContentFile(self.data))
+        self.assertIsNotNone(images.get_manifest(user.profile_picture.name))
+        self.assertNotEqual(page_cache.versions([Testimonial]), before)
+
+    def test_backfill_derivatives(self):
+        name = default_storage.save('programs/old.png', ContentFile(self.data))
+        Program.objects.create(title='Old', description='Uploaded before derivatives', image=name)
+        self.assertIsNone(images.get_manifest(name))
+        out = StringIO()
+        call_command('backfill_derivatives', workers=1, stdout=out)
+        self.assertIn(f'{name}: 3 derivatives', out.getvalue())
+        self.assertEqual(images.get_manifest(name)['digest'], hashlib.sha256(self.data).hexdigest()[:12])
+
+
+class BufferedWriterTests(TestCase):
+    """Flushing, retrying and dropping buffered rows"""
+
+    def setUp(self):
+        self.writer = BufferedWriter(ContactMessage, retries=2, retry_delay=0, max_requeues=1)
+        # Flushed explicitly; the background thread would write outside the test transaction
+        patcher = mock.patch.object(self.writer, '_ensure_thread')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queue(self, count):
+        for i in range(count):
+            self.writer.add(ContactMessage(name=f'N{i}', email='n@example.com', phone='1', subject='S', message='M'))
+
+    def bulk_create(self, *failures):
+        """Patch bulk_create to raise each of failures in turn, then insert for real"""
+        real = ContactMessage.objects.bulk_create
+        failures = list(failures)
+
+        def bulk_create(*args, **kwargs):
+            if failures:
+                raise failures.pop(0)
+            return real(*args, **kwargs)
+        return mock.patch.object(ContactMessage.objects, 'bulk_create', side_effect=bulk_create)
+
+    def test_flush_inserts_queued_rows(self):
+        self.queue(3)
+        self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(ContactMessage.objects.count(), 3)
+        self.assertEqual(self.writer.flush(), 0)
+
+    def test_transient_error_is_retried(self):
+        self.queue(2)
+        with self.bulk_create(OperationalError('database is locked')):
+            self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+    def test_batch_is_requeued_when_retries_run_out(self):
+        self.queue(2)
+        locked = OperationalError('database is locked')
+        with self.bulk_create(locked, locked, locked):
+            self.assertEqual(self.writer.flush(), 0)
+            self.assertEqual(len(self.writer._buffer), 2)
+            self.queue(1)
+            self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(list(ContactMessage.objects.order_by('pk').values_list('name', flat=True)), ['N0', 'N1', 'N0'])
+
+    def test_batch_is_dropped_after_max_requeues(self):
+        self.queue(2)
+        with mock.patch.object(ContactMessage.objects, 'bulk_create', side_effect=OperationalError('locked')):
+            self.writer.flush()
+            self.writer.flush()
+        self.assertEqual(self.writer._buffer, [])
+
+    def test_schema_error_is_not_retried(self):
+        self.queue(1)
+        with mock.patch.object(ContactMessage.objects, 'bulk_create', side_effect=OperationalError('no such column: x')) as bulk_create:
+            self.writer.flush()
+        bulk_create.assert_called_once()
+        self.assertEqual(self.writer._buffer, [])
+
+    def test_non_transient_error_drops_the_batch(self):
+        self.queue(2)
+        with mock.patch.object(ContactMessage.objects, 'bulk_create', side_effect=IntegrityError('bad row')) as bulk_create:
+            self.assertEqual(self.writer.flush(), 0)
+        bulk_create.assert_called_once()
+        self.assertEqual(self.writer._buffer, [])
+
+
+@override_settings(STORAGES={
+    'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+})
+class PayloadArchiveTests(TestCase):
+    """archive_payloads round trip, admin display and segment garbage collection"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp(prefix='youthshield-test-archive-')
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        override = override_settings(PAYLOAD_ARCHIVE={'PATH': directory, 'GC_MIN_AGE': 0})
+        override.enable()
+        self.addCleanup(override.disable)
+        self.directory = directory
+        # The admin login is audited; keep its entry out of the buffered writer
+        patcher = mock.patch.object(audit.writer, 'add')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.request_data = {'items': [f'item {i}' for i in range(50)]}
+
+    def create_log(self, **kwargs):
+        return APILog.objects.create(
+            endpoint='/api/test/', method='POST', request_data=self.request_data, response_data={'ok': True},
+            status_code=200, duration=5, **kwargs,
+        )
+
+    def archive(self):
+        call_command('archive_payloads', days=-1, stdout=StringIO())
+
+    def segments(self):
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(archive.SEGMENT_SUFFIX))
+
+    def test_payload_reads_archived_value_back(self):
+        log = self.create_log()
+        self.archive()
+        stored = APILog.objects.defer(None).get(pk=log.pk)
+        self.assertTrue(archive.is_pointer(stored.request_data))
+        self.assertEqual(stored.payload('request_data'), self.request_data)
+        self.assertEqual(stored.payload('response_data'), {'ok': True})  # Under MIN_BYTES, left in place
+
+    def test_admin_shows_archived_payload(self):
+        log = self.create_log()
+        self.archive()
+        admin_user = CustomUser.objects.create_superuser(username='root', email='root@example.com', password='x')
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(admin_user)
+        response = client.get(reverse('admin:api_apilog_change', args=[log.pk]))
+        self.assertContains(response, 'item 49')
+        self.assertNotContains(response, archive.POINTER_KEY)
+
+    def test_garbage_collection_keeps_live_segments(self):
+        self.create_log()
+        self.archive()
+        self.assertEqual(archive.collect_garbage(), [])
+        self.assertEqual(len(self.segments()), 1)
+
+    def test_compact_logs_removes_segments_of_deleted_rows(self):
+        self.create_log(created_at=timezone.now() - timedelta(days=60))
+        self.archive()
+        [segment] = self.segments()
+        call_command('compact_logs', hot_days=30, no_vacuum=True, stdout=StringIO())
+        self.assertEqual(APILog.objects.count(), 0)
+        self.assertEqual(self.segments(), [])
+        self.assertFalse(os.path.exists(archive.index_path(segment)))
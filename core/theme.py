@@ -0,0 +1,110 @@
+"""
+Compiled theme stylesheet.
+
+The theme colours of WebsiteSetting are rendered into a small CSS file in
+media storage whose name carries a hash of its content:
+
+    theme/theme-3f9a1c0e4b2d.css
+
+base.html links it with {% theme_stylesheet %}, so pages no longer inline
+the colours. It is served by core:theme_stylesheet rather than MEDIA_URL,
+with an immutable one-year Cache-Control, so browsers keep the theme until
+its name changes. The file is written when WebsiteSetting is saved, and on
+first use if it is missing (e.g. a fresh media directory).
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from . import site_settings
+
+logger = logging.getLogger(__name__)
+
+THEME_DIR = 'theme'
+
+# Used when there is no settings row, or a colour is not a hex colour
+DEFAULT_COLORS = {
+    'primary_color': '#4361ee',
+    'secondary_color': '#3a0ca3',
+    'accent_color': '#f72585',
+}
+
+HEX_COLOR = re.compile(r'^#(?:[0-9a-fA-F]{3}){1,2}$')
+
+_compiled = {}  # colours -> stylesheet name known to exist in storage
+_lock = threading.Lock()
+
+
+def colors(setting):
+    """The theme colours of a WebsiteSetting (or None), falling back to the defaults"""
+    values = {}
+    for field, default in DEFAULT_COLORS.items():
+        value = getattr(setting, field, None) or ''
+        # Colours are free text in the settings form; never let one break out of the CSS
+        values[field] = value if HEX_COLOR.match(value) else default
+    return values
+
+
+def render_css(values):
+    return render_to_string('theme.css', values)
+
+
+def stylesheet_name(css):
+    return f'{THEME_DIR}/theme-{hashlib.sha256(css.encode()).hexdigest()[:12]}.css'
+
+
+def compile_theme(setting, storage=default_storage):
+    """Write the stylesheet for setting's colours if it doesn't exist yet; returns its name"""
+    values = colors(setting)
+    key = tuple(values.values())
+    name = _compiled.get(key)
+    if name is not None:
+        return name
+    css = render_css(values)
+    name = stylesheet_name(css)
+    with _lock:
+        if not storage.exists(name):
+            storage.save(name, ContentFile(css.encode()))
+        _compiled[key] = name
+    return name
+
+
+def stylesheet_url():
+    """URL of the current theme stylesheet"""
+    name = compile_theme(site_settings.get())
+    return reverse('core:theme_stylesheet', kwargs={'name': os.path.basename(name)})
+
+
+def stylesheet_content(name, storage=default_storage):
+    """
+    Content of the compiled stylesheet theme/<name>, writing it again if it is
+    the current theme's and has gone missing; None for any other unknown name
+    """
+    path = f'{THEME_DIR}/{name}'
+    if not storage.exists(path):
+        setting = site_settings.get()
+        if stylesheet_name(render_css(colors(setting))) != path:
+            return None
+        with _lock:
+            _compiled.clear()
+        compile_theme(setting, storage)
+    with storage.open(path) as f:
+        return f.read()
+
+
+def recompile(sender, instance, raw=False, **kwargs):
+    """post_save receiver: write the stylesheet for the new colours straight away"""
+    if raw:
+        return
+    try:
+        compile_theme(instance)
+    except OSError as e:
+        # Rendering pages retries, so a failed write is not fatal here
+        logger.warning(f"Could not write the theme stylesheet: {e}")
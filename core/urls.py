@@ -1,4 +1,4 @@
-from django.urls import path
+from django.urls import path, re_path
 from . import views
 
 app_name = 'core'
@@ -12,4 +12,7 @@ urlpatterns = [
     path('testimonials/', views.testimonials_page, name='testimonials'),
     path('contact/', views.contact, name='contact'),
     path('newsletter/subscribe/', views.newsletter_subscribe, name='newsletter_subscribe'),
+    path('csrf-token/', views.csrf_token, name='csrf_token'),
+    re_path(r'^theme/(?P<name>theme-[0-9a-f]{12}\.css)$', views.theme_stylesheet, name='theme_stylesheet'),
+    path('metrics', views.metrics, name='metrics'),
 ]
@@ -1,11 +1,22 @@
+import hmac
+
+from django.conf import settings
 from django.shortcuts import render
 from django.contrib.auth.decorators import login_required
+from django.http import Http404, HttpResponse, HttpResponseForbidden, JsonResponse
+from django.middleware.csrf import get_token
+from django.utils.cache import add_never_cache_headers, patch_cache_control
+from prometheus_client import CONTENT_TYPE_LATEST
 from .models import WebsiteSetting, CoreValue, BoardMember, ExecutiveCommittee
 from programs.models import Program, Service, Objective
 from testimonials.models import Testimonial
 from django.shortcuts import redirect
 from django.contrib import messages
+from . import theme
+from .metrics import render_metrics
+from .page_cache import cache_public_page
 
+@cache_public_page(CoreValue, Program, Service, Objective, Testimonial)
 def home(request):
     context = {
         'core_values': CoreValue.objects.filter(is_active=True),  # Add is_active filter
@@ -16,6 +27,7 @@ def home(request):
     }
     return render(request, 'index.html', context)
 
+@cache_public_page(CoreValue, BoardMember, ExecutiveCommittee)
 def about(request):
     context = {
         'core_values': CoreValue.objects.filter(is_active=True).order_by('order'),
@@ -24,6 +36,7 @@ def about(request):
     }
     return render(request, 'about.html', context)
 
+@cache_public_page(Program, Service, Objective)
 def programs(request):
     # Filter by category if provided
     category = request.GET.get('category')
@@ -43,10 +56,11 @@ def programs(request):
     }
     return render(request, 'programs/program_list.html', context)
 
+@cache_public_page(Testimonial)
 def testimonials_page(request):
     from testimonials.models import Testimonial
     context = {
-        'testimonials': Testimonial.objects.filter(status='approved'),
+        'testimonials': Testimonial.objects.filter(status='approved').select_related('user'),
     }
     return render(request, 'testimonials.html', context)
 
@@ -87,3 +101,30 @@ def newsletter_subscribe(request):
 
     return redirect('core:home')
 
+
+def csrf_token(request):
+    """Fresh CSRF token (and cookie) for forms on pages exported by core.static_site"""
+    response = JsonResponse({'token': get_token(request)})
+    add_never_cache_headers(response)
+    return response
+
+
+def theme_stylesheet(request, name):
+    """Compiled theme stylesheet; its name changes with its content, so it is cached for good"""
+    content = theme.stylesheet_content(name)
+    if content is None:
+        raise Http404('No such theme stylesheet')
+    response = HttpResponse(content, content_type='text/css')
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    return response
+
+
+def metrics(request):
+    """Prometheus scrape endpoint, limited to the METRICS_AUTH_TOKEN bearer token or opted-in METRICS_ALLOWED_IPS"""
+    token = settings.METRICS_AUTH_TOKEN
+    authorization = request.headers.get('Authorization', '')
+    authorized = bool(token) and hmac.compare_digest(authorization, f'Bearer {token}')
+    if not authorized and request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return HttpResponseForbidden('Forbidden')
+
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
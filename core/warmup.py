@@ -0,0 +1,104 @@
+"""
+Warm start for a fresh process.
+
+The first request a worker serves otherwise pays for compiling the URL
+patterns, parsing and caching the (large) templates, importing DRF through
+the views and the payment SDKs on first use, and filling the settings and
+page cache entries. warm_up() does all of that up front. gunicorn.conf.py
+runs it in every worker after the fork, and `manage.py warmup` runs it
+on demand (the shared-cache entries it fills then serve every worker).
+"""
+import logging
+import os
+import time
+
+from django.template import TemplateDoesNotExist, TemplateSyntaxError, engines
+from django.urls import URLPattern, URLResolver, get_resolver
+
+logger = logging.getLogger(__name__)
+
+TEMPLATE_EXTENSIONS = ('.html', '.txt', '.css', '.xml')
+
+
+def template_dirs(engine):
+    """Directories the engine's loaders (including those wrapped by the cached loader) read from"""
+    directories = []
+    for loader in engine.engine.template_loaders:
+        for inner in getattr(loader, 'loaders', [loader]):
+            if hasattr(inner, 'get_dirs'):
+                directories.extend(str(directory) for directory in inner.get_dirs())
+    return list(dict.fromkeys(directories))
+
+
+def template_names(engine):
+    """Every template name the engine's loaders provide"""
+    names = set()
+    for directory in template_dirs(engine):
+        for root, _directories, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(TEMPLATE_EXTENSIONS):
+                    names.add(os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def compile_templates():
+    """
+    Load every template so the cached loader holds it compiled; returns
+    (loaded, broken names)
+    """
+    loaded, broken = 0, []
+    for engine in engines.all():
+        if not hasattr(engine, 'engine'):
+            continue  # Not a Django template engine
+        for name in template_names(engine):
+            try:
+                engine.get_template(name)
+                loaded += 1
+            except (TemplateDoesNotExist, TemplateSyntaxError) as e:
+                broken.append(f'{name}: {e}')
+    return loaded, broken
+
+
+def compile_urls(resolver=None):
+    """Import every URLconf and compile every pattern's regex; returns the number of patterns"""
+    resolver = resolver or get_resolver()
+    resolver.reverse_dict  # Builds the reverse lookup tables of this resolver
+    count = 0
+    for entry in resolver.url_patterns:
+        entry.pattern.regex
+        if isinstance(entry, URLResolver):
+            count += compile_urls(entry)
+        elif isinstance(entry, URLPattern):
+            count += 1
+    return count
+
+
+def prime_caches():
+    """Fill the settings snapshot, theme stylesheet and page cache version tokens"""
+    from django.apps import apps
+
+    from . import page_cache, site_settings, theme
+
+    theme.compile_theme(site_settings.get())
+    page_cache.versions([apps.get_model(label) for label in page_cache.CACHED_MODELS])
+
+
+def import_sdks():
+    from donations.providers import import_sdks
+    import_sdks()
+
+
+def warm_up():
+    """Run every warmup step; returns {step: (result, seconds)}"""
+    results = {}
+    steps = (('urls', compile_urls), ('templates', compile_templates), ('sdks', import_sdks), ('caches', prime_caches))
+    for step, func in steps:
+        start = time.perf_counter()
+        try:
+            result = func()
+        except Exception as e:
+            # A cold start is slower, not broken; never keep a worker from serving
+            logger.warning(f"Warmup step {step} failed: {e}")
+            result = e
+        results[step] = (result, time.perf_counter() - start)
+    return results
@@ -1,4 +1,6 @@
 from django.contrib import admin
+
+from core.archive import PayloadAdminMixin
 from .models import Donation, MpesaTransaction, PayPalTransaction, CardTransaction
 
 class DonationAdmin(admin.ModelAdmin):
@@ -7,12 +9,15 @@ class DonationAdmin(admin.ModelAdmin):
     search_fields = ['transaction_id', 'donor_name', 'donor_email']
     readonly_fields = ['created_at', 'updated_at']
     
-class MpesaTransactionAdmin(admin.ModelAdmin):
+class MpesaTransactionAdmin(PayloadAdminMixin, admin.ModelAdmin):
     list_display = ['checkout_request_id', 'donation', 'phone_number', 'result_code', 'transaction_date']
     list_filter = ['result_code']
     search_fields = ['checkout_request_id', 'phone_number', 'mpesa_receipt_number']
 
+class PayloadTransactionAdmin(PayloadAdminMixin, admin.ModelAdmin):
+    pass
+
 admin.site.register(Donation, DonationAdmin)
 admin.site.register(MpesaTransaction, MpesaTransactionAdmin)
-admin.site.register(PayPalTransaction)
-admin.site.register(CardTransaction)
\ No newline at end of file
+admin.site.register(PayPalTransaction, PayloadTransactionAdmin)
+admin.site.register(CardTransaction, PayloadTransactionAdmin)
\ No newline at end of file
@@ -0,0 +1,120 @@
+import logging
+import time
+from django.conf import settings
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+DEFAULT_FAILURE_THRESHOLD = 5
+DEFAULT_FAILURE_WINDOW = 60  # seconds
+DEFAULT_RECOVERY_TIMEOUT = 30  # seconds
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a provider whose breaker is open"""
+
+    def __init__(self, name, retry_after):
+        self.name = name
+        self.retry_after = retry_after
+        super().__init__(f"{name} is temporarily unavailable (retry in {retry_after}s)")
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker for one outbound provider.
+
+    State lives in the CACHE_ALIAS cache. While open, calls raise
+    CircuitOpenError without touching the network. After the recovery
+    timeout a single caller is allowed through as a half-open probe; its
+    outcome closes or re-opens the breaker.
+
+    The single probe and the failure count rely on the cache's add() and
+    incr() being atomic across workers: Redis, Memcached or
+    core.locked_cache.LockedFileBasedCache. Plain FileBasedCache and the DB
+    cache implement both as a read followed by a write.
+    """
+
+    def __init__(self, name, failure_threshold=None, failure_window=None,
+                 recovery_timeout=None, cache_alias=None):
+        config = getattr(settings, 'PROVIDER_CIRCUIT_BREAKER', {})
+        self.name = name
+        self.failure_threshold = failure_threshold or config.get('FAILURE_THRESHOLD', DEFAULT_FAILURE_THRESHOLD)
+        self.failure_window = failure_window or config.get('FAILURE_WINDOW', DEFAULT_FAILURE_WINDOW)
+        self.recovery_timeout = recovery_timeout or config.get('RECOVERY_TIMEOUT', DEFAULT_RECOVERY_TIMEOUT)
+        self.cache_alias = cache_alias or config.get('CACHE_ALIAS', 'default')
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def _key(self, suffix):
+        return f"circuit:{self.name}:{suffix}"
+
+    def _opened_at(self):
+        return self.cache.get(self._key('opened_at'))
+
+    @property
+    def state(self):
+        opened_at = self._opened_at()
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at >= self.recovery_timeout:
+            return HALF_OPEN
+        return OPEN
+
+    def retry_after(self):
+        opened_at = self._opened_at()
+        if opened_at is None:
+            return 0
+        return max(1, int(self.recovery_timeout - (time.time() - opened_at)))
+
+    def before_call(self):
+        """Raise CircuitOpenError unless this call may go out"""
+        state = self.state
+        if state == CLOSED:
+            return
+        # Only one worker gets to probe a half-open provider; cache.add is the lock
+        if state == HALF_OPEN and self.cache.add(self._key('probe'), 1, timeout=self.recovery_timeout):
+            logger.info(f"Circuit {self.name}: half-open, sending probe request")
+            return
+        raise CircuitOpenError(self.name, self.retry_after() or self.recovery_timeout)
+
+    def record_success(self):
+        # One read on the common, healthy path; only clear keys that are there
+        state = self.cache.get_many([self._key('failures'), self._key('opened_at')])
+        if not state:
+            return
+        keys = list(state)
+        if self._key('opened_at') in state:
+            logger.info(f"Circuit {self.name}: probe succeeded, closing breaker")
+            keys.append(self._key('probe'))
+        self.cache.delete_many(keys)
+
+    def record_failure(self):
+        if self.state == HALF_OPEN:
+            self._trip("probe failed")
+            return
+
+        failures_key = self._key('failures')
+        self.cache.add(failures_key, 0, timeout=self.failure_window)
+        try:
+            failures = self.cache.incr(failures_key)
+        except ValueError:
+            # Key expired between add() and incr()
+            self.cache.set(failures_key, 1, timeout=self.failure_window)
+            failures = 1
+
+        if failures >= self.failure_threshold and self._opened_at() is None:
+            self._trip(f"{failures} failures within {self.failure_window}s")
+
+    def _trip(self, reason):
+        logger.warning(f"Circuit {self.name}: opening breaker for {self.recovery_timeout}s ({reason})")
+        self.cache.set(self._key('opened_at'), time.time(), timeout=None)
+        self.cache.delete_many([self._key('failures'), self._key('probe')])
+
+    def reset(self):
+        self.cache.delete_many([self._key('failures'), self._key('opened_at'), self._key('probe')])
@@ -1,10 +1,12 @@
 from django.core.management.base import BaseCommand
 from django.db import models
 from donations.models import Donation
+from staff_dashboard.audit import audited_command
 
 class Command(BaseCommand):
     help = 'Populate receipt numbers for existing donations'
 
+    @audited_command('populate_receipt_numbers')
     def handle(self, *args, **options):
         donations = Donation.objects.filter(receipt_number__isnull=True).order_by('created_at')
         count = 0
@@ -0,0 +1,118 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.conf import settings
+from donations.simulator import (
+    PROVIDERS, LatencyDistribution, ProviderProfile, ProviderSimulator, SimulatorConfig,
+)
+
+
+class Command(BaseCommand):
+    help = 'Run a local M-Pesa/PayPal/Stripe simulator for offline end-to-end and load testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument(
+            '--app-url',
+            default=settings.BASE_URL,
+            help='Base URL of the Django app that receives callbacks and webhooks (default: BASE_URL)',
+        )
+        parser.add_argument(
+            '--latency',
+            action='append',
+            default=[],
+            metavar='[PROVIDER=]SPEC',
+            help='Response latency in ms, e.g. "lognormal:150,0.5" or "mpesa=uniform:300,1200". Repeatable.',
+        )
+        parser.add_argument(
+            '--error-rate',
+            action='append',
+            default=[],
+            metavar='[PROVIDER=]RATE',
+            help='Fraction of requests answered with a 503, e.g. "0.02" or "paypal=0.3". Repeatable.',
+        )
+        parser.add_argument(
+            '--timeout-rate',
+            action='append',
+            default=[],
+            metavar='[PROVIDER=]RATE',
+            help='Fraction of requests that hang for --timeout-seconds. Repeatable.',
+        )
+        parser.add_argument('--timeout-seconds', type=float, default=60)
+        parser.add_argument(
+            '--callback-delay',
+            default='uniform:500,3000',
+            help='Delay before M-Pesa callbacks and Stripe webhooks are sent (ms distribution)',
+        )
+        parser.add_argument(
+            '--callback-failure-rate',
+            type=float,
+            default=0.1,
+            help='Fraction of callbacks/webhooks that report a failed payment',
+        )
+        parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+
+    def handle(self, *args, **options):
+        try:
+            latencies = self.parse_overrides(options['latency'], LatencyDistribution.parse, LatencyDistribution())
+            error_rates = self.parse_overrides(options['error_rate'], float, 0.0)
+            timeout_rates = self.parse_overrides(options['timeout_rate'], float, 0.0)
+            callback_delay = LatencyDistribution.parse(options['callback_delay'])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        profiles = {
+            provider: ProviderProfile(
+                latency=latencies[provider],
+                error_rate=error_rates[provider],
+                timeout_rate=timeout_rates[provider],
+                timeout_seconds=options['timeout_seconds'],
+            )
+            for provider in PROVIDERS
+        }
+        config = SimulatorConfig(
+            app_url=options['app_url'],
+            webhook_secret=settings.STRIPE_WEBHOOK_SECRET,
+            profiles=profiles,
+            callback_delay=callback_delay,
+            callback_failure_rate=options['callback_failure_rate'],
+            seed=options['seed'],
+        )
+
+        server = ProviderSimulator((options['host'], options['port']), config)
+        self.stdout.write(self.style.SUCCESS(f'Provider simulator listening on {server.base_url}'))
+        for provider, profile in profiles.items():
+            self.stdout.write(
+                f'  {provider}: latency {profile.latency}, error rate {profile.error_rate:.1%}, '
+                f'timeout rate {profile.timeout_rate:.1%}'
+            )
+        self.stdout.write(f'  callbacks -> {config.app_url} after {callback_delay}')
+        self.stdout.write('Start the app with:')
+        self.stdout.write(
+            f'  BASE_URL={config.app_url} MPESA_BASE_URL={server.base_url} '
+            f'PAYPAL_BASE_URL={server.base_url} STRIPE_API_BASE={server.base_url} python manage.py runserver'
+        )
+
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write('Simulator stats:')
+            for key, count in sorted(server.stats.items()):
+                self.stdout.write(f'  {key}: {count}')
+
+    def parse_overrides(self, values, parse, default):
+        """Turn ["spec", "mpesa=spec"] into {provider: value}; unprefixed values apply to all providers"""
+        result = {provider: default for provider in PROVIDERS}
+        overrides = {}
+        for value in values:
+            provider, sep, spec = value.partition('=')
+            if not sep:
+                result = {p: parse(value) for p in PROVIDERS}
+            elif provider in PROVIDERS:
+                overrides[provider] = parse(spec)
+            else:
+                raise ValueError(f'Unknown provider "{provider}"; expected one of {", ".join(PROVIDERS)}')
+        result.update(overrides)
+        return result
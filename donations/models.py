@@ -1,6 +1,8 @@
 from django.db import models
 from django.conf import settings
 
+from core.archive import ArchivedPayloadMixin, PayloadManager
+
 class Donation(models.Model):
     PAYMENT_METHODS = (
         ('mpesa', 'M-Pesa'),
@@ -74,7 +76,9 @@ class Donation(models.Model):
 
         super().save(*args, **kwargs)
 
-class MpesaTransaction(models.Model):
+class MpesaTransaction(ArchivedPayloadMixin, models.Model):
+    PAYLOAD_FIELDS = ('raw_response',)
+
     donation = models.OneToOneField(Donation, on_delete=models.CASCADE)
     checkout_request_id = models.CharField(max_length=100)
     merchant_request_id = models.CharField(max_length=100)
@@ -84,27 +88,37 @@ class MpesaTransaction(models.Model):
     phone_number = models.CharField(max_length=20)
     transaction_date = models.DateTimeField(null=True, blank=True)
     raw_response = models.JSONField(default=dict)
+
+    objects = PayloadManager()
     
     def __str__(self):
         return self.checkout_request_id
 
-class PayPalTransaction(models.Model):
+class PayPalTransaction(ArchivedPayloadMixin, models.Model):
+    PAYLOAD_FIELDS = ('raw_response',)
+
     donation = models.OneToOneField(Donation, on_delete=models.CASCADE)
     paypal_order_id = models.CharField(max_length=100)
     paypal_payer_id = models.CharField(max_length=100, blank=True)
     capture_id = models.CharField(max_length=100, blank=True)
     raw_response = models.JSONField(default=dict)
+
+    objects = PayloadManager()
     
     def __str__(self):
         return self.paypal_order_id
 
-class CardTransaction(models.Model):
+class CardTransaction(ArchivedPayloadMixin, models.Model):
+    PAYLOAD_FIELDS = ('raw_response',)
+
     donation = models.OneToOneField(Donation, on_delete=models.CASCADE)
     stripe_payment_intent_id = models.CharField(max_length=100)
     stripe_customer_id = models.CharField(max_length=100, blank=True)
     card_last4 = models.CharField(max_length=4, blank=True)
     card_brand = models.CharField(max_length=50, blank=True)
     raw_response = models.JSONField(default=dict)
+
+    objects = PayloadManager()
     
     def __str__(self):
         return self.stripe_payment_intent_id
\ No newline at end of file
@@ -1,4 +1,3 @@
-import requests
 import base64
 import logging
 import json
@@ -8,6 +7,7 @@ from django.conf import settings
 from django.db import transaction, DatabaseError
 from django.utils import timezone
 from .models import Donation, MpesaTransaction
+from .providers import CircuitOpenError, provider_request
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ def get_mpesa_access_token():
         logger.error("M-Pesa consumer key or secret not set")
         return None
 
-    auth_url = "https://sandbox.safaricom.co.ke/oauth/v1/generate"
+    auth_url = f"{settings.MPESA_BASE_URL}/oauth/v1/generate"
     auth = base64.b64encode(f"{settings.MPESA_CONSUMER_KEY}:{settings.MPESA_CONSUMER_SECRET}".encode()).decode()
 
     headers = {
@@ -27,7 +27,7 @@ def get_mpesa_access_token():
     data = {'grant_type': 'client_credentials'}
 
     try:
-        response = requests.get(auth_url, headers=headers, params=data, timeout=30)
+        response = provider_request('mpesa', 'oauth', 'GET', auth_url, headers=headers, params=data)
         logger.info(f"Token response status: {response.status_code} - {response.text}")
         response.raise_for_status()
         response_data = response.json()
@@ -37,6 +37,8 @@ def get_mpesa_access_token():
         else:
             logger.error(f"Access token not found in response: {response_data}")
             return None
+    except CircuitOpenError:
+        raise
     except json.JSONDecodeError:
         logger.error(f"Invalid JSON response: {response.text}")
         return None
@@ -51,7 +53,9 @@ def generate_mpesa_password():
     return base64.b64encode(data.encode()).decode()
 
 def initiate_stk_push(phone, amount, account_reference, description="Donation"):
-    """Initiate STK Push"""
+    """Initiate STK Push. Raises CircuitOpenError while M-Pesa is degraded."""
+    import requests
+
     access_token = get_mpesa_access_token()
     if not access_token:
         return None
@@ -73,22 +77,24 @@ def initiate_stk_push(phone, amount, account_reference, description="Donation"):
         "PartyA": phone,
         "PartyB": settings.MPESA_SHORTCODE,
         "PhoneNumber": phone,
-        "CallBackURL": "https://ysfdemo.pythonanywhere.com/donations/mpesa-callback/",
+        "CallBackURL": f"{settings.BASE_URL}/donations/mpesa-callback/",
         "AccountReference": account_reference,
         "TransactionDesc": description
     }
     
     try:
         logger.info(f"STK Push payload: {payload}")
-        response = requests.post(
-            "https://sandbox.safaricom.co.ke/mpesa/stkpush/v1/processrequest",
+        response = provider_request(
+            'mpesa', 'stk_push', 'POST',
+            f"{settings.MPESA_BASE_URL}/mpesa/stkpush/v1/processrequest",
             json=payload,
-            headers=headers,
-            timeout=30
+            headers=headers
         )
         logger.info(f"STK Push response status: {response.status_code} - {response.text}")
         response.raise_for_status()
         return response.json()
+    except CircuitOpenError:
+        raise
     except requests.exceptions.HTTPError as e:
         logger.error(f"STK Push HTTP Error: {e} - Response: {response.text if 'response' in locals() else 'No response'}")
         return None
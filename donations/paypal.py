@@ -1,6 +1,6 @@
-import requests
 import base64
 from django.conf import settings
+from .providers import CircuitOpenError, provider_request
 
 def get_paypal_access_token():
     """Get PayPal access token"""
@@ -14,14 +14,16 @@ def get_paypal_access_token():
     data = {'grant_type': 'client_credentials'}
     
     try:
-        response = requests.post(
-            'https://api-m.sandbox.paypal.com/v1/oauth2/token',
+        response = provider_request(
+            'paypal', 'oauth', 'POST',
+            f'{settings.PAYPAL_BASE_URL}/v1/oauth2/token',
             headers=headers,
-            data=data,
-            timeout=30
+            data=data
         )
         response.raise_for_status()
         return response.json()['access_token']
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"PayPal Token Error: {e}")
         return None
@@ -52,14 +54,16 @@ def create_paypal_order(amount, currency='USD', return_url=None, cancel_url=None
     }
     
     try:
-        response = requests.post(
-            'https://api-m.sandbox.paypal.com/v2/checkout/orders',
+        response = provider_request(
+            'paypal', 'create_order', 'POST',
+            f'{settings.PAYPAL_BASE_URL}/v2/checkout/orders',
             json=payload,
-            headers=headers,
-            timeout=30
+            headers=headers
         )
         response.raise_for_status()
         return response.json()
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"PayPal Order Error: {e}")
         return None
@@ -76,14 +80,16 @@ def capture_paypal_order(order_id):
     }
     
     try:
-        response = requests.post(
-            f'https://api-m.sandbox.paypal.com/v2/checkout/orders/{order_id}/capture',
+        response = provider_request(
+            'paypal', 'capture_order', 'POST',
+            f'{settings.PAYPAL_BASE_URL}/v2/checkout/orders/{order_id}/capture',
             headers=headers,
-            json={},
-            timeout=30
+            json={}
         )
         response.raise_for_status()
         return response.json()
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"PayPal Capture Error: {e}")
         return None
\ No newline at end of file
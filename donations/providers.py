@@ -0,0 +1,150 @@
+import logging
+import time
+from django.conf import settings
+from core import metrics
+from core.profiling import record_provider
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_BUDGET = 10  # seconds
+
+# The provider SDKs (requests, stripe) are imported inside the functions that
+# use them, so processes that never call a provider (management commands,
+# workers that only serve pages) don't pay for loading them.
+SDK_MODULES = ('requests', 'stripe')
+
+_breakers = {}
+_stripe_clients = {}
+
+
+def stripe_failure_errors():
+    """
+    Stripe errors that count against the breaker; errors that say nothing about
+    Stripe's health (bad card, invalid parameters) must not trip it.
+    """
+    import stripe
+    return (stripe.error.APIConnectionError, stripe.error.APIError, stripe.error.RateLimitError)
+
+
+def import_sdks():
+    """Load the provider SDKs now, e.g. in a gunicorn master before it forks"""
+    import importlib
+    for name in SDK_MODULES:
+        importlib.import_module(name)
+
+
+def get_breaker(provider):
+    """Return the shared circuit breaker for a provider"""
+    if provider not in _breakers:
+        _breakers[provider] = CircuitBreaker(provider)
+    return _breakers[provider]
+
+
+def get_latency_budget(provider, operation):
+    """Return the timeout in seconds allowed for one provider operation"""
+    budgets = getattr(settings, 'PROVIDER_LATENCY_BUDGETS', {}).get(provider, {})
+    return budgets.get(operation, budgets.get('default', DEFAULT_LATENCY_BUDGET))
+
+
+def is_available(provider):
+    """True unless the provider's breaker is open"""
+    return get_breaker(provider).state != 'open'
+
+
+def _before_call(provider, operation):
+    try:
+        get_breaker(provider).before_call()
+    except CircuitOpenError:
+        metrics.count_provider_error(provider, operation, 'circuit_open')
+        raise
+
+
+def _record_latency(provider, operation, start):
+    seconds = time.perf_counter() - start
+    record_provider(provider, seconds)
+    metrics.observe_provider_call(provider, operation, seconds)
+
+
+def provider_request(provider, operation, method, url, **kwargs):
+    """
+    Send an HTTP request to a provider within its latency budget.
+
+    Raises CircuitOpenError without sending anything while the provider's
+    breaker is open. Connection errors, timeouts, 429s and 5xx responses
+    count as failures; anything else closes the breaker.
+    """
+    import requests
+
+    breaker = get_breaker(provider)
+    _before_call(provider, operation)
+    kwargs.setdefault('timeout', get_latency_budget(provider, operation))
+
+    start = time.perf_counter()
+    try:
+        response = requests.request(method, url, **kwargs)
+    except requests.exceptions.Timeout:
+        breaker.record_failure()
+        metrics.count_provider_error(provider, operation, 'timeout')
+        raise
+    except requests.exceptions.RequestException:
+        breaker.record_failure()
+        metrics.count_provider_error(provider, operation, 'connection')
+        raise
+    finally:
+        _record_latency(provider, operation, start)
+
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+        metrics.count_provider_error(provider, operation, f'http_{response.status_code}')
+    else:
+        breaker.record_success()
+    return response
+
+
+def provider_call(provider, operation, func, *args, failure_exceptions=(Exception,), **kwargs):
+    """
+    Run an SDK call through the provider's breaker. Exceptions outside
+    failure_exceptions (bad input, bugs) say nothing about the provider's
+    health, so they propagate without changing the breaker's state.
+    """
+    breaker = get_breaker(provider)
+    _before_call(provider, operation)
+
+    start = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except failure_exceptions as e:
+        breaker.record_failure()
+        metrics.count_provider_error(provider, operation, type(e).__name__)
+        raise
+    finally:
+        _record_latency(provider, operation, start)
+
+    breaker.record_success()
+    return result
+
+
+def get_stripe_client(operation):
+    """Return a StripeClient whose HTTP timeout is the operation's latency budget"""
+    import stripe
+
+    timeout = get_latency_budget('stripe', operation)
+    if timeout not in _stripe_clients:
+        _stripe_clients[timeout] = stripe.StripeClient(
+            settings.STRIPE_SECRET_KEY,
+            base_addresses={'api': settings.STRIPE_API_BASE},
+            http_client=stripe.RequestsClient(timeout=timeout),
+            max_network_retries=0,
+        )
+    return _stripe_clients[timeout]
+
+
+def stripe_call(operation, method_path, params):
+    """Call a StripeClient service method, e.g. ('payment_intent', 'payment_intents.create', {...})"""
+    target = get_stripe_client(operation).v1
+    for attr in method_path.split('.'):
+        target = getattr(target, attr)
+    return provider_call('stripe', operation, target, params=params,
+                         failure_exceptions=stripe_failure_errors())
+
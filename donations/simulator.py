@@ -0,0 +1,348 @@
+"""
+Local stand-in for the Safaricom, PayPal and Stripe sandboxes.
+
+Serves the endpoints the donation flow uses (OAuth, STK push, checkout
+orders/capture, PaymentIntents, customers) with configurable latency and
+error rates, then fires M-Pesa callbacks and Stripe webhooks back into the
+app, so the whole payment pipeline can run offline. Started with
+``python manage.py provider_simulator``.
+"""
+import hashlib
+import hmac
+import json
+import logging
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+PROVIDERS = ('mpesa', 'paypal', 'stripe')
+
+
+class LatencyDistribution:
+    """
+    Response delay, parsed from specs like ``fixed:50``, ``uniform:20,200``,
+    ``normal:120,30`` or ``lognormal:120,0.6`` (milliseconds; lognormal takes
+    the median and sigma).
+    """
+
+    KINDS = ('fixed', 'uniform', 'normal', 'lognormal')
+
+    def __init__(self, kind='fixed', params=(0,)):
+        if kind not in self.KINDS:
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = tuple(float(p) for p in params)
+
+    @classmethod
+    def parse(cls, spec):
+        kind, _, args = spec.partition(':')
+        params = [p for p in args.split(',') if p] or [0]
+        return cls(kind.strip(), params)
+
+    def sample(self, rng):
+        """Return a delay in seconds"""
+        if self.kind == 'fixed':
+            ms = self.params[0]
+        elif self.kind == 'uniform':
+            ms = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == 'normal':
+            ms = rng.gauss(self.params[0], self.params[1])
+        else:
+            ms = rng.lognormvariate(math.log(max(self.params[0], 1e-3)), self.params[1])
+        return max(ms, 0) / 1000
+
+    def __str__(self):
+        return f"{self.kind}:{','.join(f'{p:g}' for p in self.params)}"
+
+
+class ProviderProfile:
+    """Latency and failure behaviour for one simulated provider"""
+
+    def __init__(self, latency=None, error_rate=0.0, timeout_rate=0.0, timeout_seconds=60):
+        self.latency = latency or LatencyDistribution()
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_seconds = timeout_seconds
+
+
+class SimulatorConfig:
+    def __init__(self, app_url, webhook_secret, profiles=None, callback_delay=None,
+                 callback_failure_rate=0.0, seed=None):
+        self.app_url = app_url.rstrip('/')
+        self.webhook_secret = webhook_secret
+        self.profiles = profiles or {provider: ProviderProfile() for provider in PROVIDERS}
+        self.callback_delay = callback_delay or LatencyDistribution('fixed', (1000,))
+        self.callback_failure_rate = callback_failure_rate
+        self.seed = seed
+
+
+class ProviderSimulator(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config):
+        super().__init__(address, SimulatorHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self.rng_lock = threading.Lock()
+        self.stats = Counter()
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def random(self):
+        with self.rng_lock:
+            return self.rng.random()
+
+    def sample(self, distribution):
+        with self.rng_lock:
+            return distribution.sample(self.rng)
+
+    def count(self, key):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def schedule(self, delay, func, *args):
+        timer = threading.Timer(delay, func, args=args)
+        timer.daemon = True
+        timer.start()
+
+    # Asynchronous callbacks
+
+    def send_mpesa_callback(self, callback_url, payload):
+        checkout_id = f"ws_CO_{datetime.now().strftime('%d%m%Y%H%M%S')}{uuid.uuid4().hex[:10]}"
+        with self.rng_lock:
+            merchant_id = f"{self.rng.randint(10000, 99999)}-{self.rng.randint(1000000, 9999999)}-1"
+        failed = self.random() < self.config.callback_failure_rate
+
+        stk_callback = {
+            'MerchantRequestID': merchant_id,
+            'CheckoutRequestID': checkout_id,
+            'ResultCode': 1032 if failed else 0,
+            'ResultDesc': 'Request cancelled by user' if failed else 'The service request is processed successfully.',
+        }
+        if not failed:
+            stk_callback['CallbackMetadata'] = {'Item': [
+                {'Name': 'Amount', 'Value': float(payload.get('Amount', 0))},
+                {'Name': 'MpesaReceiptNumber', 'Value': f"SIM{uuid.uuid4().hex[:7].upper()}"},
+                {'Name': 'TransactionDate', 'Value': int(datetime.utcnow().strftime('%Y%m%d%H%M%S'))},
+                {'Name': 'PhoneNumber', 'Value': int(payload.get('PhoneNumber') or 0)},
+            ]}
+
+        self.schedule(self.sample(self.config.callback_delay), self._post_json, 'mpesa_callback',
+                      callback_url, {'Body': {'stkCallback': stk_callback}}, {})
+        return merchant_id, checkout_id
+
+    def send_stripe_webhook(self, payment_intent):
+        failed = self.random() < self.config.callback_failure_rate
+        event_type = 'payment_intent.payment_failed' if failed else 'payment_intent.succeeded'
+        payment_intent = dict(payment_intent, status='requires_payment_method' if failed else 'succeeded')
+        event = {
+            'id': f"evt_{uuid.uuid4().hex[:24]}",
+            'object': 'event',
+            'api_version': '2024-06-20',
+            'created': int(time.time()),
+            'type': event_type,
+            'data': {'object': payment_intent},
+        }
+        body = json.dumps(event)
+        timestamp = int(time.time())
+        signature = hmac.new(
+            self.config.webhook_secret.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256
+        ).hexdigest()
+        headers = {'Stripe-Signature': f"t={timestamp},v1={signature}", 'Content-Type': 'application/json'}
+        self.schedule(self.sample(self.config.callback_delay), self._post_raw, 'stripe_webhook',
+                      f"{self.config.app_url}/donations/stripe-webhook/", body, headers)
+
+    def _post_json(self, label, url, payload, headers):
+        self._post_raw(label, url, json.dumps(payload), dict(headers, **{'Content-Type': 'application/json'}))
+
+    def _post_raw(self, label, url, body, headers):
+        try:
+            response = requests.post(url, data=body, headers=headers, timeout=30)
+            self.count(f"{label}:{response.status_code}")
+        except requests.exceptions.RequestException as e:
+            self.count(f"{label}:error")
+            logger.warning(f"Simulator {label} to {url} failed: {e}")
+
+
+class SimulatorHandler(BaseHTTPRequestHandler):
+    server_version = 'ProviderSimulator/1.0'
+
+    ROUTES = [
+        ('GET', r'^/oauth/v1/generate$', 'mpesa', 'mpesa_oauth'),
+        ('POST', r'^/mpesa/stkpush/v1/processrequest$', 'mpesa', 'mpesa_stk_push'),
+        ('POST', r'^/v1/oauth2/token$', 'paypal', 'paypal_oauth'),
+        ('POST', r'^/v2/checkout/orders$', 'paypal', 'paypal_create_order'),
+        ('POST', r'^/v2/checkout/orders/(?P<order_id>[^/]+)/capture$', 'paypal', 'paypal_capture_order'),
+        ('POST', r'^/v1/payment_intents$', 'stripe', 'stripe_create_payment_intent'),
+        ('POST', r'^/v1/customers$', 'stripe', 'stripe_create_customer'),
+    ]
+
+    def do_GET(self):
+        self.dispatch('GET')
+
+    def do_POST(self):
+        self.dispatch('POST')
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    def dispatch(self, method):
+        path = urlparse(self.path).path
+        for route_method, pattern, provider, handler_name in self.ROUTES:
+            match = re.match(pattern, path)
+            if route_method == method and match:
+                break
+        else:
+            self.send_json(404, {'error': f'No simulated endpoint for {method} {path}'})
+            return
+
+        self.server.count(handler_name)
+        profile = self.server.config.profiles[provider]
+        body = self.read_body()
+
+        roll = self.server.random()
+        if roll < profile.timeout_rate:
+            self.server.count(f"{handler_name}:timeout")
+            time.sleep(profile.timeout_seconds)
+            return
+        time.sleep(self.server.sample(profile.latency))
+        if roll < profile.timeout_rate + profile.error_rate:
+            self.server.count(f"{handler_name}:error")
+            self.send_json(503, {'error': 'Simulated provider error'})
+            return
+
+        status, payload = getattr(self, handler_name)(body, **match.groupdict())
+        self.send_json(status, payload)
+
+    def read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length).decode() if length else ''
+        if not raw:
+            return {}
+        if 'application/json' in (self.headers.get('Content-Type') or ''):
+            try:
+                return json.loads(raw)
+            except json.JSONDecodeError:
+                return {}
+        return parse_form(raw)
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Request-Id', f"req_{uuid.uuid4().hex[:14]}")
+        self.end_headers()
+        self.wfile.write(body)
+
+    # M-Pesa (Daraja)
+
+    def mpesa_oauth(self, body):
+        return 200, {'access_token': f"sim{uuid.uuid4().hex}", 'expires_in': '3599'}
+
+    def mpesa_stk_push(self, body):
+        callback_url = body.get('CallBackURL')
+        if not callback_url:
+            return 400, {'errorCode': '400.002.02', 'errorMessage': 'Bad Request - Invalid CallBackURL'}
+        merchant_id, checkout_id = self.server.send_mpesa_callback(callback_url, body)
+        return 200, {
+            'MerchantRequestID': merchant_id,
+            'CheckoutRequestID': checkout_id,
+            'ResponseCode': '0',
+            'ResponseDescription': 'Success. Request accepted for processing',
+            'CustomerMessage': 'Success. Request accepted for processing',
+        }
+
+    # PayPal
+
+    def paypal_oauth(self, body):
+        return 200, {
+            'scope': 'https://uri.paypal.com/services/payments/payment',
+            'access_token': f"A21AA{uuid.uuid4().hex}",
+            'token_type': 'Bearer',
+            'app_id': 'APP-SIMULATOR',
+            'expires_in': 32400,
+        }
+
+    def paypal_create_order(self, body):
+        order_id = uuid.uuid4().hex[:17].upper()
+        context = body.get('application_context', {})
+        return_url = context.get('return_url', f"{self.server.config.app_url}/")
+        separator = '&' if '?' in return_url else '?'
+        return 201, {
+            'id': order_id,
+            'status': 'CREATED',
+            'purchase_units': body.get('purchase_units', []),
+            'links': [
+                {'href': f"{self.server.base_url}/v2/checkout/orders/{order_id}", 'rel': 'self', 'method': 'GET'},
+                # Approval is simulated: the donor is sent straight back to the return URL
+                {'href': f"{return_url}{separator}token={order_id}&PayerID=SIMPAYER", 'rel': 'approve', 'method': 'GET'},
+                {'href': f"{self.server.base_url}/v2/checkout/orders/{order_id}/capture", 'rel': 'capture', 'method': 'POST'},
+            ],
+        }
+
+    def paypal_capture_order(self, body, order_id):
+        return 201, {
+            'id': order_id,
+            'status': 'COMPLETED',
+            'payer': {'payer_id': 'SIMPAYER'},
+            'purchase_units': [{'payments': {'captures': [
+                {'id': uuid.uuid4().hex[:17].upper(), 'status': 'COMPLETED'}
+            ]}}],
+        }
+
+    # Stripe
+
+    def stripe_create_payment_intent(self, body):
+        intent_id = f"pi_{uuid.uuid4().hex[:24]}"
+        payment_intent = {
+            'id': intent_id,
+            'object': 'payment_intent',
+            'amount': int(body.get('amount', 0)),
+            'currency': body.get('currency', 'kes'),
+            'client_secret': f"{intent_id}_secret_{uuid.uuid4().hex[:24]}",
+            'created': int(time.time()),
+            'livemode': False,
+            'metadata': body.get('metadata', {}),
+            'status': 'requires_payment_method',
+        }
+        self.server.send_stripe_webhook(payment_intent)
+        return 200, payment_intent
+
+    def stripe_create_customer(self, body):
+        return 200, {
+            'id': f"cus_{uuid.uuid4().hex[:14]}",
+            'object': 'customer',
+            'created': int(time.time()),
+            'email': body.get('email'),
+            'name': body.get('name'),
+            'livemode': False,
+            'metadata': body.get('metadata', {}),
+        }
+
+
+def parse_form(raw):
+    """Decode Stripe-style form bodies, turning ``metadata[key]=value`` into nested dicts"""
+    data = {}
+    for key, value in parse_qsl(raw, keep_blank_values=True):
+        parts = re.findall(r'[^\[\]]+', key)
+        target = data
+        for part in parts[:-1]:
+            target = target.setdefault(part, {})
+        target[parts[-1]] = value
+    return data
@@ -1,16 +1,16 @@
-import stripe
 from django.conf import settings
-
-stripe.api_key = settings.STRIPE_SECRET_KEY
+from .providers import stripe_call
 
 def create_stripe_payment_intent(amount, currency='kes', metadata=None):
-    """Create Stripe payment intent"""
+    """Create Stripe payment intent. Raises CircuitOpenError while Stripe is degraded."""
+    import stripe
+
     try:
-        intent = stripe.PaymentIntent.create(
-            amount=int(amount * 100),  # Convert to cents
-            currency=currency,
-            metadata=metadata or {}
-        )
+        intent = stripe_call('payment_intent', 'payment_intents.create', {
+            'amount': int(amount * 100),  # Convert to cents
+            'currency': currency,
+            'metadata': metadata or {}
+        })
         return intent
     except stripe.error.StripeError as e:
         print(f"Stripe Error: {e}")
@@ -18,11 +18,13 @@ def create_stripe_payment_intent(amount, currency='kes', metadata=None):
 
 def create_stripe_customer(email, name=None):
     """Create Stripe customer"""
+    import stripe
+
     try:
-        customer = stripe.Customer.create(
-            email=email,
-            name=name
-        )
+        customer = stripe_call('customer', 'customers.create', {
+            'email': email,
+            'name': name
+        })
         return customer
     except stripe.error.StripeError as e:
         print(f"Stripe Customer Error: {e}")
@@ -30,6 +32,8 @@ def create_stripe_customer(email, name=None):
 
 def handle_stripe_webhook(payload, sig_header):
     """Handle Stripe webhook"""
+    import stripe
+
     try:
         event = stripe.Webhook.construct_event(
             payload, sig_header, settings.STRIPE_WEBHOOK_SECRET
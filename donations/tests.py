@@ -1,3 +1,342 @@
-from django.test import TestCase
+import json
+import multiprocessing
+import shutil
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+import requests
+import stripe
+from django.conf import settings
+from django.core.cache import caches
+from django.test import Client, LiveServerTestCase, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from api import log_buffer
+from core.locked_cache import LockedFileBasedCache
+from core.tests import remove_temp_media, temp_media
+from loadtest import cli, report
+from staff_dashboard import audit
+
+from . import providers
+from .models import Donation
+
+from .circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError
+from .simulator import LatencyDistribution, ProviderSimulator, SimulatorConfig
+
+
+BREAKER_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'circuit_breaker': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'breaker-tests'},
+}
+
+
+def http_response(status_code, data=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(data or {}).encode()
+    return response
+
+
+@override_settings(CACHES=BREAKER_CACHES)
+class CircuitBreakerTests(SimpleTestCase):
+    """State transitions of the provider circuit breaker"""
+
+    def setUp(self):
+        caches['circuit_breaker'].clear()
+        self.breaker = CircuitBreaker('test', failure_threshold=3, failure_window=60, recovery_timeout=30)
+        self.now = 1000.0
+        patcher = mock.patch('donations.circuit_breaker.time.time', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def trip(self):
+        for _ in range(3):
+            self.breaker.before_call()
+            self.breaker.record_failure()
+
+    def test_opens_after_threshold_failures(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        with self.assertRaises(CircuitOpenError) as raised:
+            self.breaker.before_call()
+        self.assertEqual(raised.exception.retry_after, 30)
+
+    def test_success_resets_the_failure_count(self):
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_healthy_success_does_not_write(self):
+        with mock.patch.object(caches['circuit_breaker'], 'delete_many') as delete_many:
+            self.breaker.record_success()
+        delete_many.assert_not_called()
+
+    def test_single_probe_when_half_open(self):
+        self.trip()
+        self.now += 30
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.before_call()  # The probe
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.before_call()
+
+    def test_successful_probe_closes(self):
+        self.trip()
+        self.now += 30
+        self.breaker.before_call()
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.breaker.before_call()
+
+    def test_failed_probe_reopens(self):
+        self.trip()
+        self.now += 30
+        self.breaker.before_call()
+        self.breaker.record_failure()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.now += 30
+        self.breaker.before_call()  # A new probe once the recovery timeout passes again
+
+
+@override_settings(
+    CACHES=BREAKER_CACHES,
+    PROVIDER_CIRCUIT_BREAKER={'FAILURE_THRESHOLD': 2, 'FAILURE_WINDOW': 60, 'RECOVERY_TIMEOUT': 30,
+                              'CACHE_ALIAS': 'circuit_breaker'},
+    PROVIDER_LATENCY_BUDGETS={'paypal': {'oauth': 3, 'default': 7}},
+)
+class ProviderCallTests(SimpleTestCase):
+    """Latency budgets and which outcomes count against a provider's breaker"""
+
+    def setUp(self):
+        caches['circuit_breaker'].clear()
+        providers._breakers.clear()
+        self.addCleanup(providers._breakers.clear)
+
+    def request(self, **kwargs):
+        return providers.provider_request('paypal', 'oauth', 'POST', 'https://paypal.test/token', **kwargs)
+
+    def test_request_timeout_is_the_latency_budget(self):
+        with mock.patch('requests.request', return_value=http_response(200)) as send:
+            self.request()
+            providers.provider_request('paypal', 'capture_order', 'POST', 'https://paypal.test/capture')
+        self.assertEqual(send.call_args_list[0].kwargs['timeout'], 3)
+        self.assertEqual(send.call_args_list[1].kwargs['timeout'], 7)
+
+    def test_timeouts_open_the_breaker_without_sending(self):
+        with mock.patch('requests.request', side_effect=requests.exceptions.Timeout) as send:
+            for _ in range(2):
+                with self.assertRaises(requests.exceptions.Timeout):
+                    self.request()
+            with self.assertRaises(providers.CircuitOpenError) as raised:
+                self.request()
+        self.assertEqual(send.call_count, 2)
+        self.assertIn(raised.exception.retry_after, range(1, 31))
+        self.assertFalse(providers.is_available('paypal'))
+
+    def test_server_errors_count_and_client_errors_do_not(self):
+        with mock.patch('requests.request', return_value=http_response(400)):
+            self.request()
+            self.request()
+        self.assertTrue(providers.is_available('paypal'))
+        with mock.patch('requests.request', return_value=http_response(503)):
+            self.request()
+            self.request()
+        self.assertFalse(providers.is_available('paypal'))
+
+    def test_sdk_failures_count(self):
+        failing = mock.Mock(side_effect=stripe.error.APIConnectionError('down'))
+        for _ in range(2):
+            with self.assertRaises(stripe.error.APIConnectionError):
+                providers.provider_call('stripe', 'payment_intent', failing,
+                                        failure_exceptions=providers.stripe_failure_errors())
+        self.assertFalse(providers.is_available('stripe'))
+
+    def test_other_errors_leave_the_breaker_alone(self):
+        breaker = providers.get_breaker('stripe')
+        breaker.record_failure()
+        for error in (stripe.error.CardError('declined', 'number', 'card_declined'), KeyError('bug')):
+            with self.assertRaises(type(error)):
+                providers.provider_call('stripe', 'payment_intent', mock.Mock(side_effect=error),
+                                        failure_exceptions=providers.stripe_failure_errors())
+        breaker.record_failure()
+        self.assertFalse(providers.is_available('stripe'))
+
+
+@override_settings(CACHES=BREAKER_CACHES)
+class DegradedModeTests(TestCase):
+    """While a breaker is open, the API answers 503 with Retry-After and the donation views fail fast"""
+
+    def setUp(self):
+        caches['circuit_breaker'].clear()
+        providers._breakers.clear()
+        self.addCleanup(providers._breakers.clear)
+        for writer in (log_buffer.writer, audit.writer):
+            patcher = mock.patch.object(writer, 'add')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client = Client(HTTP_HOST='localhost')
+        self.donation = Donation.objects.create(
+            amount=25, currency='USD', payment_method='paypal', donor_name='Dee Donor',
+            donor_email='dee@example.com', transaction_id='ORDER-1',
+        )
+
+    def test_api_answers_503_with_retry_after(self):
+        providers.get_breaker('mpesa')._trip('test')
+        with mock.patch('requests.request') as send:
+            response = self.client.post(
+                reverse('api:mpesa_stk_push'), {'phone': '254700000000', 'amount': 10}, content_type='application/json',
+            )
+        send.assert_not_called()
+        self.assertEqual(response.status_code, 503)
+        self.assertIn(int(response['Retry-After']), range(1, 31))
+        self.assertEqual(response.json()['provider'], 'mpesa')
+        self.assertTrue(response.json()['degraded'])
+
+    def test_payment_start_redirects_back_to_the_form(self):
+        providers.get_breaker('paypal')._trip('test')
+        response = self.client.get(reverse('donations:paypal_payment', args=[self.donation.id]))
+        self.assertRedirects(response, reverse('donations:donate'), fetch_redirect_response=False)
+
+    def test_approved_capture_retried_once_paypal_recovers(self):
+        breaker = providers.get_breaker('paypal')
+        breaker._trip('test')
+        response = self.client.get(reverse('donations:paypal_success', args=[self.donation.id]), {'token': 'ORDER-2'})
+        pending = reverse('donations:payment_pending', args=[self.donation.id])
+        self.assertRedirects(response, pending, fetch_redirect_response=False)
+        self.donation.refresh_from_db()
+        self.assertEqual((self.donation.status, self.donation.transaction_id), ('pending', 'ORDER-2'))
+
+        # The pending page polls check_payment, which keeps waiting while the breaker is open
+        check = reverse('donations:check_payment', args=[self.donation.id])
+        self.assertRedirects(self.client.get(check), pending, fetch_redirect_response=False)
+
+        breaker.reset()
+        replies = [http_response(200, {'access_token': 'token'}), http_response(201, {'status': 'COMPLETED'})]
+        with mock.patch('requests.request', side_effect=replies) as send:
+            response = self.client.get(check)
+        self.assertTrue(send.call_args_list[1].args[1].endswith('/v2/checkout/orders/ORDER-2/capture'))
+        self.assertRedirects(response, reverse('donations:success', args=[self.donation.id]),
+                             fetch_redirect_response=False)
+        self.donation.refresh_from_db()
+        self.assertEqual(self.donation.status, 'completed')
+
+
+def _count_failures(location, times):
+    cache = LockedFileBasedCache(location, {})
+    for _ in range(times):
+        cache.add('failures', 0, timeout=60)
+        cache.incr('failures')
+
+
+def _claim_probe(location, claimed):
+    if LockedFileBasedCache(location, {}).add('probe', 1, timeout=60):
+        claimed.put(1)
+
+
+class LockedFileBasedCacheTests(SimpleTestCase):
+    """add() and incr() stay atomic when several processes share the cache directory"""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp(prefix='youthshield-breaker-cache-')
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.context = multiprocessing.get_context('fork')
+
+    def run_processes(self, target, *args, count=4):
+        processes = [self.context.Process(target=target, args=args) for _ in range(count)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(30)
+            self.assertEqual(process.exitcode, 0)
+
+    def test_no_lost_increments(self):
+        self.run_processes(_count_failures, self.location, 50)
+        self.assertEqual(LockedFileBasedCache(self.location, {}).get('failures'), 200)
+
+    def test_single_add_wins(self):
+        claimed = self.context.Queue()
+        self.run_processes(_claim_probe, self.location, claimed, count=8)
+        self.assertEqual(claimed.get(timeout=5), 1)
+        self.assertTrue(claimed.empty())
+
+    def test_incr_keeps_expiry(self):
+        cache = LockedFileBasedCache(self.location, {})
+        cache.set('failures', 1, timeout=60)
+        with mock.patch('core.locked_cache.time.time', return_value=time.time() + 30):
+            cache.incr('failures')
+        with mock.patch('django.core.cache.backends.filebased.time.time', return_value=time.time() + 61):
+            self.assertIsNone(cache.get('failures'))
+        with self.assertRaises(ValueError):
+            cache.incr('missing')
+
+
+@override_settings(
+    CACHES=BREAKER_CACHES,
+    PAGE_CACHE={'ENABLED': False},
+    PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    **temp_media(),
+    STORAGES={
+        'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+        'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+    },
+)
+class SimulatorLoadTestSmokeTests(LiveServerTestCase):
+    """A short donate run of the load-test harness against the app, backed by the provider simulator"""
+
+    def setUp(self):
+        caches['circuit_breaker'].clear()
+        providers._breakers.clear()
+        self.addCleanup(providers._breakers.clear)
+        for writer in (log_buffer.writer, audit.writer):
+            patcher = mock.patch.object(writer, 'add')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        config = SimulatorConfig(
+            app_url=self.live_server_url, webhook_secret=settings.STRIPE_WEBHOOK_SECRET,
+            callback_delay=LatencyDistribution('fixed', (50,)), seed=1,
+        )
+        self.simulator = ProviderSimulator(('127.0.0.1', 0), config)
+        threading.Thread(target=self.simulator.serve_forever, daemon=True).start()
+        self.addCleanup(self.simulator.server_close)
+        self.addCleanup(self.simulator.shutdown)
+        self.output = Path(tempfile.mkdtemp(prefix='youthshield-loadtest-'))
+        self.addCleanup(shutil.rmtree, self.output, ignore_errors=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        remove_temp_media()
+        super().tearDownClass()
+
+    def test_donate_run_report(self):
+        json_path = self.output / 'report.json'
+        with self.settings(BASE_URL=self.live_server_url, MPESA_BASE_URL=self.simulator.base_url,
+                           PAYPAL_BASE_URL=self.simulator.base_url, STRIPE_API_BASE=self.simulator.base_url), \
+                redirect_stdout(StringIO()):
+            exit_code = cli.main([
+                'run', '--base-url', self.live_server_url, '--scenario', 'donate', '--users', '2',
+                '--duration', '1', '--ramp-up', '0', '--think-time', '0', '--seed', 'smoke',
+                '--output', str(json_path),
+            ])
+
+        result = report.load_json(json_path)
+        self.assertEqual(exit_code, 0, result['errors'])
+        self.assertTrue(json_path.with_suffix('.html').exists())
+        self.assertEqual(result['meta']['scenario_mix'], {'donate': 1.0})
+        self.assertGreater(result['totals']['requests'], 0)
+        self.assertIn('GET /donations/', result['endpoints'])
+        self.assertTrue(any(self.simulator.stats))
+        for stats in (result['totals'], *result['endpoints'].values()):
+            self.assertLessEqual(stats['latency_ms']['p50'], stats['latency_ms']['p95'])
+            self.assertLessEqual(stats['latency_ms']['p95'], stats['latency_ms']['max'])
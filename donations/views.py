@@ -10,6 +10,22 @@ from .forms import DonationForm
 from .mpesa import initiate_stk_push, handle_mpesa_callback
 from .paypal import create_paypal_order, capture_paypal_order
 from .stripe_handler import create_stripe_payment_intent, handle_stripe_webhook
+from .providers import CircuitOpenError
+
+PROVIDER_NAMES = {
+    'mpesa': 'M-Pesa',
+    'paypal': 'PayPal',
+    'stripe': 'Card payments',
+}
+
+def provider_unavailable(request, error):
+    """Fail fast with a degraded-mode message while a provider's breaker is open"""
+    provider_name = PROVIDER_NAMES.get(error.name, error.name)
+    messages.warning(
+        request,
+        f'{provider_name} is temporarily unavailable. Please try again in a few minutes or choose another payment method.'
+    )
+    return redirect('donations:donate')
 
 def donate(request):
     """Donation form page"""
@@ -37,12 +53,17 @@ def donate(request):
                     messages.error(request, 'Phone number is required for M-Pesa payments.')
                     return render(request, 'donations/donate.html', {'form': form})
                 
-                response = initiate_stk_push(
-                    phone=donation.donor_phone,
-                    amount=donation.amount,
-                    account_reference=f"DON-{donation.id}",
-                    description="Donation to NGO"
-                )
+                try:
+                    response = initiate_stk_push(
+                        phone=donation.donor_phone,
+                        amount=donation.amount,
+                        account_reference=f"DON-{donation.id}",
+                        description="Donation to NGO"
+                    )
+                except CircuitOpenError as e:
+                    donation.status = 'failed'
+                    donation.save()
+                    return provider_unavailable(request, e)
                 
                 if response and response.get('ResponseCode') == '0':
                     # Update with M-Pesa transaction ID
@@ -101,7 +122,11 @@ def check_payment(request, donation_id):
         return redirect('donations:success', donation_id=donation.id)
     elif donation.status == 'failed':
         return redirect('donations:failed', donation_id=donation.id)
-    
+
+    # A PayPal donation only waits here when its capture hit an open breaker; try again
+    if donation.payment_method == 'paypal' and donation.transaction_id:
+        return capture_paypal_donation(request, donation, donation.transaction_id, retry=True)
+
     # Still pending
     return redirect('donations:payment_pending', donation_id=donation.id)
 
@@ -127,12 +152,15 @@ def paypal_payment(request, donation_id):
     donation = get_object_or_404(Donation, id=donation_id)
     
     # Create PayPal order
-    order = create_paypal_order(
-        amount=donation.amount,
-        currency='USD',  # PayPal supports USD, not KES
-        return_url=f"{settings.BASE_URL}/donations/paypal-success/{donation.id}/",
-        cancel_url=f"{settings.BASE_URL}/donations/paypal-cancel/{donation.id}/"
-    )
+    try:
+        order = create_paypal_order(
+            amount=donation.amount,
+            currency='USD',  # PayPal supports USD, not KES
+            return_url=f"{settings.BASE_URL}/donations/paypal-success/{donation.id}/",
+            cancel_url=f"{settings.BASE_URL}/donations/paypal-cancel/{donation.id}/"
+        )
+    except CircuitOpenError as e:
+        return provider_unavailable(request, e)
     
     if order:
         donation.transaction_id = order.get('id')
@@ -151,18 +179,42 @@ def paypal_payment(request, donation_id):
     messages.error(request, 'Failed to create PayPal order.')
     return redirect('donations:donate')
 
+def capture_paypal_donation(request, donation, order_id, retry=False):
+    """
+    Capture an order the donor approved. While PayPal's breaker is open the
+    donation stays pending on the payment_pending page, whose status polling
+    comes back through check_payment to retry the capture.
+    """
+    try:
+        result = capture_paypal_order(order_id)
+    except CircuitOpenError:
+        if donation.transaction_id != order_id:
+            donation.transaction_id = order_id
+            donation.save()
+        if not retry:
+            messages.warning(
+                request,
+                'PayPal is temporarily unavailable, so your approved payment has not been taken yet. '
+                'Keep this page open and we will retry it; if you leave, you will not be charged.'
+            )
+        return redirect('donations:payment_pending', donation_id=donation.id)
+    if result and result.get('status') == 'COMPLETED':
+        donation.status = 'completed'
+        donation.save()
+        return redirect('donations:success', donation_id=donation.id)
+
+    donation.status = 'failed'
+    donation.save()
+    messages.error(request, 'PayPal payment failed.')
+    return redirect('donations:failed', donation_id=donation.id)
+
 def paypal_success(request, donation_id):
     """PayPal success callback"""
     donation = get_object_or_404(Donation, id=donation_id)
     order_id = request.GET.get('token') or request.GET.get('order_id')
     
     if order_id:
-        # Capture the payment
-        result = capture_paypal_order(order_id)
-        if result and result.get('status') == 'COMPLETED':
-            donation.status = 'completed'
-            donation.save()
-            return redirect('donations:success', donation_id=donation.id)
+        return capture_paypal_donation(request, donation, order_id)
     
     donation.status = 'failed'
     donation.save()
@@ -183,14 +235,17 @@ def card_payment(request, donation_id):
     donation = get_object_or_404(Donation, id=donation_id)
     
     # Create Stripe payment intent
-    intent = create_stripe_payment_intent(
-        amount=donation.amount,
-        currency=donation.currency.lower(),
-        metadata={
-            'donation_id': donation.id,
-            'donor_email': donation.donor_email
-        }
-    )
+    try:
+        intent = create_stripe_payment_intent(
+            amount=donation.amount,
+            currency=donation.currency.lower(),
+            metadata={
+                'donation_id': donation.id,
+                'donor_email': donation.donor_email
+            }
+        )
+    except CircuitOpenError as e:
+        return provider_unavailable(request, e)
     
     if intent:
         donation.transaction_id = intent.get('id')
@@ -230,9 +285,9 @@ def stripe_webhook(request):
 @login_required
 def receipt(request, donation_id):
     """Generate donation receipt"""
-    from core.models import WebsiteSetting
+    from core import site_settings
     donation = get_object_or_404(Donation, id=donation_id, donor=request.user, status='completed')
-    website_settings = WebsiteSetting.objects.first()
+    website_settings = site_settings.get()
     return render(request, 'donations/receipt.html', {
         'donation': donation,
         'website_settings': website_settings
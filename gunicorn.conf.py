@@ -0,0 +1,72 @@
+"""Gunicorn settings, used with: gunicorn -c gunicorn.conf.py youthshield.wsgi"""
+import multiprocessing
+import os
+import shutil
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# Import Django, the URLconf and the views (DRF, the Stripe SDK) once in the
+# master; workers fork with all of it already in memory.
+preload_app = True
+
+# Recycle workers after a jittered number of requests so slow leaks can't grow
+# without bound, and not every worker restarts at once
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# A worker silent for `timeout` seconds is killed; on restart or recycling
+# in-flight requests get `graceful_timeout` seconds to finish
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Workers write their Prometheus samples here so /metrics can merge them.
+# Must be set before any worker imports prometheus_client.
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', str(BASE_DIR / '.prometheus_multiproc'))
+
+# Start every server run with empty metric files. This file is read before
+# preload_app imports the app (and prometheus_client with it), so clear them
+# here rather than in on_starting. A reload (HUP) reads the file again in
+# the same master; keep the files its live workers are writing.
+if os.environ.get('YOUTHSHIELD_METRICS_CLEARED_BY') != str(os.getpid()):
+    shutil.rmtree(os.environ['PROMETHEUS_MULTIPROC_DIR'], ignore_errors=True)
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+    os.environ['YOUTHSHIELD_METRICS_CLEARED_BY'] = str(os.getpid())
+
+
+def warm_up(log, who):
+    from django.db import connections
+
+    from core.warmup import warm_up
+    results = warm_up()
+    # Never share a database connection opened here with a forked worker
+    connections.close_all()
+    timings = ', '.join(f'{step} {seconds * 1000:.0f} ms' for step, (_result, seconds) in results.items())
+    log.info(f'{who} warmed up: {timings}')
+
+
+def when_ready(server):
+    """With preload_app, warm the master so every worker forks with compiled URLs and templates"""
+    if server.cfg.preload_app:
+        warm_up(server.log, 'Master')
+
+
+def post_worker_init(worker):
+    """After the fork, before the worker takes requests: finish warming up (near-free after the master did)"""
+    warm_up(worker.log, f'Worker {worker.pid}')
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges; its counters and histograms are kept"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+
+def worker_exit(server, worker):
+    """Write out buffered log rows before the worker goes away"""
+    from core.buffered_writer import flush_all
+    flush_all()
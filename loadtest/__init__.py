@@ -0,0 +1,19 @@
+"""
+Load-test harness for the Youth Shield site.
+
+Drives a locally running server with async virtual users and reports
+p50/p95/p99 latency, throughput, error rates and DB query counts per
+endpoint as JSON and HTML. Reports carry the git commit they were taken
+at and can be diffed with ``compare``.
+
+Typical run, fully offline::
+
+    pip install -r loadtest/requirements.txt
+    python manage.py provider_simulator --port 8001 &
+    LOADTEST_QUERY_COUNTS=1 BASE_URL=http://127.0.0.1:8000 \\
+        MPESA_BASE_URL=http://127.0.0.1:8001 PAYPAL_BASE_URL=http://127.0.0.1:8001 \\
+        STRIPE_API_BASE=http://127.0.0.1:8001 python manage.py runserver 8000 &
+    python -m loadtest run --scenario browse=6,donate=2,staff=1,callbacks=1 \\
+        --users 20 --duration 60 --staff-email admin@example.com --staff-password ...
+    python -m loadtest compare loadtest/results/<old>.json loadtest/results/<new>.json
+"""
@@ -0,0 +1,147 @@
+import argparse
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+from . import report, startup
+from .scenarios import SCENARIOS, parse_mix
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+def think_time(value):
+    low, _, high = value.partition(',')
+    return float(low), float(high or low)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m loadtest', description='Load-test a running Youth Shield server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Run a scenario mix and write JSON/HTML reports')
+    run.add_argument('--base-url', default='http://127.0.0.1:8000')
+    run.add_argument(
+        '--scenario',
+        default='browse',
+        help=f'Weighted scenario mix, e.g. "browse=6,donate=2,staff=1,callbacks=1". Scenarios: {", ".join(SCENARIOS)}',
+    )
+    run.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+    run.add_argument('--duration', type=float, default=30, help='Seconds to run after ramp-up')
+    run.add_argument('--ramp-up', type=float, default=5, help='Seconds over which users are started')
+    run.add_argument('--think-time', type=think_time, default=(0.5, 2.0), metavar='MIN,MAX',
+                     help='Pause between a user\'s requests in seconds')
+    run.add_argument('--timeout', type=float, default=30, help='Per-request timeout in seconds')
+    run.add_argument('--seed', default='loadtest', help='Seed for the virtual users\' random choices')
+    run.add_argument('--staff-email', default=os.environ.get('LOADTEST_STAFF_EMAIL'))
+    run.add_argument('--staff-password', default=os.environ.get('LOADTEST_STAFF_PASSWORD'))
+    run.add_argument(
+        '--stripe-webhook-secret',
+        default=os.environ.get('STRIPE_WEBHOOK_SECRET', 'whsec_test_your_webhook_secret_here'),
+        help='Secret used to sign webhooks in the callbacks scenario (must match the server)',
+    )
+    run.add_argument('--output', help='JSON report path (default: loadtest/results/<commit>-<mix>.json)')
+    run.add_argument('--html', help='HTML report path (default: next to the JSON report)')
+
+    diff = commands.add_parser('compare', help='Compare two JSON reports, e.g. from two commits')
+    diff.add_argument('base')
+    diff.add_argument('head')
+    diff.add_argument('--threshold', type=float, default=10,
+                      help='Percent growth in p95 latency or query count counted as a regression')
+
+    boot = commands.add_parser('startup', help='Measure cold-start import time of manage.py commands and WSGI boot')
+    boot.add_argument('--target', action='append', choices=list(startup.TARGETS),
+                      help='Target to measure (repeatable; default: all)')
+    boot.add_argument('--runs', type=int, default=5, help='Cold starts per target; the median is reported')
+    boot.add_argument('--baseline', default=str(startup.BASELINE_PATH), help='Baseline JSON to compare against')
+    boot.add_argument('--update-baseline', action='store_true',
+                      help='Write the results as the new baseline (needs a clean checkout)')
+    boot.add_argument('--output', help='Also write the results to this JSON file')
+    boot.add_argument('--threshold', type=float, default=20,
+                      help='Percent growth in import time counted as a regression')
+    return parser
+
+
+def default_output(result, mix_spec):
+    commit = (result['meta']['git']['commit'] or 'unknown')[:10]
+    stamp = result['meta']['generated_at'].replace(':', '').replace('-', '')
+    mix = mix_spec.replace('=', '').replace(',', '_')
+    return RESULTS_DIR / f"{commit}-{mix}-{stamp}.json"
+
+
+def run_command(args):
+    try:
+        mix = parse_mix(args.scenario)
+    except ValueError as e:
+        sys.exit(str(e))
+    if args.users < len(mix):
+        sys.exit(f'--users must be at least {len(mix)}, one per scenario in the mix')
+
+    from .runner import run  # imported here so `compare` works without httpx installed
+
+    print(f"Running {args.scenario} with {args.users} users for {args.duration:g}s against {args.base_url}...")
+    recorder = asyncio.run(run(mix, args))
+    result = report.build_report(recorder, args, mix)
+
+    json_path = Path(args.output) if args.output else default_output(result, args.scenario)
+    html_path = Path(args.html) if args.html else json_path.with_suffix('.html')
+    report.write_json(result, json_path)
+    report.write_html(result, html_path)
+
+    print(report.format_table(result))
+    if not result['meta']['query_counts_reported']:
+        print('\nNo DB query counts reported; start the server with LOADTEST_QUERY_COUNTS=1 to collect them.')
+    print(f"\nJSON report: {json_path}\nHTML report: {html_path}")
+    return 1 if result['totals']['error_rate'] > 0.05 else 0
+
+
+def compare_command(args):
+    lines, regressions = report.compare(report.load_json(args.base), report.load_json(args.head), args.threshold)
+    print('\n'.join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} endpoint(s) regressed by more than {args.threshold:g}%")
+        return 1
+    return 0
+
+
+def startup_command(args):
+    targets = args.target or list(startup.TARGETS)
+    if args.update_baseline and report.git_revision(startup.PROJECT_DIR)['dirty']:
+        sys.exit('Commit or stash your changes first: the baseline must be measured on a clean checkout.')
+    print(f"Measuring {', '.join(targets)} ({args.runs} cold starts each)...")
+    try:
+        result = startup.run(targets, args.runs)
+    except RuntimeError as e:
+        sys.exit(str(e))
+    print(startup.format_table(result))
+    if args.output:
+        report.write_json(result, args.output)
+
+    baseline = Path(args.baseline)
+    if args.update_baseline:
+        report.write_json(result, baseline)
+        print(f"\nBaseline written to {baseline}")
+        return 0
+    if not baseline.exists():
+        print(f"\nNo baseline at {baseline}; run with --update-baseline to record one.")
+        return 0
+    base = startup.load(baseline)
+    lines, regressions = startup.compare(base, result, args.threshold)
+    print('\n' + '\n'.join(lines))
+    changed = startup.changed_since(base)
+    if changed:
+        print(f"\n{len(changed)} Python file(s) changed since the baseline was recorded at "
+              f"{base['meta']['git']['commit'][:10]}; re-record it with --update-baseline if they run at startup.")
+    if regressions:
+        print(f"\n{len(regressions)} target(s) regressed against {baseline}")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'run':
+        return run_command(args)
+    if args.command == 'startup':
+        return startup_command(args)
+    return compare_command(args)
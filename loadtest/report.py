@@ -0,0 +1,237 @@
+import html
+import json
+import platform
+import subprocess
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPORT_VERSION = 1
+
+
+def percentile(sorted_values, pct):
+    """Linear-interpolated percentile of an already sorted list"""
+    if not sorted_values:
+        return None
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    rank = (len(sorted_values) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+
+def git_revision(cwd=None):
+    def git(*args):
+        try:
+            return subprocess.run(['git', *args], cwd=cwd, capture_output=True, text=True, timeout=10).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ''
+    return {
+        'commit': git('rev-parse', 'HEAD') or None,
+        'subject': git('log', '-1', '--format=%s') or None,
+        'dirty': bool(git('status', '--porcelain', '--untracked-files=no')),
+    }
+
+
+def summarize_samples(samples, elapsed):
+    latencies = sorted(sample.latency_ms for sample in samples)
+    errors = sum(1 for sample in samples if sample.error)
+    query_counts = [sample.queries for sample in samples if sample.queries is not None]
+    query_times = [sample.query_ms for sample in samples if sample.query_ms is not None]
+    statuses = defaultdict(int)
+    for sample in samples:
+        statuses[str(sample.status) if sample.status is not None else 'error'] += 1
+
+    def rounded(value):
+        return round(value, 2) if value is not None else None
+
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': round(errors / len(samples), 4) if samples else 0,
+        'throughput_rps': round(len(samples) / elapsed, 2) if elapsed else 0,
+        'latency_ms': {
+            'min': rounded(latencies[0] if latencies else None),
+            'mean': rounded(sum(latencies) / len(latencies) if latencies else None),
+            'p50': rounded(percentile(latencies, 50)),
+            'p95': rounded(percentile(latencies, 95)),
+            'p99': rounded(percentile(latencies, 99)),
+            'max': rounded(latencies[-1] if latencies else None),
+        },
+        'db_queries': {
+            'mean': rounded(sum(query_counts) / len(query_counts) if query_counts else None),
+            'max': max(query_counts) if query_counts else None,
+            'mean_time_ms': rounded(sum(query_times) / len(query_times) if query_times else None),
+        },
+        'bytes_mean': round(sum(sample.size for sample in samples) / len(samples)) if samples else 0,
+        'status_codes': dict(sorted(statuses.items())),
+    }
+
+
+def build_report(recorder, options, mix):
+    elapsed = (recorder.finished_at or 0) - (recorder.started_at or 0)
+    by_endpoint = defaultdict(list)
+    for sample in recorder.samples:
+        by_endpoint[sample.endpoint].append(sample)
+
+    return {
+        'version': REPORT_VERSION,
+        'meta': {
+            'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git': git_revision(Path(__file__).resolve().parent),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'base_url': options.base_url,
+            'scenario_mix': {scenario.name: weight for scenario, weight in mix},
+            'users': options.users,
+            'duration_s': options.duration,
+            'ramp_up_s': options.ramp_up,
+            'think_time_s': list(options.think_time),
+            'seed': options.seed,
+            'elapsed_s': round(elapsed, 2),
+            'query_counts_reported': any(sample.queries is not None for sample in recorder.samples),
+        },
+        'totals': summarize_samples(recorder.samples, elapsed),
+        'endpoints': {
+            endpoint: summarize_samples(samples, elapsed)
+            for endpoint, samples in sorted(by_endpoint.items())
+        },
+        'errors': sorted({
+            f"{sample.endpoint}: {sample.error}" for sample in recorder.samples if sample.error
+        })[:50],
+    }
+
+
+def write_json(report, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + '\n')
+
+
+def load_json(path):
+    report = json.loads(Path(path).read_text())
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"{path}: unsupported report version {report.get('version')}")
+    return report
+
+
+def format_table(report):
+    header = f"{'endpoint':<46} {'reqs':>6} {'err%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'queries':>8}"
+    lines = [header, '-' * len(header)]
+    rows = list(report['endpoints'].items()) + [('TOTAL', report['totals'])]
+    for endpoint, stats in rows:
+        latency = stats['latency_ms']
+        queries = stats['db_queries']['mean']
+        lines.append(
+            f"{endpoint[:46]:<46} {stats['requests']:>6} {stats['error_rate'] * 100:>5.1f}% "
+            f"{stats['throughput_rps']:>7.2f} {latency['p50'] or 0:>8.1f} {latency['p95'] or 0:>8.1f} "
+            f"{latency['p99'] or 0:>8.1f} {queries if queries is not None else '-':>8}"
+        )
+    return '\n'.join(lines)
+
+
+def write_html(report, path):
+    meta = report['meta']
+    git = meta['git']
+    rows = []
+    for endpoint, stats in list(report['endpoints'].items()) + [('TOTAL', report['totals'])]:
+        latency = stats['latency_ms']
+        queries = stats['db_queries']
+        row_class = ' class="total"' if endpoint == 'TOTAL' else (' class="bad"' if stats['error_rate'] > 0.01 else '')
+        cells = [
+            html.escape(endpoint), stats['requests'], f"{stats['error_rate'] * 100:.1f}%", stats['throughput_rps'],
+            latency['p50'], latency['p95'], latency['p99'], latency['max'],
+            queries['mean'] if queries['mean'] is not None else '-',
+            queries['mean_time_ms'] if queries['mean_time_ms'] is not None else '-',
+            html.escape(', '.join(f"{code}: {count}" for code, count in stats['status_codes'].items())),
+        ]
+        rows.append(f"<tr{row_class}>" + ''.join(f"<td>{cell}</td>" for cell in cells) + "</tr>")
+
+    errors = ''.join(f"<li>{html.escape(error)}</li>" for error in report['errors']) or '<li>None</li>'
+    mix = ', '.join(f"{name}={weight:g}" for name, weight in meta['scenario_mix'].items())
+    document = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>Load test {html.escape((git['commit'] or 'unknown')[:10])}</title>
+<style>
+    body {{ font-family: -apple-system, 'Segoe UI', sans-serif; margin: 2rem; color: #212529; }}
+    table {{ border-collapse: collapse; width: 100%; font-size: 14px; }}
+    th, td {{ padding: 6px 10px; border-bottom: 1px solid #dee2e6; text-align: right; }}
+    th:first-child, td:first-child {{ text-align: left; font-family: monospace; }}
+    th {{ background: #f8f9fa; }}
+    tr.bad td {{ background: #fdecea; }}
+    tr.total td {{ font-weight: 600; border-top: 2px solid #212529; }}
+    dl {{ display: grid; grid-template-columns: max-content auto; gap: 4px 16px; }}
+    dt {{ font-weight: 600; }}
+</style>
+</head>
+<body>
+<h1>Load test report</h1>
+<dl>
+    <dt>Commit</dt><dd>{html.escape(git['commit'] or 'unknown')}{' (dirty)' if git['dirty'] else ''} {html.escape(git['subject'] or '')}</dd>
+    <dt>Generated</dt><dd>{html.escape(meta['generated_at'])}</dd>
+    <dt>Target</dt><dd>{html.escape(meta['base_url'])}</dd>
+    <dt>Scenarios</dt><dd>{html.escape(mix)}</dd>
+    <dt>Users / duration</dt><dd>{meta['users']} users, {meta['duration_s']}s (+{meta['ramp_up_s']}s ramp-up), elapsed {meta['elapsed_s']}s</dd>
+</dl>
+<table>
+<thead><tr><th>Endpoint</th><th>Requests</th><th>Errors</th><th>req/s</th><th>p50 ms</th><th>p95 ms</th><th>p99 ms</th><th>max ms</th><th>Queries</th><th>Query ms</th><th>Status codes</th></tr></thead>
+<tbody>
+{chr(10).join(rows)}
+</tbody>
+</table>
+<h2>Errors</h2>
+<ul>{errors}</ul>
+</body>
+</html>
+"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(document)
+
+
+def compare(base, head, threshold_pct):
+    """
+    Diff two reports endpoint by endpoint.
+
+    Returns (lines, regressions) where a regression is a p95 latency or mean
+    query count that grew by more than ``threshold_pct`` percent, or an error
+    rate that grew at all.
+    """
+    lines = [
+        f"base: {base['meta']['git']['commit'] or 'unknown'}  head: {head['meta']['git']['commit'] or 'unknown'}",
+        f"{'endpoint':<46} {'p95 base':>9} {'p95 head':>9} {'delta':>8} {'queries':>13} {'err% b/h':>13}",
+    ]
+    regressions = []
+    endpoints = sorted(set(base['endpoints']) | set(head['endpoints']))
+    for endpoint in endpoints:
+        before = base['endpoints'].get(endpoint)
+        after = head['endpoints'].get(endpoint)
+        if not before or not after:
+            lines.append(f"{endpoint[:46]:<46} {'only in ' + ('head' if after else 'base'):>9}")
+            continue
+
+        p95_before = before['latency_ms']['p95'] or 0
+        p95_after = after['latency_ms']['p95'] or 0
+        delta = ((p95_after - p95_before) / p95_before * 100) if p95_before else 0
+        q_before = before['db_queries']['mean']
+        q_after = after['db_queries']['mean']
+        flags = []
+        if delta > threshold_pct:
+            flags.append('p95')
+        if q_before is not None and q_after is not None and q_after > q_before * (1 + threshold_pct / 100):
+            flags.append('queries')
+        if after['error_rate'] > before['error_rate']:
+            flags.append('errors')
+        if flags:
+            regressions.append((endpoint, flags))
+
+        queries = f"{q_before if q_before is not None else '-'}->{q_after if q_after is not None else '-'}"
+        errors = f"{before['error_rate'] * 100:.1f}/{after['error_rate'] * 100:.1f}"
+        lines.append(
+            f"{endpoint[:46]:<46} {p95_before:>9.1f} {p95_after:>9.1f} {delta:>+7.1f}% {queries:>13} {errors:>13}"
+            + (f"  REGRESSION ({', '.join(flags)})" if flags else '')
+        )
+    return lines, regressions
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import time
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from http.cookies import SimpleCookie
+
+import httpx
+
+
+class Sample:
+    __slots__ = ('scenario', 'endpoint', 'status', 'latency_ms', 'queries', 'query_ms', 'size', 'error', 'finished_at')
+
+    def __init__(self, scenario, endpoint, status, latency_ms, queries=None, query_ms=None, size=0,
+                 error=None, finished_at=None):
+        self.scenario = scenario
+        self.endpoint = endpoint
+        self.status = status
+        self.latency_ms = latency_ms
+        self.queries = queries
+        self.query_ms = query_ms
+        self.size = size
+        self.error = error
+        self.finished_at = finished_at
+
+
+class Recorder:
+    def __init__(self):
+        self.samples = []
+        self.started_at = None
+        self.finished_at = None
+
+    def add(self, sample):
+        self.samples.append(sample)
+
+
+class VirtualUser:
+    """
+    One simulated visitor with its own cookies.
+
+    Cookies are tracked by hand rather than by httpx because the site sets
+    Secure session cookies, which a spec-compliant jar would never send back
+    to a plain-HTTP local server.
+    """
+
+    def __init__(self, index, client, recorder, scenario, rng, options):
+        self.index = index
+        self.client = client
+        self.recorder = recorder
+        self.scenario = scenario
+        self.rng = rng
+        self.options = options
+        self.cookies = {}
+        self.state = {}
+
+    @property
+    def csrf_token(self):
+        return self.cookies.get('csrftoken', '')
+
+    async def request(self, method, path, endpoint=None, expect=(200,), headers=None, **kwargs):
+        """Send one request and record it under ``endpoint`` (defaults to "METHOD path")"""
+        endpoint = endpoint or f"{method} {path.split('?')[0]}"
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+        if method != 'GET' and self.csrf_token:
+            headers.setdefault('X-CSRFToken', self.csrf_token)
+            headers.setdefault('Referer', f"{self.client.base_url}{path}")
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, headers=headers, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.add(Sample(
+                self.scenario.name, endpoint, None, (time.perf_counter() - start) * 1000,
+                error=type(e).__name__, finished_at=time.time(),
+            ))
+            return None
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        self._store_cookies(response)
+        queries = response.headers.get('X-DB-Query-Count')
+        query_ms = response.headers.get('X-DB-Query-Time')
+        error = None if response.status_code in expect else f"HTTP {response.status_code}"
+        self.recorder.add(Sample(
+            self.scenario.name, endpoint, response.status_code, latency_ms,
+            queries=int(queries) if queries is not None else None,
+            query_ms=float(query_ms) if query_ms is not None else None,
+            size=len(response.content), error=error, finished_at=time.time(),
+        ))
+        return response
+
+    def _store_cookies(self, response):
+        for header in response.headers.get_list('set-cookie'):
+            cookie = SimpleCookie()
+            cookie.load(header)
+            for name, morsel in cookie.items():
+                if morsel['max-age'] == '0' or not morsel.value:
+                    self.cookies.pop(name, None)
+                else:
+                    self.cookies[name] = morsel.value
+
+    async def think(self):
+        low, high = self.options.think_time
+        if high > 0:
+            await asyncio.sleep(self.rng.uniform(low, high))
+
+
+def make_client(base_url, timeout, connections):
+    # A jar that refuses every cookie; VirtualUser keeps per-user cookies itself
+    jar = CookieJar(policy=DefaultCookiePolicy(allowed_domains=[]))
+    return httpx.AsyncClient(
+        base_url=base_url,
+        timeout=timeout,
+        follow_redirects=False,
+        cookies=httpx.Cookies(jar),
+        limits=httpx.Limits(max_connections=connections, max_keepalive_connections=connections),
+    )
+
+
+def assign_scenarios(mix, users):
+    """
+    Spread ``users`` virtual users over scenarios in proportion to their weights.
+
+    Every scenario gets one user, and the rest are apportioned by largest
+    remainder, so the counts always add up to ``users`` exactly.
+    """
+    if users < len(mix):
+        raise ValueError(f'{users} users cannot run {len(mix)} scenarios; use at least one user per scenario')
+    total = sum(weight for _, weight in mix)
+    spare = users - len(mix)
+    quotas = [spare * weight / total for _, weight in mix]
+    counts = [1 + int(quota) for quota in quotas]
+    by_remainder = sorted(range(len(mix)), key=lambda index: quotas[index] - int(quotas[index]), reverse=True)
+    for index in by_remainder[:users - sum(counts)]:
+        counts[index] += 1
+    assignments = []
+    for (scenario, _), count in zip(mix, counts):
+        assignments.extend([scenario] * count)
+    return assignments
+
+
+async def run(mix, options):
+    """Run the weighted scenario mix for ``options.duration`` seconds and return the Recorder"""
+    recorder = Recorder()
+    scenarios = assign_scenarios(mix, options.users)
+    loop = asyncio.get_running_loop()
+
+    async with make_client(options.base_url, options.timeout, options.users) as client:
+        recorder.started_at = time.time()
+        deadline = loop.time() + options.ramp_up + options.duration
+
+        async def virtual_user(index, scenario):
+            if options.ramp_up:
+                await asyncio.sleep(options.ramp_up * index / len(scenarios))
+            user = VirtualUser(index, client, recorder, scenario, random.Random(f"{options.seed}-{index}"), options)
+            await scenario.setup(user)
+            while loop.time() < deadline:
+                await scenario.iteration(user)
+                await user.think()
+
+        await asyncio.gather(*(virtual_user(i, scenario) for i, scenario in enumerate(scenarios)))
+        recorder.finished_at = time.time()
+
+    return recorder
@@ -0,0 +1,186 @@
+import hashlib
+import hmac
+import json
+import re
+import time
+import uuid
+
+DONATION_ID = re.compile(r'/(\d+)/')
+
+
+def donation_id_from(response):
+    match = DONATION_ID.search(response.headers.get('Location', '')) if response is not None else None
+    return match.group(1) if match else None
+
+
+class Scenario:
+    name = None
+    description = ''
+
+    async def setup(self, user):
+        """Run once per virtual user before its first iteration"""
+
+    async def iteration(self, user):
+        raise NotImplementedError
+
+
+class BrowseScenario(Scenario):
+    name = 'browse'
+    description = 'Anonymous visitor reading the public pages'
+
+    PAGES = [
+        ('/', 4),
+        ('/about/', 2),
+        ('/programs/', 2),
+        ('/testimonials/', 2),
+        ('/contact/', 1),
+    ]
+
+    async def iteration(self, user):
+        paths = [path for path, _ in self.PAGES]
+        weights = [weight for _, weight in self.PAGES]
+        for path in user.rng.choices(paths, weights=weights, k=3):
+            await user.request('GET', path)
+            await user.think()
+
+
+class DonateScenario(Scenario):
+    name = 'donate'
+    description = 'Visitor signs up, then donates by M-Pesa, card or PayPal'
+
+    METHODS = [('mpesa', 6), ('card', 3), ('paypal', 1)]
+
+    async def setup(self, user):
+        await user.request('GET', '/users/register/')
+        suffix = uuid.uuid4().hex[:10]
+        password = f"Lt-{uuid.uuid4().hex}"
+        await user.request('POST', '/users/register/', expect=(302,), data={
+            'csrfmiddlewaretoken': user.csrf_token,
+            'username': f"lt_{suffix}",
+            'email': f"lt_{suffix}@loadtest.invalid",
+            'first_name': 'Load',
+            'last_name': f"Tester {user.index}",
+            'phone_number': '0712345678',
+            'password1': password,
+            'password2': password,
+        })
+        user.state['email'] = f"lt_{suffix}@loadtest.invalid"
+
+    async def iteration(self, user):
+        await user.request('GET', '/donations/')
+        methods = [method for method, _ in self.METHODS]
+        method = user.rng.choices(methods, weights=[weight for _, weight in self.METHODS])[0]
+        response = await user.request('POST', '/donations/', endpoint=f"POST /donations/ ({method})", expect=(302,), data={
+            'csrfmiddlewaretoken': user.csrf_token,
+            'amount': str(user.rng.choice([100, 250, 500, 1000, 2500])),
+            'currency': 'KES' if method == 'mpesa' else 'USD',
+            'payment_method': method,
+            'donor_name': f"Load Tester {user.index}",
+            'donor_email': user.state.get('email', 'anon@loadtest.invalid'),
+            'donor_phone': '0712345678',
+        })
+        donation_id = donation_id_from(response)
+        if not donation_id:
+            return
+
+        if method == 'mpesa':
+            await user.request('GET', f'/donations/pending/{donation_id}/', endpoint='GET /donations/pending/<id>/')
+            # Poll like the pending page does until the simulator's callback lands
+            for _ in range(3):
+                await user.think()
+                check = await user.request('GET', f'/donations/check/{donation_id}/',
+                                           endpoint='GET /donations/check/<id>/', expect=(302,))
+                if check is None or '/pending/' not in check.headers.get('Location', ''):
+                    break
+        elif method == 'card':
+            await user.request('GET', f'/donations/card-payment/{donation_id}/', endpoint='GET /donations/card-payment/<id>/')
+        else:
+            order = await user.request('GET', f'/donations/paypal-payment/{donation_id}/',
+                                       endpoint='GET /donations/paypal-payment/<id>/', expect=(302,))
+            approval_url = order.headers.get('Location', '') if order is not None else ''
+            if '/donations/paypal-success/' in approval_url:
+                # The simulator approves immediately and returns the donor to the site
+                path = approval_url[approval_url.index('/donations/'):]
+                await user.request('GET', path, endpoint='GET /donations/paypal-success/<id>/', expect=(302,))
+
+
+class StaffDashboardScenario(Scenario):
+    name = 'staff'
+    description = 'Staff member with the dashboard open, polling chart-data/'
+
+    PERIODS = ['7d', '30d', '90d']
+
+    async def setup(self, user):
+        if not user.options.staff_email:
+            raise SystemExit('The staff scenario needs --staff-email and --staff-password')
+        await user.request('GET', '/users/login/')
+        await user.request('POST', '/users/login/', expect=(302,), data={
+            'csrfmiddlewaretoken': user.csrf_token,
+            'username': user.options.staff_email,
+            'password': user.options.staff_password,
+        })
+        await user.request('GET', '/staff/')
+
+    async def iteration(self, user):
+        period = user.rng.choice(self.PERIODS)
+        await user.request('GET', f'/staff/chart-data/?period={period}', endpoint='GET /staff/chart-data/',
+                           headers={'X-Requested-With': 'XMLHttpRequest'})
+        if user.rng.random() < 0.1:
+            await user.request('GET', user.rng.choice(['/staff/', '/staff/donations/', '/staff/audit-logs/']))
+
+
+class CallbackStormScenario(Scenario):
+    name = 'callbacks'
+    description = 'Bursts of M-Pesa callbacks and Stripe webhooks, mostly for unknown transactions'
+
+    async def iteration(self, user):
+        for _ in range(user.rng.randint(5, 20)):
+            if user.rng.random() < 0.6:
+                await self.mpesa_callback(user)
+            else:
+                await self.stripe_webhook(user)
+
+    async def mpesa_callback(self, user):
+        result_code = 0 if user.rng.random() < 0.8 else 1032
+        body = {'Body': {'stkCallback': {
+            'MerchantRequestID': f"{user.rng.randint(10000, 99999)}-{user.rng.randint(1000000, 9999999)}-1",
+            'CheckoutRequestID': f"ws_CO_LOADTEST{uuid.uuid4().hex[:12]}",
+            'ResultCode': result_code,
+            'ResultDesc': 'Simulated callback',
+        }}}
+        path = user.rng.choice(['/donations/mpesa-callback/', '/api/mpesa/callback/'])
+        await user.request('POST', path, json=body)
+
+    async def stripe_webhook(self, user):
+        event = {
+            'id': f"evt_{uuid.uuid4().hex[:24]}",
+            'object': 'event',
+            'type': user.rng.choice(['payment_intent.succeeded', 'payment_intent.payment_failed', 'charge.refunded']),
+            'data': {'object': {'id': f"pi_{uuid.uuid4().hex[:24]}", 'object': 'payment_intent', 'metadata': {}}},
+        }
+        body = json.dumps(event)
+        timestamp = int(time.time())
+        signature = hmac.new(
+            user.options.stripe_webhook_secret.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256
+        ).hexdigest()
+        await user.request('POST', '/donations/stripe-webhook/', content=body, headers={
+            'Content-Type': 'application/json',
+            'Stripe-Signature': f"t={timestamp},v1={signature}",
+        })
+
+
+SCENARIOS = {
+    scenario.name: scenario
+    for scenario in (BrowseScenario, DonateScenario, StaffDashboardScenario, CallbackStormScenario)
+}
+
+
+def parse_mix(spec):
+    """Parse "browse=6,donate=2" (or just "browse") into [(Scenario(), weight), ...]"""
+    mix = []
+    for part in spec.split(','):
+        name, _, weight = part.strip().partition('=')
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario "{name}"; choose from {", ".join(SCENARIOS)}')
+        mix.append((SCENARIOS[name](), float(weight or 1)))
+    return mix
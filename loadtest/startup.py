@@ -0,0 +1,165 @@
+"""
+Cold-start benchmark.
+
+Runs each target in a fresh interpreter under ``python -X importtime`` and
+records its wall time, total import time, module count, the slowest
+top-level imports and which heavy optional packages got loaded. Results are
+compared against a JSON baseline kept in the repo (startup_baseline.json),
+so an import that sneaks a provider SDK back into every process shows up as
+a regression.
+
+The baseline is only written from a clean checkout, and carries the commit
+it was measured at. Re-record it (``python -m loadtest startup
+--update-baseline``) in any change to code that runs at startup: settings,
+URLconfs, app configs and the modules they import. Comparing against a
+baseline taken before such changes prints a reminder.
+"""
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .report import git_revision
+
+BASELINE_VERSION = 1
+BASELINE_PATH = Path(__file__).resolve().parent / 'startup_baseline.json'
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# Loaded by the WSGI app the way a worker loads it before its first request
+WSGI_BOOT = (
+    'from youthshield.wsgi import application\n'
+    'from django.urls import get_resolver\n'
+    'get_resolver().url_patterns\n'
+)
+
+TARGETS = {
+    'manage_help': ['manage.py', 'help'],
+    'manage_auto_backup': ['manage.py', 'auto_backup', '--help'],
+    'manage_check': ['manage.py', 'check'],
+    'wsgi_boot': ['-c', WSGI_BOOT],
+}
+
+# Packages whose presence in a target is worth knowing about
+WATCHED_MODULES = ('stripe', 'requests', 'rest_framework', 'PIL', 'prometheus_client', 'brotli')
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def parse_importtime(stderr):
+    """[(self us, cumulative us, depth, module)] from -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            depth = (len(match.group(3)) - 1) // 2
+            entries.append((int(match.group(1)), int(match.group(2)), depth, match.group(4)))
+    return entries
+
+
+def measure(argv, env):
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *argv], cwd=PROJECT_DIR, env=env,
+        capture_output=True, text=True, timeout=120,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(argv)} exited with {result.returncode}:\n{result.stderr[-2000:]}")
+    entries = parse_importtime(result.stderr)
+    top_level = [entry for entry in entries if entry[2] == 0]
+    modules = {entry[3] for entry in entries}
+    packages = {name.split('.')[0] for name in modules}
+    return {
+        'wall_ms': wall_ms,
+        'import_ms': sum(entry[1] for entry in top_level) / 1000,
+        'modules': len(modules),
+        'slowest': [(name, cumulative / 1000) for _self, cumulative, _depth, name in
+                    sorted(top_level, key=lambda entry: entry[1], reverse=True)[:10]],
+        'loaded': sorted(name for name in WATCHED_MODULES if name in packages),
+    }
+
+
+def run(targets, runs):
+    """Median of `runs` cold starts of each target"""
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'youthshield.settings')
+    results = {}
+    for name in targets:
+        measure(TARGETS[name], env)  # Discarded: fills the OS file cache and __pycache__
+        samples = [measure(TARGETS[name], env) for _ in range(runs)]
+        results[name] = {
+            'wall_ms': round(statistics.median(sample['wall_ms'] for sample in samples), 1),
+            'import_ms': round(statistics.median(sample['import_ms'] for sample in samples), 1),
+            'modules': samples[-1]['modules'],
+            'loaded': samples[-1]['loaded'],
+            'slowest': [[name, round(ms, 1)] for name, ms in samples[-1]['slowest']],
+        }
+    return {
+        'version': BASELINE_VERSION,
+        'meta': {
+            'generated_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git': git_revision(PROJECT_DIR),
+            'python': sys.version.split()[0],
+            'runs': runs,
+        },
+        'targets': results,
+    }
+
+
+def changed_since(report):
+    """Python files outside tests changed between the commit report was measured at and HEAD"""
+    commit = report['meta']['git'].get('commit')
+    if not commit:
+        return []
+    try:
+        names = subprocess.run(
+            ['git', 'diff', '--name-only', commit, 'HEAD', '--', '*.py'],
+            cwd=PROJECT_DIR, capture_output=True, text=True, timeout=10,
+        ).stdout.split()
+    except (OSError, subprocess.SubprocessError):
+        return []
+    return [name for name in names if not name.endswith('tests.py') and not name.startswith('loadtest/')]
+
+
+def load(path):
+    report = json.loads(Path(path).read_text())
+    if report.get('version') != BASELINE_VERSION:
+        raise ValueError(f"{path}: unsupported baseline version {report.get('version')}")
+    return report
+
+
+def format_table(report):
+    header = f"{'target':<22} {'wall ms':>9} {'import ms':>10} {'modules':>8}  loaded"
+    lines = [header, '-' * len(header)]
+    for name, stats in report['targets'].items():
+        lines.append(
+            f"{name:<22} {stats['wall_ms']:>9.1f} {stats['import_ms']:>10.1f} {stats['modules']:>8}  "
+            f"{', '.join(stats['loaded']) or '-'}"
+        )
+    return '\n'.join(lines)
+
+
+def compare(base, head, threshold_pct):
+    """(report lines, regressed targets): import time growth over threshold, or a newly loaded watched module"""
+    lines, regressions = [], []
+    for name, after in head['targets'].items():
+        before = base['targets'].get(name)
+        if before is None:
+            lines.append(f"{name:<22} new target")
+            continue
+        growth = (after['import_ms'] - before['import_ms']) / before['import_ms'] * 100 if before['import_ms'] else 0
+        newly_loaded = sorted(set(after['loaded']) - set(before['loaded']))
+        flag = ''
+        if growth > threshold_pct or newly_loaded:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        extra = f"  now loads {', '.join(newly_loaded)}" if newly_loaded else ''
+        lines.append(
+            f"{name:<22} import {before['import_ms']:.1f} -> {after['import_ms']:.1f} ms ({growth:+.1f}%){extra}{flag}"
+        )
+    return lines, regressions
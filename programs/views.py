@@ -2,9 +2,11 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
+from core.page_cache import cache_public_page
 from .models import Program, Service, Objective
 from .forms import ProgramForm, ServiceForm, ObjectiveForm
 
+@cache_public_page(Program)
 def program_detail(request, program_id):
     """Display detailed information about a specific program"""
     program = get_object_or_404(Program, id=program_id, is_active=True)
@@ -12,6 +12,11 @@ PROJECT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 # Change to project directory
 cd $PROJECT_DIR
 
+# Report backup outcomes through the web server's /metrics endpoint
+if [ -d "$PROJECT_DIR/.prometheus_multiproc" ]; then
+    export PROMETHEUS_MULTIPROC_DIR="$PROJECT_DIR/.prometheus_multiproc"
+fi
+
 # Run the backup command
 python manage.py auto_backup
 
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class StaffDashboardConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'staff_dashboard'
+
+    def ready(self):
+        from django.contrib.auth.signals import user_logged_in, user_logged_out, user_login_failed
+        from . import audit
+
+        audit.connect_signals()
+        user_logged_in.connect(audit.record_login, dispatch_uid='audit.record_login')
+        user_logged_out.connect(audit.record_logout, dispatch_uid='audit.record_logout')
+        user_login_failed.connect(audit.record_login_failed, dispatch_uid='audit.record_login_failed')
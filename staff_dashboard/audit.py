@@ -0,0 +1,284 @@
+"""
+Audit trail capture.
+
+AuditMiddleware opens an audit scope around state-changing requests to
+staff-only views (the staff dashboard, the admin and STAFF_VIEWS) and
+backup downloads, and @audited_command opens one around a management
+command. While a scope is open, model signals note which instances were
+created, changed or deleted along with snapshots of their field values;
+turning those snapshots into a diff is left to the AuditLog writer's
+background thread. Logins and logouts come from the auth
+signals. Every entry goes through a BufferedWriter, so no request waits on
+an AuditLog insert.
+"""
+import copy
+import json
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from core.buffered_writer import BufferedWriter
+from .models import AuditLog
+
+DEFAULTS = {
+    'BUFFERED': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE': 10000,
+}
+
+# Models whose changes are bookkeeping rather than something a person did
+IGNORED_MODELS = {
+    'admin.LogEntry', 'api.APILog', 'api.APILogHourly', 'auth.Permission', 'contenttypes.ContentType',
+    'sessions.Session', 'staff_dashboard.AuditLog', 'staff_dashboard.AuditLogHourly', 'staff_dashboard.BackupLog',
+}
+SETTINGS_MODELS = {'core.WebsiteSetting', 'staff_dashboard.BackupJob'}
+MASKED_FIELDS = {'password'}
+
+# Staff views recorded as one entry of their own rather than as model changes
+VIEW_ACTIONS = {
+    'create_backup': 'backup',
+    'delete_backup': 'backup',
+    'download_backup': 'export',
+}
+AUDITED_GET_VIEWS = {'download_backup'}
+
+# Namespaces whose views are all staff-only, and staff-only views elsewhere
+STAFF_NAMESPACES = {'staff_dashboard', 'admin'}
+STAFF_VIEWS = {
+    'programs:add_program', 'programs:edit_program', 'programs:toggle_program',
+    'programs:add_service', 'programs:add_objective',
+}
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+_scope = ContextVar('audit_scope', default=None)
+
+
+def get_setting(name):
+    return getattr(settings, 'AUDIT_LOG', {}).get(name, DEFAULTS[name])
+
+
+def snapshot(instance):
+    """Field values of an instance, cheap enough to take on the request thread"""
+    values = {}
+    deferred = instance.get_deferred_fields()
+    for field in instance._meta.concrete_fields:
+        if field.attname in deferred:
+            continue  # Loading it would cost a query; payload fields are deferred by default
+        value = getattr(instance, field.attname)
+        if isinstance(field, models.FileField):
+            value = value.name if value else ''
+        elif isinstance(value, (dict, list)):
+            value = copy.deepcopy(value)  # An in-place edit must not change the "before" copy
+        values[field.attname] = value
+    return values
+
+
+def json_safe(values):
+    values = {key: '***' if key in MASKED_FIELDS else value for key, value in values.items()}
+    return json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+
+
+def prepare_entry(entry):
+    """Turn an entry's before/after snapshots into details['changes']; runs at flush time"""
+    before, after = getattr(entry, '_audit_snapshots', None) or (None, None)
+    if before is None and after is None:
+        return
+    before, after = json_safe(before or {}), json_safe(after or {})
+    changes = {
+        field: [before.get(field), after.get(field)]
+        for field in sorted(set(before) | set(after))
+        if before.get(field) != after.get(field) or entry.action == 'delete'
+    }
+    entry.details = {**(entry.details or {}), 'changes': changes}
+
+
+writer = BufferedWriter(
+    AuditLog,
+    batch_size=get_setting('BATCH_SIZE'),
+    flush_interval=get_setting('FLUSH_INTERVAL'),
+    max_queue=get_setting('MAX_QUEUE'),
+    prepare=prepare_entry,
+)
+
+
+def write(entry):
+    if get_setting('BUFFERED'):
+        writer.add(entry)
+    else:
+        prepare_entry(entry)
+        entry.save()
+
+
+def record(request, action, message='', model_name='', object_id='', details=None, user=None, snapshots=None):
+    """Queue one AuditLog entry for a request"""
+    if user is None and request is not None and getattr(request, 'user', None) is not None:
+        user = request.user if request.user.is_authenticated else None
+    meta = request.META if request is not None else {}
+    entry = AuditLog(
+        user=user,
+        action=action,
+        ip_address=meta.get('REMOTE_ADDR') or None,
+        url=(request.path or '')[:500] if request is not None else '',
+        method=(request.method or '') if request is not None else '',
+        details=details,
+        model_name=model_name,
+        object_id=str(object_id),
+        message=message,
+        user_agent=meta.get('HTTP_USER_AGENT', ''),
+        timestamp=timezone.now(),
+    )
+    entry._audit_snapshots = snapshots
+    write(entry)
+
+
+class AuditScope:
+    """Model changes made while handling one audited request or management command"""
+
+    def __init__(self, request, view_name, action=None):
+        self.request = request
+        self.view_name = view_name
+        self.action = action or VIEW_ACTIONS.get(view_name)
+        self.changes = {}
+
+    def commit(self):
+        if self.request is None:
+            if not self.changes:
+                return  # A command run that changed nothing, e.g. auto_backup with no job due
+            summary, object_id = f'Ran {self.view_name}', ''
+        else:
+            summary = f'{self.request.method} {self.view_name}'
+            object_id = next(iter(self.request.resolver_match.kwargs.values()), '')
+        if self.action or not self.changes:
+            record(self.request, self.action or 'other', summary,
+                   object_id=object_id, details={'view': self.view_name})
+            if self.action:
+                return
+
+        for (label, pk), (action, before, after) in self.changes.items():
+            model_name = label.split('.')[1]
+            verb = {'create': 'Created', 'update': 'Updated', 'delete': 'Deleted'}[action]
+            if label in SETTINGS_MODELS:
+                action = 'settings'
+            record(self.request, action, f'{verb} {model_name} #{pk} via {self.view_name}',
+                   model_name=model_name, object_id=pk, details={'view': self.view_name},
+                   snapshots=(before, after))
+
+
+def audited_label(sender):
+    label = sender._meta.label
+    return None if label in IGNORED_MODELS else label
+
+
+def remember_loaded(sender, instance, **kwargs):
+    """post_init: keep the loaded values of instances that may be changed in this scope"""
+    if _scope.get() is None or instance.pk is None or audited_label(sender) is None:
+        return
+    instance._audit_before = snapshot(instance)
+
+
+def note_saved(sender, instance, created, raw=False, **kwargs):
+    scope = _scope.get()
+    label = scope and not raw and audited_label(sender)
+    if not label:
+        return
+    key = (label, instance.pk)
+    after = snapshot(instance)
+    if key in scope.changes:
+        scope.changes[key][2] = after
+    elif created:
+        scope.changes[key] = ['create', None, after]
+    else:
+        scope.changes[key] = ['update', getattr(instance, '_audit_before', None), after]
+
+
+def note_deleted(sender, instance, **kwargs):
+    scope = _scope.get()
+    label = scope and audited_label(sender)
+    if not label:
+        return
+    before = getattr(instance, '_audit_before', None) or snapshot(instance)
+    scope.changes[(label, instance.pk)] = ['delete', before, None]
+
+
+def connect_signals():
+    """
+    Connect the model signal receivers to each audited model, not to every
+    model: post_init runs for every row loaded, and models without receivers
+    skip the signal entirely.
+    """
+    from django.apps import apps
+    from django.db.models.signals import post_delete, post_init, post_save
+
+    for model in apps.get_models():
+        label = audited_label(model)
+        if label is None:
+            continue
+        post_init.connect(remember_loaded, sender=model, dispatch_uid=f'audit.remember_loaded.{label}')
+        post_save.connect(note_saved, sender=model, dispatch_uid=f'audit.note_saved.{label}')
+        post_delete.connect(note_deleted, sender=model, dispatch_uid=f'audit.note_deleted.{label}')
+
+
+def record_login(sender, request, user, **kwargs):
+    record(request, 'login', f'{user.email} logged in', user=user)
+
+
+def record_logout(sender, request, user, **kwargs):
+    record(request, 'logout', f'{user.email} logged out' if user else 'Logged out', user=user)
+
+
+def record_login_failed(sender, credentials, request=None, **kwargs):
+    identifier = credentials.get('email') or credentials.get('username') or ''
+    record(request, 'login', f'Failed login for {identifier}'.strip(), details={'success': False})
+
+
+class AuditMiddleware:
+    """Open an audit scope around state-changing staff dashboard requests"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        scope, token = getattr(request, '_audit_scope', (None, None))
+        if scope is not None:
+            _scope.reset(token)
+            if response.status_code < 400:
+                scope.commit()
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        if match.namespace not in STAFF_NAMESPACES and match.view_name not in STAFF_VIEWS:
+            return None
+        if request.method in SAFE_METHODS and match.url_name not in AUDITED_GET_VIEWS:
+            return None
+        if not request.user.is_authenticated:
+            return None
+        scope = AuditScope(request, match.url_name if match.namespace == 'staff_dashboard' else match.view_name)
+        request._audit_scope = (scope, _scope.set(scope))
+        return None
+
+
+def audited_command(name, action=None):
+    """
+    Decorator for a management command's handle(): record the model changes it
+    makes, as one `action` entry if given, else one entry per changed row
+    """
+    def decorator(handle):
+        @wraps(handle)
+        def wrapper(*args, **kwargs):
+            scope = AuditScope(None, name, action)
+            token = _scope.set(scope)
+            try:
+                result = handle(*args, **kwargs)
+            finally:
+                _scope.reset(token)
+            scope.commit()
+            return result
+        return wrapper
+    return decorator
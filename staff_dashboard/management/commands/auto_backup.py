@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.conf import settings
+from core import metrics
+from staff_dashboard.audit import audited_command
 from staff_dashboard.models import BackupJob, BackupLog
 import os
 import sqlite3
@@ -24,6 +26,7 @@ class Command(BaseCommand):
             help='Run backup for specific job name only',
         )
 
+    @audited_command('auto_backup', action='backup')
     def handle(self, *args, **options):
         self.stdout.write('Checking for scheduled backups...')
 
@@ -74,6 +77,7 @@ class Command(BaseCommand):
                         file_size=file_size,
                         success=success
                     )
+                    metrics.record_backup(job.name, success, file_size)
 
                 else:
                     self.stdout.write(f'Skipping job {job.name} - not scheduled to run yet')
@@ -88,6 +92,7 @@ class Command(BaseCommand):
                     message=f'Unexpected error: {str(e)}',
                     success=False
                 )
+                metrics.record_backup(job.name, False)
 
         # Clean up old backups
         self.cleanup_old_backups()
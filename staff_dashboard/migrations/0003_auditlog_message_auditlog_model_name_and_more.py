@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff_dashboard', '0002_auditlog'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='auditlog',
+            name='message',
+            field=models.TextField(blank=True, help_text='Description of the action performed'),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='model_name',
+            field=models.CharField(blank=True, help_text='Name of the model affected by the action', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='auditlog',
+            name='object_id',
+            field=models.CharField(blank=True, help_text='ID of the object affected by the action', max_length=100),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-19 07:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('staff_dashboard', '0003_auditlog_message_auditlog_model_name_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditLogHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField()),
+                ('action', models.CharField(choices=[('login', 'User Login'), ('logout', 'User Logout'), ('view', 'Page View'), ('create', 'Create Record'), ('update', 'Update Record'), ('delete', 'Delete Record'), ('export', 'Export Data'), ('import', 'Import Data'), ('backup', 'Backup Operation'), ('settings', 'Settings Change'), ('other', 'Other Action')], max_length=20)),
+                ('count', models.PositiveIntegerField()),
+            ],
+            options={
+                'ordering': ['-hour'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='auditlog',
+            index=models.Index(fields=['timestamp'], name='staff_dashb_timesta_667826_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='auditloghourly',
+            constraint=models.UniqueConstraint(fields=('hour', 'action'), name='unique_auditlog_hour'),
+        ),
+    ]
@@ -4,6 +4,8 @@ from django.utils import timezone
 from datetime import datetime, timedelta
 from django.db.models import JSONField
 
+from core.archive import ArchivedPayloadMixin, PayloadManager
+
 class BackupJob(models.Model):
     FREQUENCY_CHOICES = [
         ('disabled', 'Disabled'),
@@ -166,7 +168,9 @@ class BackupLog(models.Model):
     class Meta:
         ordering = ['-created_at']
 
-class AuditLog(models.Model):
+class AuditLog(ArchivedPayloadMixin, models.Model):
+    PAYLOAD_FIELDS = ('details',)
+
     ACTION_CHOICES = [
         ('login', 'User Login'),
         ('logout', 'User Logout'),
@@ -190,9 +194,12 @@ class AuditLog(models.Model):
     model_name = models.CharField(max_length=100, blank=True, help_text='Name of the model affected by the action')
     object_id = models.CharField(max_length=100, blank=True, help_text='ID of the object affected by the action')
     message = models.TextField(blank=True, help_text='Description of the action performed')
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the action happens, not when the buffered row is inserted
+    timestamp = models.DateTimeField(default=timezone.now)
     user_agent = models.TextField(blank=True, help_text='User agent string from browser')
 
+    objects = PayloadManager()
+
     def __str__(self):
         user_name = self.user.username if self.user else 'Anonymous'
         return f"{user_name} - {self.action} - {self.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"
@@ -200,7 +207,23 @@ class AuditLog(models.Model):
     class Meta:
         ordering = ['-timestamp']
         indexes = [
+            models.Index(fields=['timestamp']),
             models.Index(fields=['user', 'timestamp']),
             models.Index(fields=['action', 'timestamp']),
             models.Index(fields=['ip_address']),
         ]
+
+class AuditLogHourly(models.Model):
+    """AuditLog rows rolled up per hour by compact_logs"""
+    hour = models.DateTimeField()
+    action = models.CharField(max_length=20, choices=AuditLog.ACTION_CHOICES)
+    count = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.action} x{self.count}"
+
+    class Meta:
+        ordering = ['-hour']
+        constraints = [
+            models.UniqueConstraint(fields=['hour', 'action'], name='unique_auditlog_hour'),
+        ]
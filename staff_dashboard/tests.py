@@ -1,3 +1,93 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db.models.signals import post_init, post_save
+from django.test import Client, TestCase
+
+from api.models import APILog
+from donations.models import Donation, MpesaTransaction
+from programs.models import Program
+from users.models import CustomUser
+
+from . import audit
+from .models import AuditLog
+
+
+class AuditTrailTests(TestCase):
+    """What the audit scope records, and the before/after diffs it produces"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = CustomUser.objects.create_user(
+            username='audit_staff', email='staff@example.com', password='x', user_type='staff', is_staff=True,
+        )
+        cls.program = Program.objects.create(
+            title='Camp', description='Description', category=Program.PROGRAM_CATEGORIES[0][0],
+            objectives='One', target_audience='Youth', duration='1 week',
+        )
+
+    def setUp(self):
+        self.entries = []
+        patcher = mock.patch.object(audit.writer, 'add', side_effect=self.entries.append)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def changes(self, model_name):
+        entries = [entry for entry in self.entries if entry.model_name == model_name]
+        for entry in entries:
+            audit.prepare_entry(entry)
+        return [entry.details['changes'] for entry in entries]
+
+    def test_staff_view_outside_the_dashboard_is_audited(self):
+        client = Client(HTTP_HOST='localhost')
+        client.force_login(self.staff)
+        self.entries.clear()  # The login entry
+        response = client.post(f'/programs/toggle/{self.program.pk}/', {'justification': 'Ended'})
+        self.assertEqual(response.status_code, 302)
+        [changes] = self.changes('Program')
+        self.assertEqual(changes['is_active'], [True, False])
+        self.assertEqual(self.entries[0].url, f'/programs/toggle/{self.program.pk}/')
+
+    def test_public_post_is_not_audited(self):
+        Client(HTTP_HOST='localhost').post('/contact/', {'name': 'A'})
+        self.assertEqual(self.entries, [])
+
+    def test_in_place_json_edit_shows_in_the_diff(self):
+        donation = Donation.objects.create(
+            donor=self.staff, amount=100, currency='KES', payment_method='mpesa', status='pending',
+            donor_name='S', donor_email='staff@example.com', donor_phone='0700000000',
+        )
+        transaction = MpesaTransaction.objects.create(
+            donation=donation, checkout_request_id='ws_1', merchant_request_id='m_1', phone_number='0700000000',
+            raw_response={'ResultCode': None},
+        )
+
+        @audit.audited_command('test_command')
+        def handle():
+            loaded = MpesaTransaction._base_manager.get(pk=transaction.pk)
+            loaded.raw_response['ResultCode'] = 0
+            loaded.save()
+
+        handle()
+        [changes] = self.changes('MpesaTransaction')
+        self.assertEqual(changes['raw_response'], [{'ResultCode': None}, {'ResultCode': 0}])
+
+    def test_management_command_changes_are_audited(self):
+        Donation.objects.create(
+            donor=self.staff, amount=100, currency='KES', payment_method='mpesa', status='completed',
+            donor_name='S', donor_email='staff@example.com', donor_phone='0700000000',
+        )
+        Donation.objects.update(receipt_number=None)
+        call_command('populate_receipt_numbers', stdout=mock.Mock())
+        [changes] = self.changes('Donation')
+        self.assertEqual(changes['receipt_number'], [None, 1])
+        self.assertIn('via populate_receipt_numbers', self.entries[0].message)
+
+    def test_command_that_changes_nothing_records_nothing(self):
+        call_command('populate_receipt_numbers', stdout=mock.Mock())
+        self.assertEqual(self.entries, [])
+
+    def test_receivers_only_on_audited_models(self):
+        self.assertTrue(post_init.has_listeners(Program))
+        self.assertFalse(post_init.has_listeners(APILog))
+        self.assertFalse(post_save.has_listeners(AuditLog))
@@ -40,4 +40,5 @@ urlpatterns = [
     path('backups/save-auto-backup-settings/', views.save_auto_backup_settings, name='save_auto_backup_settings'),
     path('website-settings/', views.manage_website_settings, name='manage_website_settings'),
     path('audit-logs/', views.manage_audit_logs, name='manage_audit_logs'),
+    path('request-profiles/', views.request_profiles, name='request_profiles'),
 ]
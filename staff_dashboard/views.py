@@ -2,7 +2,8 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.contrib import messages
 from django.http import JsonResponse
-from django.db.models import Count, Sum, Q
+from django.db.models import Case, Count, DecimalField, F, Q, Sum, When
+from django.db.models.functions import TruncDate
 from django.core.paginator import Paginator
 from django.contrib.auth.models import User
 from users.models import CustomUser
@@ -10,9 +11,13 @@ from donations.models import Donation
 from programs.models import Program
 from testimonials.models import Testimonial
 from core.models import ContactMessage, WebsiteSetting
-from staff_dashboard.models import BackupJob, BackupLog, AuditLog
+from staff_dashboard.models import BackupJob, BackupLog, AuditLog, AuditLogHourly
+from core import metrics
+import json
 import os
 import shutil
+from collections import Counter
+from decimal import Decimal
 from datetime import datetime, timedelta
 from django.conf import settings
 from django.core.mail import send_mail
@@ -21,6 +26,15 @@ from django.utils import timezone
 def is_staff(user):
     return user.is_staff or user.is_superuser
 
+def total_in_kes(donations, conversion_rates):
+    """Sum donation amounts converted to KES in one query (currencies without a rate count 1:1)"""
+    converted = Case(
+        *[When(currency=currency, then=F('amount') * rate) for currency, rate in conversion_rates.items()],
+        default=F('amount'),
+        output_field=DecimalField(max_digits=20, decimal_places=2),
+    )
+    return donations.aggregate(total=Sum(converted))['total'] or Decimal('0')
+
 @login_required
 @user_passes_test(is_staff)
 def dashboard_chart_data(request):
@@ -138,10 +152,7 @@ def dashboard(request):
 
     # Total amount only for completed donations, converted to KES
     completed_donations_queryset = Donation.objects.filter(status='completed')
-    total_donation_amount = Decimal('0')
-    for donation in completed_donations_queryset:
-        rate = conversion_rates.get(donation.currency, Decimal('1.0'))  # Default to 1 if currency not found
-        total_donation_amount += donation.amount * rate
+    total_donation_amount = total_in_kes(completed_donations_queryset, conversion_rates)
 
     # Separate counts for each status
     total_donations = Donation.objects.count()
@@ -443,10 +454,7 @@ def manage_donations(request):
 
     # Total amount only for completed donations, converted to KES
     completed_donations_queryset = Donation.objects.filter(status='completed')
-    total_amount_kes = Decimal('0')
-    for donation in completed_donations_queryset:
-        rate = conversion_rates.get(donation.currency, Decimal('1.0'))  # Default to 1 if currency not found
-        total_amount_kes += donation.amount * rate
+    total_amount_kes = total_in_kes(completed_donations_queryset, conversion_rates)
 
     # Separate counts for each status
     completed_donations = completed_donations_queryset.count()
@@ -1104,10 +1112,12 @@ def create_backup(request):
             import logging
             logger = logging.getLogger(__name__)
             logger.info(f'Backup created: {backup_name}, Size: {os.path.getsize(backup_path)} bytes')
+            metrics.record_backup('manual', True, os.path.getsize(backup_path))
 
             messages.success(request, f'Backup created successfully: {backup_name}')
             return JsonResponse({'success': True, 'backup_name': backup_name})
         except Exception as e:
+            metrics.record_backup('manual', False)
             messages.error(request, f'Failed to create backup: {str(e)}')
             return JsonResponse({'success': False, 'error': str(e)})
     return JsonResponse({'success': False})
@@ -1308,16 +1318,27 @@ def manage_audit_logs(request):
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
-    # Stats
-    total_logs = AuditLog.objects.count()
+    # Stats; rows older than the hot window only exist as hourly rollups (compact_logs)
+    rollups = AuditLogHourly.objects.order_by()
+    total_logs = AuditLog.objects.count() + (rollups.aggregate(total=Sum('count'))['total'] or 0)
     today_logs = AuditLog.objects.filter(timestamp__date=timezone.now().date()).count()
 
     # Action distribution for chart
-    action_stats = AuditLog.objects.values('action').annotate(count=Count('id')).order_by('-count')[:10]
+    action_counts = Counter()
+    for row in AuditLog.objects.order_by().values('action').annotate(count=Count('id')):
+        action_counts[row['action']] += row['count']
+    for row in rollups.values('action').annotate(count=Sum('count')):
+        action_counts[row['action']] += row['count']
+    action_stats = [{'action': action, 'count': count} for action, count in action_counts.most_common(10)]
 
     # Recent activity (last 7 days)
     seven_days_ago = timezone.now() - timedelta(days=7)
-    recent_activity = AuditLog.objects.filter(timestamp__gte=seven_days_ago).values('timestamp__date').annotate(count=Count('id')).order_by('timestamp__date')
+    daily_counts = Counter()
+    for row in AuditLog.objects.filter(timestamp__gte=seven_days_ago).order_by().values('timestamp__date').annotate(count=Count('id')):
+        daily_counts[row['timestamp__date']] += row['count']
+    for row in rollups.filter(hour__gte=seven_days_ago).values(day=TruncDate('hour')).annotate(count=Sum('count')):
+        daily_counts[row['day']] += row['count']
+    recent_activity = [{'timestamp__date': day.isoformat(), 'count': daily_counts[day]} for day in sorted(daily_counts)]
 
     context = {
         'page_obj': page_obj,
@@ -1328,8 +1349,47 @@ def manage_audit_logs(request):
         'date_to': date_to,
         'total_logs': total_logs,
         'today_logs': today_logs,
-        'action_stats': action_stats,
-        'recent_activity': recent_activity,
+        'action_stats': json.dumps(action_stats),
+        'recent_activity': json.dumps(recent_activity),
     }
     return render(request, 'staff_dashboard/manage_audit_logs.html', context)
 
+
+@login_required
+@user_passes_test(is_staff)
+def request_profiles(request):
+    from core import profiling
+    from core.middleware import ProfilingMiddleware
+
+    cookie_name = profiling.get_setting('COOKIE_NAME')
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+        response = redirect('staff_dashboard:request_profiles')
+        if action == 'enable':
+            response.set_signed_cookie(
+                cookie_name, str(request.user.pk), salt=ProfilingMiddleware.cookie_salt,
+                max_age=profiling.get_setting('COOKIE_MAX_AGE'), httponly=True,
+                secure=settings.SESSION_COOKIE_SECURE, samesite='Lax',
+            )
+            messages.success(request, 'Profiling enabled for your requests.')
+        elif action == 'disable':
+            response.delete_cookie(cookie_name, samesite='Lax')
+            messages.success(request, 'Profiling disabled for your requests.')
+        elif action == 'clear':
+            profiling.slow_requests.clear()
+            messages.success(request, 'Slow request list cleared.')
+        return response
+
+    profiling_enabled = request.get_signed_cookie(
+        cookie_name, default=None, salt=ProfilingMiddleware.cookie_salt
+    ) == str(request.user.pk)
+
+    context = {
+        'profiles': profiling.slow_requests.slowest(),
+        'profiling_enabled': profiling_enabled,
+        'sample_rate': profiling.get_setting('SAMPLE_RATE') * 100,
+        'slowest_kept': profiling.slow_requests.size,
+        'slow_threshold_ms': profiling.get_setting('SLOW_THRESHOLD_MS'),
+    }
+    return render(request, 'staff_dashboard/request_profiles.html', context)
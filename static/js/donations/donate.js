@@ -0,0 +1,63 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('donation-form');
+    const amountInput = document.getElementById('id_amount');
+    const paymentMethodInputs = document.querySelectorAll('input[name="payment_method"]');
+    const phoneField = document.getElementById('phone-field');
+    const submitBtn = document.getElementById('submit-btn');
+
+
+    // Payment method change handler
+    paymentMethodInputs.forEach(input => {
+        input.addEventListener('change', function() {
+            if (this.value === 'mpesa') {
+                phoneField.style.display = 'block';
+                document.getElementById('id_donor_phone').required = true;
+                document.getElementById('id_currency').disabled = true;
+                document.getElementById('id_currency').value = 'KES';
+            } else {
+                phoneField.style.display = 'none';
+                document.getElementById('id_donor_phone').required = false;
+                document.getElementById('id_currency').disabled = false;
+                // Set default currency for PayPal and card
+                if (this.value === 'paypal') {
+                    document.getElementById('id_currency').value = 'USD';
+                } else if (this.value === 'card') {
+                    document.getElementById('id_currency').value = 'USD';
+                }
+            }
+        });
+    });
+
+    // Form submission
+    form.addEventListener('submit', function(e) {
+        // Check if a payment method is selected
+        const selectedPaymentMethod = document.querySelector('input[name="payment_method"]:checked');
+        if (!selectedPaymentMethod) {
+            e.preventDefault();
+            alert('Please select a payment method.');
+            return;
+        }
+
+        // Change button text to indicate processing
+        submitBtn.innerHTML = '<span class="spinner"></span> Processing...';
+        // Disable button after a short delay to allow form submission
+        setTimeout(() => {
+            submitBtn.disabled = true;
+        }, 100);
+    });
+
+    // Initial state
+    const initialPaymentMethod = document.querySelector('input[name="payment_method"]:checked');
+    if (initialPaymentMethod) {
+        if (initialPaymentMethod.value === 'mpesa') {
+            phoneField.style.display = 'block';
+            document.getElementById('id_donor_phone').required = true;
+            document.getElementById('id_currency').disabled = true;
+            document.getElementById('id_currency').value = 'KES';
+        } else {
+            phoneField.style.display = 'none';
+            document.getElementById('id_donor_phone').required = false;
+            document.getElementById('id_currency').disabled = false;
+        }
+    }
+});
@@ -0,0 +1,102 @@
+// Mobile menu toggle
+function toggleMobileMenu() {
+    const navLinks = document.querySelector('.nav-links');
+    navLinks.classList.toggle('active');
+}
+
+// Close mobile menu when clicking outside
+document.addEventListener('click', function(event) {
+    const navLinks = document.querySelector('.nav-links');
+    const mobileMenuBtn = document.querySelector('.mobile-menu-btn');
+
+    if (!navLinks.contains(event.target) && !mobileMenuBtn.contains(event.target)) {
+        navLinks.classList.remove('active');
+    }
+});
+
+// Form submission loading state
+document.addEventListener('DOMContentLoaded', function() {
+    const forms = document.querySelectorAll('form');
+
+    forms.forEach(form => {
+        form.addEventListener('submit', function() {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            if (submitBtn) {
+                submitBtn.innerHTML = '<span class="spinner"></span> Processing...';
+                submitBtn.disabled = true;
+            }
+        });
+    });
+});
+
+// Tab-independent session management
+function initializeTabToken() {
+    let tabToken = sessionStorage.getItem('tab_token');
+    if (!tabToken) {
+        tabToken = generateUUID();
+        sessionStorage.setItem('tab_token', tabToken);
+    }
+    // Set cookie for server-side validation
+    document.cookie = `tab_token=${tabToken}; path=/; SameSite=Lax`;
+    return tabToken;
+}
+
+function generateUUID() {
+    return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
+        const r = Math.random() * 16 | 0;
+        const v = c == 'x' ? r : (r & 0x3 | 0x8);
+        return v.toString(16);
+    });
+}
+
+// Initialize tab token on page load
+const tabToken = initializeTabToken();
+
+// Add tab token to all fetch requests
+const originalFetch = window.fetch;
+window.fetch = function(...args) {
+    const [resource, config] = args;
+    const newConfig = config || {};
+    newConfig.headers = newConfig.headers || {};
+    newConfig.headers['X-Tab-Token'] = tabToken;
+    return originalFetch(resource, newConfig);
+};
+
+// Add tab token to all forms
+document.addEventListener('DOMContentLoaded', function() {
+    const forms = document.querySelectorAll('form');
+    forms.forEach(form => {
+        if (!form.querySelector('input[name="tab_token"]')) {
+            const hiddenInput = document.createElement('input');
+            hiddenInput.type = 'hidden';
+            hiddenInput.name = 'tab_token';
+            hiddenInput.value = tabToken;
+            form.appendChild(hiddenInput);
+        }
+    });
+});
+
+// Tab change security check
+document.addEventListener('visibilitychange', function() {
+    if (!document.hidden) {
+        // Tab became visible, check session
+        fetch('/users/session-check/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]')?.value || ''
+            },
+            credentials: 'same-origin'
+        })
+        .then(response => response.json())
+        .then(data => {
+            if (!data.authenticated) {
+                // User not authenticated, redirect to login
+                window.location.href = data.login_url;
+            }
+        })
+        .catch(error => {
+            console.error('Session check failed:', error);
+        });
+    }
+});
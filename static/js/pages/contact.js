@@ -0,0 +1,44 @@
+// Live Chat Functionality
+function toggleChat() {
+    document.getElementById('chatBox').classList.toggle('active');
+}
+
+function handleChatInput(event) {
+    if (event.key === 'Enter') {
+        sendChatMessage();
+    }
+}
+
+function sendChatMessage() {
+    const input = document.getElementById('chatInput');
+    const message = input.value.trim();
+
+    if (!message) return;
+
+    // Add user message
+    addMessageToChat(message, 'user');
+    input.value = '';
+
+    // Simulate bot response
+    setTimeout(() => {
+        const responses = [
+            "Thanks for your message! Our support team will get back to you shortly.",
+            "I can help you with program information, admission process, or technical support. What would you like to know?",
+            "For immediate assistance, please call us at +1 (234) 567-8900 during business hours.",
+            "Would you like me to connect you with an admissions counselor?",
+            "You can find detailed information about our programs on the Programs page."
+        ];
+
+        const randomResponse = responses[Math.floor(Math.random() * responses.length)];
+        addMessageToChat(randomResponse, 'bot');
+    }, 1000);
+}
+
+function addMessageToChat(message, sender) {
+    const chatBody = document.getElementById('chatBody');
+    const messageDiv = document.createElement('div');
+    messageDiv.className = `chat-message ${sender}`;
+    messageDiv.innerHTML = `<div class="message-bubble">${message}</div>`;
+    chatBody.appendChild(messageDiv);
+    chatBody.scrollTop = chatBody.scrollHeight;
+}
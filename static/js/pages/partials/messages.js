@@ -0,0 +1,26 @@
+// Show messages with animation
+document.addEventListener('DOMContentLoaded', function() {
+    const messages = document.querySelectorAll('.message');
+    messages.forEach((message, index) => {
+        setTimeout(() => {
+            message.classList.add('show');
+        }, 100 * index);
+
+        // Auto hide after 5 seconds
+        setTimeout(() => {
+            if (message.classList.contains('show')) {
+                closeMessage(message.id);
+            }
+        }, 5000);
+    });
+});
+
+function closeMessage(messageId) {
+    const message = document.getElementById(messageId);
+    if (message) {
+        message.classList.remove('show');
+        setTimeout(() => {
+            message.remove();
+        }, 300);
+    }
+}
@@ -0,0 +1,76 @@
+// Filter functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const filterButtons = document.querySelectorAll('.filter-btn');
+    const programCards = document.querySelectorAll('.program-card');
+
+    filterButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            // Remove active class from all buttons
+            filterButtons.forEach(btn => btn.classList.remove('active'));
+            // Add active class to clicked button
+            this.classList.add('active');
+
+            const filterValue = this.getAttribute('data-filter');
+
+            programCards.forEach(card => {
+                if (filterValue === 'all' || card.getAttribute('data-category') === filterValue) {
+                    card.style.display = 'block';
+                } else {
+                    card.style.display = 'none';
+                }
+            });
+        });
+    });
+
+    // Modal functionality
+    const modal = document.getElementById('programModal');
+    const closeBtn = document.querySelector('.close');
+    const learnMoreButtons = document.querySelectorAll('.learn-more-btn');
+
+    learnMoreButtons.forEach(button => {
+        button.addEventListener('click', function() {
+            const programId = this.getAttribute('data-program-id');
+            fetchProgramDetails(programId);
+            modal.style.display = 'block';
+        });
+    });
+
+    closeBtn.addEventListener('click', function() {
+        modal.style.display = 'none';
+    });
+
+    window.addEventListener('click', function(event) {
+        if (event.target === modal) {
+            modal.style.display = 'none';
+        }
+    });
+
+    function fetchProgramDetails(programId) {
+        const modalContent = document.getElementById('modalContent');
+        modalContent.innerHTML = `
+            <div class="loading">
+                <span class="spinner"></span>
+                <p>Loading program details...</p>
+            </div>
+        `;
+
+        fetch(`/programs/${programId}/modal/`)
+            .then(response => response.text())
+            .then(html => {
+                // Extract the program details from the modal-specific HTML
+                const parser = new DOMParser();
+                const doc = parser.parseFromString(html, 'text/html');
+                const programContent = doc.querySelector('.program-detail');
+
+                if (programContent) {
+                    modalContent.innerHTML = programContent.outerHTML;
+                } else {
+                    modalContent.innerHTML = '<p>Program details not found.</p>';
+                }
+            })
+            .catch(error => {
+                console.error('Error fetching program details:', error);
+                modalContent.innerHTML = '<p>Error loading program details. Please try again.</p>';
+            });
+    }
+});
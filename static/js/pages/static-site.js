@@ -0,0 +1,24 @@
+// Pages pre-rendered by core.static_site have no CSRF token; the first form
+// submitted fetches one (which also sets the CSRF cookie) before posting.
+const csrfUrl = document.currentScript.dataset.csrfUrl;
+
+document.addEventListener('submit', function(event) {
+    const form = event.target;
+    const input = form.querySelector('[name=csrfmiddlewaretoken]');
+    if (!input || input.value) {
+        return;
+    }
+    event.preventDefault();
+    fetch(csrfUrl, { credentials: 'same-origin' })
+        .then(response => response.json())
+        .then(data => {
+            document.querySelectorAll('[name=csrfmiddlewaretoken]').forEach(field => {
+                field.value = data.token;
+            });
+            document.querySelector('meta[name=csrf-token]')?.setAttribute('content', data.token);
+            form.submit();
+        })
+        .catch(error => {
+            console.error('Could not fetch a CSRF token:', error);
+        });
+});
@@ -0,0 +1,25 @@
+// Star rating system
+document.addEventListener('DOMContentLoaded', function() {
+    const stars = document.querySelectorAll('.rating-star');
+    const ratingInput = document.getElementById('rating-value');
+
+    stars.forEach(star => {
+        star.addEventListener('click', function() {
+            const rating = this.getAttribute('data-rating');
+            ratingInput.value = rating;
+
+            stars.forEach(s => {
+                const sRating = s.getAttribute('data-rating');
+                const icon = s.querySelector('i');
+
+                if (sRating <= rating) {
+                    icon.className = 'fas fa-star';
+                    s.classList.add('active');
+                } else {
+                    icon.className = 'far fa-star';
+                    s.classList.remove('active');
+                }
+            });
+        });
+    });
+});
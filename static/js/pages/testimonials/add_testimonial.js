@@ -0,0 +1,25 @@
+// Interactive rating stars
+document.querySelectorAll('.rating-input input[type="radio"]').forEach(radio => {
+    radio.addEventListener('change', function() {
+        // Update visual state of all stars
+        const rating = parseInt(this.value);
+        document.querySelectorAll('.rating-input label').forEach((label, index) => {
+            const stars = label.querySelectorAll('i');
+            stars.forEach((star, starIndex) => {
+                if (starIndex < rating && index < rating) {
+                    star.className = 'fas fa-star text-warning';
+                } else {
+                    star.className = 'far fa-star text-warning';
+                }
+            });
+        });
+    });
+});
+
+// Initialize rating display if form has value
+document.addEventListener('DOMContentLoaded', function() {
+    const checkedRadio = document.querySelector('.rating-input input[type="radio"]:checked');
+    if (checkedRadio) {
+        checkedRadio.dispatchEvent(new Event('change'));
+    }
+});
@@ -0,0 +1,221 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Navigation functionality
+    const navLinks = document.querySelectorAll('.nav-link-item');
+    const contentSections = document.querySelectorAll('.content-section');
+
+    navLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            // Remove active class from all nav items
+            navLinks.forEach(item => item.classList.remove('active'));
+
+            // Add active class to clicked item
+            this.classList.add('active');
+
+            // Get target section
+            const targetId = this.getAttribute('data-target');
+
+            // Hide all sections
+            contentSections.forEach(section => {
+                section.classList.remove('active');
+            });
+
+            // Show target section
+            const targetSection = document.getElementById(targetId);
+            if (targetSection) {
+                targetSection.classList.add('active');
+            }
+        });
+    });
+
+    // Profile edit functionality
+    const editProfileBtn = document.getElementById('editProfileBtn');
+    const cancelEditBtn = document.getElementById('cancelEditBtn');
+    const profileView = document.getElementById('profileView');
+    const profileForm = document.getElementById('profileForm');
+
+    if (editProfileBtn) {
+        editProfileBtn.addEventListener('click', function() {
+            profileView.style.display = 'none';
+            profileForm.style.display = 'block';
+            this.style.display = 'none';
+        });
+    }
+
+    if (cancelEditBtn) {
+        cancelEditBtn.addEventListener('click', function() {
+            profileView.style.display = 'block';
+            profileForm.style.display = 'none';
+            if (editProfileBtn) editProfileBtn.style.display = 'block';
+        });
+    }
+
+    // Donation buttons
+    const makeDonationBtn = document.getElementById('makeDonationBtn');
+    const emptyDonationBtn = document.getElementById('emptyDonationBtn');
+
+    function openDonationModal() {
+        // Use existing donation button from base.html
+        const donationBtn = document.querySelector('.donation-btn');
+        if (donationBtn) donationBtn.click();
+    }
+
+    if (makeDonationBtn) makeDonationBtn.addEventListener('click', openDonationModal);
+    if (emptyDonationBtn) emptyDonationBtn.addEventListener('click', openDonationModal);
+
+    // Testimonial modal
+    const addTestimonialBtn = document.getElementById('addTestimonialBtn');
+    const editTestimonialBtn = document.getElementById('editTestimonialBtn');
+    const emptyTestimonialBtn = document.getElementById('emptyTestimonialBtn');
+    const testimonialModal = document.getElementById('testimonialModal');
+    const closeTestimonialModal = document.getElementById('closeTestimonialModal');
+    const cancelTestimonial = document.getElementById('cancelTestimonial');
+    const deleteTestimonialBtn = document.getElementById('deleteTestimonialBtn');
+    const ratingStars = document.querySelectorAll('.rating-star-input');
+    const selectedRatingInput = document.getElementById('selectedRating');
+
+    function openTestimonialModal() {
+        testimonialModal.classList.add('active');
+        document.body.style.overflow = 'hidden';
+
+        // Initialize rating stars based on existing value
+        const currentRating = parseInt(selectedRatingInput.value) || 5;
+        selectedRatingInput.value = currentRating;
+
+        ratingStars.forEach((star, index) => {
+            const icon = star.querySelector('i');
+            if (index < currentRating) {
+                icon.className = 'fas fa-star';
+                star.classList.add('active');
+            } else {
+                icon.className = 'far fa-star';
+                star.classList.remove('active');
+            }
+        });
+    }
+
+    function closeTestimonialModalFunc() {
+        testimonialModal.classList.remove('active');
+        document.body.style.overflow = 'auto';
+    }
+
+    if (addTestimonialBtn) addTestimonialBtn.addEventListener('click', openTestimonialModal);
+    if (editTestimonialBtn) editTestimonialBtn.addEventListener('click', openTestimonialModal);
+    if (emptyTestimonialBtn) emptyTestimonialBtn.addEventListener('click', openTestimonialModal);
+
+    if (closeTestimonialModal) closeTestimonialModal.addEventListener('click', closeTestimonialModalFunc);
+    if (cancelTestimonial) cancelTestimonial.addEventListener('click', closeTestimonialModalFunc);
+
+    // Close testimonial modal when clicking outside
+    testimonialModal.addEventListener('click', function(e) {
+        if (e.target === testimonialModal) {
+            closeTestimonialModalFunc();
+        }
+    });
+
+    // Rating stars
+    ratingStars.forEach(star => {
+        star.addEventListener('click', function() {
+            const rating = this.getAttribute('data-rating');
+            selectedRatingInput.value = rating;
+
+            // Update star display
+            ratingStars.forEach((s, index) => {
+                const icon = s.querySelector('i');
+                if (index < rating) {
+                    icon.className = 'fas fa-star';
+                    s.classList.add('active');
+                } else {
+                    icon.className = 'far fa-star';
+                    s.classList.remove('active');
+                }
+            });
+        });
+    });
+
+    // Delete testimonial confirmation
+    if (deleteTestimonialBtn) {
+        deleteTestimonialBtn.addEventListener('click', function() {
+            if (confirm('Are you sure you want to delete your testimonial? This action cannot be undone.')) {
+                // Submit delete request
+                const deleteUrl = this.getAttribute('data-url');
+                if (deleteUrl) {
+                    window.location.href = deleteUrl;
+                }
+            }
+        });
+    }
+
+    // Change Password modal
+    const changePasswordBtn = document.getElementById('changePasswordBtn');
+    const changePasswordModal = document.getElementById('changePasswordModal');
+    const closeChangePasswordModal = document.getElementById('closeChangePasswordModal');
+    const cancelChangePassword = document.getElementById('cancelChangePassword');
+
+    function openChangePasswordModal() {
+        changePasswordModal.classList.add('active');
+        document.body.style.overflow = 'hidden';
+    }
+
+    function closeChangePasswordModalFunc() {
+        changePasswordModal.classList.remove('active');
+        document.body.style.overflow = 'auto';
+    }
+
+    if (changePasswordBtn) changePasswordBtn.addEventListener('click', openChangePasswordModal);
+    if (closeChangePasswordModal) closeChangePasswordModal.addEventListener('click', closeChangePasswordModalFunc);
+    if (cancelChangePassword) cancelChangePassword.addEventListener('click', closeChangePasswordModalFunc);
+
+    // Close change password modal when clicking outside
+    changePasswordModal.addEventListener('click', function(e) {
+        if (e.target === changePasswordModal) {
+            closeChangePasswordModalFunc();
+        }
+    });
+
+    // Avatar preview
+    const avatarUpload = document.getElementById('avatarUpload');
+    const avatarPreview = document.getElementById('avatarPreview');
+
+    if (avatarUpload && avatarPreview) {
+        avatarUpload.addEventListener('change', function() {
+            const file = this.files[0];
+            if (file) {
+                const reader = new FileReader();
+                reader.onload = function(e) {
+                    avatarPreview.src = e.target.result;
+                }
+                reader.readAsDataURL(file);
+            }
+        });
+    }
+
+    // Form submission loading states
+    const forms = document.querySelectorAll('form');
+    forms.forEach(form => {
+        form.addEventListener('submit', function() {
+            const submitBtn = this.querySelector('button[type="submit"]');
+            if (submitBtn) {
+                submitBtn.innerHTML = '<span class="spinner"></span> Processing...';
+                submitBtn.disabled = true;
+            }
+        });
+    });
+
+    // Responsive table actions
+    function setupTableResponsive() {
+        if (window.innerWidth < 576) {
+            const actionButtons = document.querySelectorAll('.action-buttons');
+            actionButtons.forEach(container => {
+                container.style.flexDirection = 'column';
+                container.querySelectorAll('.btn-icon').forEach(btn => {
+                    btn.style.width = '100%';
+                    btn.style.borderRadius = '8px';
+                    btn.style.marginBottom = '5px';
+                });
+            });
+        }
+    }
+
+    setupTableResponsive();
+    window.addEventListener('resize', setupTableResponsive);
+});
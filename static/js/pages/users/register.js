@@ -0,0 +1,83 @@
+function togglePassword(fieldId) {
+    const input = document.getElementById(fieldId);
+    const icon = document.getElementById(fieldId + '-icon');
+
+    if (input.type === 'password') {
+        input.type = 'text';
+        icon.classList.remove('fa-eye');
+        icon.classList.add('fa-eye-slash');
+    } else {
+        input.type = 'password';
+        icon.classList.remove('fa-eye-slash');
+        icon.classList.add('fa-eye');
+    }
+}
+
+function checkPasswordStrength(password) {
+    const strengthIndicator = document.getElementById('password-strength');
+    const checks = ['length', 'uppercase', 'lowercase', 'number'];
+
+    checks.forEach(check => {
+        const element = document.getElementById(check + '-check');
+        element.classList.remove('valid', 'invalid');
+        element.classList.add('invalid');
+        element.querySelector('i').className = 'fas fa-circle';
+    });
+
+    let score = 0;
+
+    if (password.length >= 8) {
+        score++;
+        updateCheck('length', true);
+    }
+
+    if (/[A-Z]/.test(password)) {
+        score++;
+        updateCheck('uppercase', true);
+    }
+
+    if (/[a-z]/.test(password)) {
+        score++;
+        updateCheck('lowercase', true);
+    }
+
+    if (/\d/.test(password)) {
+        score++;
+        updateCheck('number', true);
+    }
+
+    strengthIndicator.className = 'password-strength';
+    if (score > 0) {
+        if (score <= 2) {
+            strengthIndicator.classList.add('strength-weak');
+        } else if (score === 3) {
+            strengthIndicator.classList.add('strength-medium');
+        } else {
+            strengthIndicator.classList.add('strength-strong');
+        }
+    }
+}
+
+function updateCheck(checkType, isValid) {
+    const element = document.getElementById(checkType + '-check');
+    element.classList.remove('valid', 'invalid');
+    element.classList.add(isValid ? 'valid' : 'invalid');
+    element.querySelector('i').className = isValid ? 'fas fa-check-circle' : 'fas fa-circle';
+}
+
+document.getElementById('registerForm').addEventListener('submit', function(e) {
+    const registerBtn = document.getElementById('registerBtn');
+    registerBtn.classList.add('loading');
+    registerBtn.disabled = true;
+    registerBtn.innerHTML = '<i class="fas fa-spinner"></i>Creating Account...';
+});
+
+// Auto-hide alerts
+document.addEventListener('DOMContentLoaded', function() {
+    setTimeout(() => {
+        document.querySelectorAll('.alert').forEach(alert => {
+            alert.style.opacity = '0';
+            setTimeout(() => alert.remove(), 300);
+        });
+    }, 5000);
+});
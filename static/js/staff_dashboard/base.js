@@ -0,0 +1,103 @@
+// Mobile menu toggle
+document.addEventListener('DOMContentLoaded', function() {
+    const sidebar = document.getElementById('sidebar');
+    const overlay = document.getElementById('overlay');
+    const mobileMenuToggle = document.getElementById('mobileMenuToggle');
+
+    function toggleSidebar() {
+        sidebar.classList.toggle('show');
+        overlay.classList.toggle('show');
+    }
+
+    mobileMenuToggle.addEventListener('click', toggleSidebar);
+    overlay.addEventListener('click', toggleSidebar);
+
+    // Close sidebar when clicking on a nav link (mobile)
+    const navLinks = sidebar.querySelectorAll('.nav-link');
+    navLinks.forEach(link => {
+        link.addEventListener('click', function() {
+            if (window.innerWidth <= 768) {
+                toggleSidebar();
+            }
+        });
+    });
+
+    // Initialize toasts
+    const toastElements = document.querySelectorAll('.toast');
+    toastElements.forEach(toastEl => {
+        const toast = new bootstrap.Toast(toastEl);
+        toast.show();
+    });
+
+    // Tab-independent session management
+    function initializeTabToken() {
+        let tabToken = sessionStorage.getItem('tab_token');
+        if (!tabToken) {
+            tabToken = generateUUID();
+            sessionStorage.setItem('tab_token', tabToken);
+        }
+        // Set cookie for server-side validation
+        document.cookie = `tab_token=${tabToken}; path=/; SameSite=Lax`;
+        return tabToken;
+    }
+
+    function generateUUID() {
+        return 'xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx'.replace(/[xy]/g, function(c) {
+            const r = Math.random() * 16 | 0;
+            const v = c == 'x' ? r : (r & 0x3 | 0x8);
+            return v.toString(16);
+        });
+    }
+
+    // Initialize tab token on page load
+    const tabToken = initializeTabToken();
+
+    // Add tab token to all fetch requests
+    const originalFetch = window.fetch;
+    window.fetch = function(...args) {
+        const [resource, config] = args;
+        const newConfig = config || {};
+        newConfig.headers = newConfig.headers || {};
+        newConfig.headers['X-Tab-Token'] = tabToken;
+        return originalFetch(resource, newConfig);
+    };
+
+    // Add tab token to all forms
+    document.addEventListener('DOMContentLoaded', function() {
+        const forms = document.querySelectorAll('form');
+        forms.forEach(form => {
+            if (!form.querySelector('input[name="tab_token"]')) {
+                const hiddenInput = document.createElement('input');
+                hiddenInput.type = 'hidden';
+                hiddenInput.name = 'tab_token';
+                hiddenInput.value = tabToken;
+                form.appendChild(hiddenInput);
+            }
+        });
+    });
+
+    // Tab change security check
+    document.addEventListener('visibilitychange', function() {
+        if (!document.hidden) {
+            // Tab became visible, check session
+            fetch('/users/session-check/', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]')?.value || ''
+                },
+                credentials: 'same-origin'
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (!data.authenticated) {
+                    // User not authenticated, redirect to login
+                    window.location.href = data.login_url;
+                }
+            })
+            .catch(error => {
+                console.error('Session check failed:', error);
+            });
+        }
+    });
+});
@@ -0,0 +1,188 @@
+let currentBackupName = null;
+
+// Toast Notification Functions
+function showToast(message, type = 'success', title = null) {
+    const toastContainer = document.getElementById('toastContainer');
+
+    // Create toast element
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+
+    // Set default titles based on type
+    if (!title) {
+        switch(type) {
+            case 'success':
+                title = 'Success';
+                break;
+            case 'error':
+                title = 'Error';
+                break;
+            case 'warning':
+                title = 'Warning';
+                break;
+            default:
+                title = 'Notification';
+        }
+    }
+
+    toast.innerHTML = `
+        <div class="toast-icon">
+            ${type === 'success' ? '<i class="fas fa-check-circle"></i>' :
+              type === 'error' ? '<i class="fas fa-exclamation-circle"></i>' :
+              type === 'warning' ? '<i class="fas fa-exclamation-triangle"></i>' :
+              '<i class="fas fa-info-circle"></i>'}
+        </div>
+        <div class="toast-content">
+            <div class="toast-title">${title}</div>
+            <div class="toast-message">${message}</div>
+        </div>
+        <button class="toast-close" onclick="closeToast(this)">
+            <i class="fas fa-times"></i>
+        </button>
+    `;
+
+    toastContainer.appendChild(toast);
+
+    // Trigger animation
+    setTimeout(() => {
+        toast.classList.add('show');
+    }, 100);
+
+    // Auto remove after 5 seconds
+    setTimeout(() => {
+        closeToast(toast.querySelector('.toast-close'));
+    }, 5000);
+}
+
+function closeToast(closeBtn) {
+    const toast = closeBtn.closest('.toast');
+    toast.classList.remove('show');
+    setTimeout(() => {
+        toast.remove();
+    }, 300);
+}
+
+// Create Backup
+function createBackup() {
+    const btn = document.getElementById('createBackupBtn');
+    const originalText = btn.innerHTML;
+    btn.disabled = true;
+    btn.innerHTML = '<i class="fas fa-spinner fa-spin"></i> Creating...';
+
+    fetch('/staff/backups/create/', {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(`Backup created successfully: ${data.backup_name}`, 'success');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showToast(data.error || 'Failed to create backup', 'error');
+            btn.disabled = false;
+            btn.innerHTML = originalText;
+        }
+    })
+    .catch(error => {
+        showToast('Network error occurred', 'error');
+        btn.disabled = false;
+        btn.innerHTML = originalText;
+    });
+}
+
+// Download Backup
+function downloadBackup(backupName) {
+    window.location.href = `/staff/backups/download/${backupName}/`;
+}
+
+// Delete Modal Functions
+function showDeleteModal(backupName) {
+    currentBackupName = backupName;
+    document.getElementById('deleteBackupName').textContent = backupName;
+    document.getElementById('deleteModal').style.display = 'flex';
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').style.display = 'none';
+    currentBackupName = null;
+}
+
+// Delete Backup
+function deleteBackup() {
+    if (!currentBackupName) return;
+
+    fetch(`/staff/backups/${currentBackupName}/delete/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast('Backup deleted successfully', 'success');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showToast(data.error || 'Failed to delete backup', 'error');
+        }
+        closeDeleteModal();
+    })
+    .catch(error => {
+        showToast('Network error occurred', 'error');
+        closeDeleteModal();
+    });
+}
+
+// Save Auto Backup Settings
+document.getElementById('autoBackupForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+
+    fetch('/staff/backups/save-auto-backup-settings/', {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast('Auto backup settings saved successfully', 'success');
+        } else {
+            showToast(data.error || 'Failed to save settings', 'error');
+        }
+    })
+    .catch(error => {
+        showToast('Network error occurred', 'error');
+    });
+});
+
+// Close modals when clicking outside
+document.querySelectorAll('.modal-overlay').forEach(overlay => {
+    overlay.addEventListener('click', function(e) {
+        if (e.target === this) {
+            this.style.display = 'none';
+        }
+    });
+});
+
+// Utility function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
@@ -0,0 +1,187 @@
+let currentMessageId = null;
+
+// Message Modal Functions
+function openMessageModal(messageId) {
+    currentMessageId = messageId;
+
+    // Fetch message data
+    fetch(`/staff/contact-messages/${messageId}/get/`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('modalName').textContent = data.name;
+            document.getElementById('modalEmail').textContent = data.email;
+            document.getElementById('modalSubject').textContent = data.subject;
+            document.getElementById('modalDate').textContent = new Date(data.created_at).toLocaleString();
+            document.getElementById('modalMessage').textContent = data.message;
+            document.getElementById('modalResolved').checked = data.resolved;
+
+            document.getElementById('messageModal').style.display = 'flex';
+        });
+}
+
+function closeMessageModal() {
+    document.getElementById('messageModal').style.display = 'none';
+}
+
+// Delete Modal Functions
+function showDeleteModal(messageId) {
+    currentMessageId = messageId;
+    closeMessageModal();
+    document.getElementById('deleteModal').style.display = 'flex';
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').style.display = 'none';
+}
+
+// Toggle resolved status (local only)
+function toggleResolved() {
+    // No server request, just toggle the checkbox locally
+}
+
+// Update status
+function updateStatus() {
+    const resolved = document.getElementById('modalResolved').checked;
+
+    fetch(`/staff/contact-messages/${currentMessageId}/edit/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ resolved: resolved })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            closeMessageModal();
+            // Reload page to reflect changes and show toast message
+            location.reload();
+        } else {
+            // Error message will be shown via Django messages
+            location.reload();
+        }
+    })
+    .catch(error => {
+        // Error message will be shown via Django messages
+        location.reload();
+    });
+}
+
+// Delete message
+function deleteMessage() {
+    fetch(`/staff/delete-message/${currentMessageId}/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        }
+    });
+}
+
+// Reply to message
+function replyToMessage(messageId) {
+    currentMessageId = messageId;
+    fetch(`/staff/contact-messages/${messageId}/get/`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('replyName').textContent = data.name;
+            document.getElementById('replyEmail').textContent = data.email;
+            document.getElementById('replyPhone').textContent = data.phone;
+            document.getElementById('replySubject').textContent = data.subject;
+            document.getElementById('replyOriginalMessage').textContent = data.message;
+            document.getElementById('replySubjectInput').value = 'Re: ' + data.subject;
+            document.getElementById('replyContent').value = '';
+
+            document.getElementById('replyModal').style.display = 'flex';
+        });
+}
+
+function closeReplyModal() {
+    document.getElementById('replyModal').style.display = 'none';
+}
+
+function sendReply() {
+    const replySubject = document.getElementById('replySubjectInput').value.trim();
+    const replyContent = document.getElementById('replyContent').value.trim();
+    if (!replySubject || !replyContent) {
+        alert('Please enter both subject and reply message.');
+        return;
+    }
+
+    fetch(`/staff/contact-messages/${currentMessageId}/reply/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken'),
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ reply_subject: replySubject, reply_message: replyContent })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            alert('Reply sent successfully!');
+            closeReplyModal();
+            // Optionally mark as resolved
+            toggleResolved();
+        } else {
+            alert('Failed to send reply: ' + (data.error || 'Unknown error'));
+        }
+    })
+    .catch(error => {
+        alert('Error sending reply: ' + error.message);
+    });
+}
+
+// Search functionality
+document.getElementById('searchInput').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        const query = this.value;
+        const url = new URL(window.location);
+
+        if (query) {
+            url.searchParams.set('search', query);
+        } else {
+            url.searchParams.delete('search');
+        }
+        url.searchParams.set('page', '1');
+        window.location.href = url.toString();
+    }
+});
+
+// Pagination
+function goToPage(page) {
+    const url = new URL(window.location);
+    url.searchParams.set('page', page);
+    window.location.href = url.toString();
+}
+
+// Close modals when clicking outside
+document.querySelectorAll('.modal-overlay').forEach(overlay => {
+    overlay.addEventListener('click', function(e) {
+        if (e.target === this) {
+            this.style.display = 'none';
+        }
+    });
+});
+
+// Utility function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
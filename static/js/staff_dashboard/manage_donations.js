@@ -0,0 +1,189 @@
+let currentDonationId = null;
+
+// Toast Notification Functions
+function showToast(message, type = 'success', title = null) {
+    const toastContainer = document.getElementById('toastContainer');
+
+    // Create toast element
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+
+    // Set default titles based on type
+    if (!title) {
+        switch(type) {
+            case 'success':
+                title = 'Success';
+                break;
+            case 'error':
+                title = 'Error';
+                break;
+            case 'warning':
+                title = 'Warning';
+                break;
+            default:
+                title = 'Notification';
+        }
+    }
+
+    toast.innerHTML = `
+        <div class="toast-icon">
+            ${type === 'success' ? '<i class="fas fa-check-circle"></i>' :
+              type === 'error' ? '<i class="fas fa-exclamation-circle"></i>' :
+              type === 'warning' ? '<i class="fas fa-exclamation-triangle"></i>' :
+              '<i class="fas fa-info-circle"></i>'}
+        </div>
+        <div class="toast-content">
+            <div class="toast-title">${title}</div>
+            <div class="toast-message">${message}</div>
+        </div>
+        <button class="toast-close" onclick="closeToast(this)">
+            <i class="fas fa-times"></i>
+        </button>
+    `;
+
+    toastContainer.appendChild(toast);
+
+    // Trigger animation
+    setTimeout(() => {
+        toast.classList.add('show');
+    }, 100);
+
+    // Auto remove after 5 seconds
+    setTimeout(() => {
+        closeToast(toast.querySelector('.toast-close'));
+    }, 5000);
+}
+
+function closeToast(closeBtn) {
+    const toast = closeBtn.closest('.toast');
+    toast.classList.remove('show');
+    setTimeout(() => {
+        toast.remove();
+    }, 300);
+}
+
+// Filter Functions
+function applyFilters() {
+    const search = document.getElementById('searchInput').value;
+    const status = document.getElementById('statusFilter').value;
+    const method = document.getElementById('methodFilter').value;
+
+    const url = new URL(window.location);
+
+    if (search) {
+        url.searchParams.set('search', search);
+    } else {
+        url.searchParams.delete('search');
+    }
+
+    if (status) {
+        url.searchParams.set('status', status);
+    } else {
+        url.searchParams.delete('status');
+    }
+
+    if (method) {
+        url.searchParams.set('method', method);
+    } else {
+        url.searchParams.delete('method');
+    }
+
+    url.searchParams.set('page', '1');
+    window.location.href = url.toString();
+}
+
+// Search functionality
+document.getElementById('searchInput').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        applyFilters();
+    }
+});
+
+// Pagination
+function goToPage(page) {
+    const url = new URL(window.location);
+    url.searchParams.set('page', page);
+    window.location.href = url.toString();
+}
+
+// Edit Modal Functions
+function showEditModal(donationId) {
+    currentDonationId = donationId;
+
+    fetch(`/staff/donations/${donationId}/get/`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('editAmount').value = data.amount;
+            document.getElementById('editCurrency').value = data.currency;
+            document.getElementById('editStatus').value = data.status;
+            document.getElementById('editMethod').value = data.payment_method;
+
+            document.getElementById('editModal').style.display = 'flex';
+        })
+        .catch(error => {
+            showToast('Failed to load donation details', 'error');
+        });
+}
+
+function closeEditModal() {
+    document.getElementById('editModal').style.display = 'none';
+}
+
+// View Receipt
+function viewReceipt(donationId) {
+    window.open(`/donations/receipt/${donationId}/`, '_blank');
+}
+
+// Form Submission
+document.getElementById('editDonationForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+
+    fetch(`/staff/donations/${currentDonationId}/edit/`, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast('Donation updated successfully', 'success');
+            setTimeout(() => {
+                location.reload();
+            }, 1500);
+        } else {
+            showToast(data.message || 'Failed to update donation', 'error');
+        }
+    })
+    .catch(error => {
+        showToast('An error occurred while updating the donation', 'error');
+    });
+});
+
+// Close modals when clicking outside
+document.querySelectorAll('.modal-overlay').forEach(overlay => {
+    overlay.addEventListener('click', function(e) {
+        if (e.target === this) {
+            this.style.display = 'none';
+        }
+    });
+});
+
+// Utility function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
@@ -0,0 +1,138 @@
+let currentProgramId = null;
+let isEditing = false;
+
+// Modal Functions
+function showCreateModal() {
+    isEditing = false;
+    currentProgramId = null;
+    document.getElementById('modalTitle').textContent = 'Create Program';
+    document.getElementById('modalSubmitBtn').textContent = 'Create Program';
+    document.getElementById('programForm').reset();
+    document.getElementById('programModal').style.display = 'flex';
+}
+
+function showEditModal(programId) {
+    isEditing = true;
+    currentProgramId = programId;
+    document.getElementById('modalTitle').textContent = 'Edit Program';
+    document.getElementById('modalSubmitBtn').textContent = 'Update Program';
+
+    fetch(`/staff/programs/${programId}/get/`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('programTitle').value = data.title;
+            document.getElementById('programCategory').value = data.category;
+            document.getElementById('programDescription').value = data.description;
+            document.getElementById('programObjectives').value = data.objectives;
+            document.getElementById('programTargetAudience').value = data.target_audience;
+            document.getElementById('programDuration').value = data.duration;
+            document.getElementById('programActive').checked = data.is_active;
+
+            document.getElementById('programModal').style.display = 'flex';
+        });
+}
+
+function closeProgramModal() {
+    document.getElementById('programModal').style.display = 'none';
+}
+
+function viewProgram(programId) {
+    // In a real app, this would navigate to program details page
+    window.location.href = `/programs/${programId}/`;
+}
+
+// Delete Modal Functions
+function showDeleteModal(programId) {
+    currentProgramId = programId;
+    document.getElementById('deleteModal').style.display = 'flex';
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').style.display = 'none';
+}
+
+// Search functionality
+document.getElementById('searchInput').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        const query = this.value;
+        const url = new URL(window.location);
+
+        if (query) {
+            url.searchParams.set('search', query);
+        } else {
+            url.searchParams.delete('search');
+        }
+        url.searchParams.set('page', '1');
+        window.location.href = url.toString();
+    }
+});
+
+// Pagination
+function goToPage(page) {
+    const url = new URL(window.location);
+    url.searchParams.set('page', page);
+    window.location.href = url.toString();
+}
+
+// Form Submission
+document.getElementById('programForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const url = isEditing ? `/staff/programs/${currentProgramId}/edit/` : '/staff/programs/create/';
+
+    fetch(url, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        }
+    });
+});
+
+// Delete Program
+function deleteProgram() {
+    fetch(`/staff/programs/${currentProgramId}/delete/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            location.reload();
+        }
+    });
+}
+
+// Close modals when clicking outside
+document.querySelectorAll('.modal-overlay').forEach(overlay => {
+    overlay.addEventListener('click', function(e) {
+        if (e.target === this) {
+            this.style.display = 'none';
+        }
+    });
+});
+
+// Utility function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
@@ -0,0 +1,220 @@
+let currentUserId = null;
+let isEditing = false;
+
+// Toast Notification Functions
+function showToast(message, type = 'success', title = null) {
+    const toastContainer = document.getElementById('toastContainer');
+
+    // Create toast element
+    const toast = document.createElement('div');
+    toast.className = `toast ${type}`;
+
+    // Set default titles based on type
+    if (!title) {
+        switch(type) {
+            case 'success':
+                title = 'Success';
+                break;
+            case 'error':
+                title = 'Error';
+                break;
+            case 'warning':
+                title = 'Warning';
+                break;
+            default:
+                title = 'Notification';
+        }
+    }
+
+    toast.innerHTML = `
+        <div class="toast-icon">
+            ${type === 'success' ? '<i class="fas fa-check-circle"></i>' :
+              type === 'error' ? '<i class="fas fa-exclamation-circle"></i>' :
+              type === 'warning' ? '<i class="fas fa-exclamation-triangle"></i>' :
+              '<i class="fas fa-info-circle"></i>'}
+        </div>
+        <div class="toast-content">
+            <div class="toast-title">${title}</div>
+            <div class="toast-message">${message}</div>
+        </div>
+        <button class="toast-close" onclick="closeToast(this)">
+            <i class="fas fa-times"></i>
+        </button>
+    `;
+
+    toastContainer.appendChild(toast);
+
+    // Trigger animation
+    setTimeout(() => {
+        toast.classList.add('show');
+    }, 100);
+
+    // Auto remove after 5 seconds
+    setTimeout(() => {
+        closeToast(toast.querySelector('.toast-close'));
+    }, 5000);
+}
+
+function closeToast(closeBtn) {
+    const toast = closeBtn.closest('.toast');
+    toast.classList.remove('show');
+    setTimeout(() => {
+        toast.remove();
+    }, 300);
+}
+
+// Modal Functions
+function showAddModal() {
+    isEditing = false;
+    currentUserId = null;
+    document.getElementById('modalTitle').textContent = 'Add User';
+    document.getElementById('modalSubmitBtn').textContent = 'Add User';
+    document.getElementById('userForm').reset();
+    document.getElementById('userModal').style.display = 'flex';
+}
+
+function showEditModal(userId) {
+    isEditing = true;
+    currentUserId = userId;
+    document.getElementById('modalTitle').textContent = 'Edit User';
+    document.getElementById('modalSubmitBtn').textContent = 'Update User';
+
+    fetch(`/staff/users/${userId}/get/`)
+        .then(response => response.json())
+        .then(data => {
+            document.getElementById('userUsername').value = data.username;
+            document.getElementById('userEmail').value = data.email;
+            document.getElementById('userFirstName').value = data.first_name;
+            document.getElementById('userLastName').value = data.last_name;
+            document.getElementById('userType').value = data.user_type;
+            document.getElementById('userActive').checked = data.is_active;
+
+            // Remove password requirement for edit
+            const passwordField = document.getElementById('userPassword');
+            if (passwordField) {
+                passwordField.required = false;
+                passwordField.placeholder = 'Leave blank to keep current password';
+            }
+
+            document.getElementById('userModal').style.display = 'flex';
+        });
+}
+
+function closeUserModal() {
+    document.getElementById('userModal').style.display = 'none';
+}
+
+function viewActivity(userId) {
+    // In a real app, this would navigate to user activity page
+    window.location.href = `/users/${userId}/activity/`;
+}
+
+// Delete Modal Functions
+function showDeleteModal(userId) {
+    currentUserId = userId;
+    document.getElementById('deleteModal').style.display = 'flex';
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').style.display = 'none';
+}
+
+// Search functionality
+document.getElementById('searchInput').addEventListener('keypress', function(e) {
+    if (e.key === 'Enter') {
+        const query = this.value;
+        const url = new URL(window.location);
+
+        if (query) {
+            url.searchParams.set('search', query);
+        } else {
+            url.searchParams.delete('search');
+        }
+        url.searchParams.set('page', '1');
+        window.location.href = url.toString();
+    }
+});
+
+// Pagination
+function goToPage(page) {
+    const url = new URL(window.location);
+    url.searchParams.set('page', page);
+    window.location.href = url.toString();
+}
+
+// Form Submission
+document.getElementById('userForm').addEventListener('submit', function(e) {
+    e.preventDefault();
+
+    const formData = new FormData(this);
+    const url = isEditing ? `/staff/users/${currentUserId}/edit/` : '/staff/users/create/';
+
+    fetch(url, {
+        method: 'POST',
+        body: formData,
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(data.message || (isEditing ? 'User updated successfully' : 'User created successfully'), 'success');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showToast(data.message || 'Error saving user', 'error');
+        }
+    })
+    .catch(error => {
+        showToast('Network error occurred', 'error');
+    });
+});
+
+// Delete User
+function deleteUser() {
+    fetch(`/staff/users/${currentUserId}/delete/`, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCookie('csrftoken')
+        }
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            showToast(data.message || 'User deleted successfully', 'success');
+            setTimeout(() => location.reload(), 1000);
+        } else {
+            showToast(data.message || 'Error deleting user', 'error');
+        }
+        closeDeleteModal();
+    })
+    .catch(error => {
+        showToast('Network error occurred', 'error');
+        closeDeleteModal();
+    });
+}
+
+// Close modals when clicking outside
+document.querySelectorAll('.modal-overlay').forEach(overlay => {
+    overlay.addEventListener('click', function(e) {
+        if (e.target === this) {
+            this.style.display = 'none';
+        }
+    });
+});
+
+// Utility function to get CSRF token
+function getCookie(name) {
+    let cookieValue = null;
+    if (document.cookie && document.cookie !== '') {
+        const cookies = document.cookie.split(';');
+        for (let i = 0; i < cookies.length; i++) {
+            const cookie = cookies[i].trim();
+            if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                break;
+            }
+        }
+    }
+    return cookieValue;
+}
@@ -0,0 +1,6 @@
+// Update color text input when color picker changes
+document.querySelectorAll('.form-control-color').forEach(function(colorInput) {
+    colorInput.addEventListener('input', function() {
+        this.nextElementSibling.value = this.value;
+    });
+});
@@ -3,7 +3,7 @@ from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-BASE_URL = 'http://ysfdemo.pythonanywhere.com'
+BASE_URL = os.environ.get('BASE_URL', 'http://ysfdemo.pythonanywhere.com')
 
 SECRET_KEY = 'your-secret-key-here'
 
@@ -52,24 +52,164 @@ CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.MaintenanceModeMiddleware',
+    'staff_dashboard.audit.AuditMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     # 'users.middleware.TabIndependentSessionMiddleware',  # Temporarily disabled
 ]
 
+# Per-response DB query counts for the load-test harness (python -m loadtest)
+if os.environ.get('LOADTEST_QUERY_COUNTS'):
+    MIDDLEWARE.insert(0, 'core.middleware.QueryCountMiddleware')
+
+# Sampled per-request profiling (Server-Timing headers and the staff
+# dashboard's slow request list). Staff can also turn it on for themselves.
+REQUEST_PROFILING = {
+    'SAMPLE_RATE': float(os.environ.get('REQUEST_PROFILING_SAMPLE_RATE', '0')),
+    # Per worker process: each keeps its own SLOWEST_KEPT slowest profiles
+    'SLOWEST_KEPT': int(os.environ.get('REQUEST_PROFILING_SLOWEST_KEPT', '50')),
+    'SLOW_THRESHOLD_MS': float(os.environ.get('REQUEST_PROFILING_SLOW_MS', '0')),
+    'COOKIE_NAME': 'ys_profile',
+    'COOKIE_MAX_AGE': 8 * 60 * 60,
+}
+
+# Prometheus scrapes of /metrics must send "Authorization: Bearer <METRICS_AUTH_TOKEN>";
+# without a token the endpoint answers 403. Behind the local reverse proxy every
+# request comes from 127.0.0.1, so trusting addresses is opt-in: list them in
+# METRICS_ALLOWED_IPS only where REMOTE_ADDR is the scraper's own address.
+METRICS_ALLOWED_IPS = [ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip]
+METRICS_AUTH_TOKEN = os.environ.get('METRICS_AUTH_TOKEN', '')
+
+# Statements slower than THRESHOLD_MS are written with their query plan to
+# PATH (JSON lines); summarise them with `manage.py slow_queries`.
+SLOW_QUERY_LOG = {
+    'ENABLED': os.environ.get('SLOW_QUERY_LOG', '1') != '0',
+    'THRESHOLD_MS': float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100')),
+    'PATH': BASE_DIR / 'logs' / 'slow_queries.jsonl',
+    'EXPLAIN': True,
+}
+
+# APILog rows are queued and bulk inserted by a background thread. Failed
+# calls are always logged; successful ones at SUCCESS_SAMPLE_RATE.
+API_LOG = {
+    'BUFFERED': True,
+    'SUCCESS_SAMPLE_RATE': float(os.environ.get('API_LOG_SUCCESS_SAMPLE_RATE', '1.0')),
+    'MAX_PAYLOAD_CHARS': 4000,
+    'BATCH_SIZE': 100,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE': 10000,
+}
+
+# AuditLog entries (logins, staff dashboard changes, backups) are queued and
+# bulk inserted by a background thread, like API_LOG.
+AUDIT_LOG = {
+    'BUFFERED': True,
+    'BATCH_SIZE': 200,
+    'FLUSH_INTERVAL': 2.0,
+    'MAX_QUEUE': 10000,
+}
+
+# `manage.py compact_logs` rolls APILog/AuditLog rows older than HOT_DAYS
+# into hourly summary tables and deletes them CHUNK_SIZE rows at a time.
+LOG_RETENTION = {
+    'HOT_DAYS': int(os.environ.get('LOG_RETENTION_HOT_DAYS', '30')),
+    'CHUNK_SIZE': 2000,
+}
+
+# The WebsiteSetting row is cached in the shared cache and per process; each
+# process re-checks the shared version token at most every LOCAL_TTL seconds.
+SITE_SETTINGS_CACHE = {
+    'LOCAL_TTL': 5,
+    'TIMEOUT': 60 * 60 * 24,
+}
+
+# WebsiteSetting.maintenance_mode only takes public pages offline (503 for
+# everyone but staff) when this is on; otherwise the flag is just stored.
+MAINTENANCE_MODE_ENFORCED = os.environ.get('MAINTENANCE_MODE_ENFORCED', '0') == '1'
+
+# Anonymous GETs of public pages are served from the cache until a model
+# the page is built from changes; TIMEOUT bounds how long any page lives.
+PAGE_CACHE = {
+    'ENABLED': os.environ.get('PAGE_CACHE', '1') != '0',
+    'TIMEOUT': 60 * 60,
+}
+
+# The navbar, topbar and footer partials are cached per user-state bucket and
+# WebsiteSetting version (see core.fragment_cache), for pages the page cache skips.
+FRAGMENT_CACHE = {
+    'ENABLED': os.environ.get('FRAGMENT_CACHE', '1') != '0',
+    'TIMEOUT': 60 * 60,
+}
+
+# Public pages pre-rendered to HTML for a front-end server to serve without
+# Django (see core.static_site); `manage.py render_static_site` writes them
+# all, and with ENABLED each content change re-renders the pages it affects.
+STATIC_SITE = {
+    'ENABLED': os.environ.get('STATIC_SITE', '0') == '1',
+    'ROOT': os.environ.get('STATIC_SITE_ROOT', BASE_DIR / 'static_site'),
+    'HOST': ALLOWED_HOSTS[0],
+}
+
+# Text responses are compressed with brotli or gzip (see core.compression);
+# page cache entries keep a gzipped copy so hits are never recompressed.
+RESPONSE_COMPRESSION = {
+    'ENABLED': os.environ.get('RESPONSE_COMPRESSION', '1') != '0',
+    'MIN_LENGTH': 200,
+    'BROTLI_QUALITY': 5,
+    'GZIP_LEVEL': 6,
+}
+
+# Uploaded images get WebP copies at these widths in a derivatives/ folder
+# next to the original (see core.images); ASYNC makes them off-request.
+# Each process keeps MANIFEST_CACHE_SIZE manifests and re-checks the shared
+# version token for new derivatives every MANIFEST_TTL seconds.
+IMAGE_DERIVATIVES = {
+    'WIDTHS': [160, 320, 640, 1280],
+    'QUALITY': 80,
+    'ASYNC': True,
+    'MANIFEST_TTL': 5,
+    'MANIFEST_CACHE_SIZE': 1000,
+}
+
+# `manage.py archive_payloads` moves JSON payloads (provider raw_response,
+# APILog request/response data, AuditLog details) older than AFTER_DAYS and at
+# least MIN_BYTES long into gzip segment files under PATH, leaving a pointer.
+PAYLOAD_ARCHIVE = {
+    'PATH': os.environ.get('PAYLOAD_ARCHIVE_PATH', BASE_DIR / 'archive'),
+    'AFTER_DAYS': int(os.environ.get('PAYLOAD_ARCHIVE_AFTER_DAYS', '7')),
+    'BATCH_SIZE': 500,
+    'MIN_BYTES': 256,
+    'SEGMENT_MAX_BYTES': 64 * 1024 * 1024,
+}
+
 ROOT_URLCONF = 'youthshield.urls'
 
+# Templates are compiled once per process and kept by the cached loader (the
+# gunicorn master compiles them all before forking, see core.warmup). Under
+# DEBUG, runserver's autoreloader clears the cache when a template changes.
+TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -77,6 +217,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.website_info',
+                'core.context_processors.page_cache_csrf',
             ],
         },
     },
@@ -91,6 +232,31 @@ DATABASES = {
     }
 }
 
+# The default cache holds the page cache, fragments and WebsiteSetting version
+# tokens, which every worker on the host must see: file-based unless REDIS_URL
+# is set. Circuit breakers need atomic add()/incr() to share one state across
+# workers; without Redis they use a file cache that locks around both.
+REDIS_URL = os.environ.get('REDIS_URL', '')
+if REDIS_URL:
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL},
+        'circuit_breaker': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'circuit',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': BASE_DIR / 'cache',
+        },
+        'circuit_breaker': {
+            'BACKEND': 'core.locked_cache.LockedFileBasedCache',
+            'LOCATION': BASE_DIR / 'cache' / 'circuit-breaker',
+        },
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -123,8 +289,11 @@ USE_TZ = True
 STATIC_URL = '/staticfiles/'
 STATICFILES_DIRS = [
     BASE_DIR / 'static',
-    BASE_DIR / 'staticfiles'
 ]
+# `manage.py collectstatic` writes content-hashed copies of every asset here,
+# each with a .gz and .br sibling; WhiteNoise serves them with a one-year
+# immutable Cache-Control, so a changed file is only ever fetched under its new name.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 
 # Messages framework
 MESSAGE_TAGS = {
@@ -138,6 +307,17 @@ MESSAGE_TAGS = {
 
 MEDIA_URL = '/media-files/'
 MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_BLOB_ROOT = os.environ.get('MEDIA_BLOB_ROOT', str(BASE_DIR / 'media-blobs'))
+
+# Uploads are stored once per content hash in MEDIA_BLOB_ROOT and hard-linked
+# under their usual names; `manage.py gc_media_blobs` removes unreferenced blobs.
+# MEDIA_BLOB_ROOT must be outside MEDIA_ROOT (so blobs aren't served) but on
+# the same filesystem.
+# Static files are hashed and precompressed by collectstatic (see STATIC_ROOT).
+STORAGES = {
+    'default': {'BACKEND': 'core.storage.ContentAddressedStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
@@ -162,3 +342,27 @@ STRIPE_PUBLIC_KEY ='pk_test_51RiodlPYv6mEP2LtcRvzftulO8ch8h9EOp9Nx91pFcsJnSJpfMO
 STRIPE_SECRET_KEY = 'sk_test_51RiodlPYv6mEP2Lt8ZYMd8yP3eajUwxzVtu25496yEZTvV7GHW1UBzd5z7uljlQjtgDasU7ypAvGefTU3NrEAuM000Hb2jl4g0'
 
 STRIPE_WEBHOOK_SECRET = 'whsec_test_your_webhook_secret_here'  # Replace with actual webhook secret from Stripe dashboard
+
+# Provider API endpoints. Point these at `manage.py provider_simulator` (and BASE_URL at the
+# local server) to run the whole payment pipeline offline.
+MPESA_BASE_URL = os.environ.get('MPESA_BASE_URL', 'https://sandbox.safaricom.co.ke')
+PAYPAL_BASE_URL = os.environ.get('PAYPAL_BASE_URL', 'https://api-m.sandbox.paypal.com')
+STRIPE_API_BASE = os.environ.get('STRIPE_API_BASE', 'https://api.stripe.com')
+
+# Outbound provider resilience
+# A provider's breaker opens after FAILURE_THRESHOLD failures within FAILURE_WINDOW
+# seconds; calls then fail fast until RECOVERY_TIMEOUT has passed and a probe succeeds.
+PROVIDER_CIRCUIT_BREAKER = {
+    'FAILURE_THRESHOLD': 5,
+    'FAILURE_WINDOW': 60,
+    'RECOVERY_TIMEOUT': 30,
+    # Needs a backend with atomic add()/incr() shared by all workers (see CACHES)
+    'CACHE_ALIAS': 'circuit_breaker',
+}
+
+# Per-call timeouts in seconds
+PROVIDER_LATENCY_BUDGETS = {
+    'mpesa': {'oauth': 5, 'stk_push': 10, 'default': 10},
+    'paypal': {'oauth': 5, 'create_order': 10, 'capture_order': 15, 'default': 10},
+    'stripe': {'payment_intent': 10, 'customer': 8, 'default': 10},
+}
@@ -3,17 +3,17 @@ from django.urls import path, include
 from django.contrib.auth import views as auth_views
 from django.conf import settings
 from django.conf.urls.static import static
-from django.http import HttpResponse
-import os
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.shortcuts import redirect
+from django.utils.cache import patch_cache_control
+
 
 def favicon_view(request):
-    from django.conf import settings
-    favicon_path = os.path.join(settings.STATICFILES_DIRS[0], 'images', 'favicon-32x32.png')
-    try:
-        with open(favicon_path, 'rb') as f:
-            return HttpResponse(f.read(), content_type='image/png')
-    except FileNotFoundError:
-        return HttpResponse(status=404)
+    # The hashed copy is served by WhiteNoise with an immutable Cache-Control
+    response = redirect(staticfiles_storage.url('images/favicon-32x32.png'))
+    patch_cache_control(response, public=True, max_age=60 * 60 * 24)
+    return response
+
 
 urlpatterns = [
     path('favicon.ico', favicon_view),